@@ -0,0 +1,44 @@
+"""Cache backends selected by the CACHE_BACKEND environment variable.
+
+``locmem``
+    The default: a per-process memory cache. Invalidation by signals only
+    reaches the process that saved the model, so use it with one worker.
+``file``
+    Files under CACHE_LOCATION (default ``<BASE_DIR>/.cache``), shared by
+    every worker on one host.
+``redis``
+    Django's Redis backend at REDIS_URL (default
+    ``redis://localhost:6379/1``), shared by every host. Needs the optional
+    ``redis`` package.
+
+The backends are the ``goals_management.caching`` subclasses of Django's,
+which count hits and misses per key namespace for the profiling log.
+CACHE_KEY_PREFIX separates installs sharing one cache.
+"""
+import os
+
+
+CACHE_BACKENDS = {
+    'locmem': 'goals_management.caching.LocMemCache',
+    'file': 'goals_management.caching.FileBasedCache',
+    'redis': 'goals_management.caching.RedisCache',
+}
+
+
+def cache_settings(base_dir, environ=os.environ):
+    """Return ``CACHES`` for the CACHE_BACKEND in ``environ``."""
+    backend = environ.get('CACHE_BACKEND', 'locmem')
+    if backend not in CACHE_BACKENDS:
+        raise ValueError(f'CACHE_BACKEND must be one of {", ".join(CACHE_BACKENDS)}, not "{backend}".')
+    cache = {
+        'BACKEND': CACHE_BACKENDS[backend],
+        'KEY_PREFIX': environ.get('CACHE_KEY_PREFIX', ''),
+    }
+    if backend == 'locmem':
+        cache['OPTIONS'] = {'MAX_ENTRIES': 5000}
+    elif backend == 'file':
+        cache['LOCATION'] = environ.get('CACHE_LOCATION', str(base_dir / '.cache'))
+        cache['OPTIONS'] = {'MAX_ENTRIES': 20000}
+    else:
+        cache['LOCATION'] = environ.get('REDIS_URL', 'redis://localhost:6379/1')
+    return {'default': cache}
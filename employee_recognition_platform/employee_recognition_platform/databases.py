@@ -0,0 +1,96 @@
+"""Database profiles selected by the DATABASE_PROFILE environment variable.
+
+``sqlite``
+    The default for small installs: ``db.sqlite3`` in WAL mode, so readers no
+    longer block the writer, with ``synchronous=NORMAL``, a busy timeout and
+    memory-mapped reads. The pragmas in ``SQLITE_PRAGMAS`` are applied to
+    every new connection by ``tune_sqlite``.
+``sqlite-legacy``
+    SQLite's defaults, kept for benchmarks. The journal mode is persistent
+    in the database file, so it is switched back to the rollback journal.
+``postgresql``
+    Persistent connections (``CONN_MAX_AGE``) checked before reuse
+    (``CONN_HEALTH_CHECKS``), so each worker thread keeps one open
+    connection instead of connecting per request.
+``pgbouncer``
+    PostgreSQL through a PgBouncer pool in transaction mode. Django 4.2 has
+    no pool of its own, so the pool lives in PgBouncer. Server-side cursors
+    cannot outlive a pooled transaction, so they are disabled.
+
+PostgreSQL settings come from POSTGRES_DB, POSTGRES_USER, POSTGRES_PASSWORD,
+POSTGRES_HOST and POSTGRES_PORT, and DATABASE_CONN_MAX_AGE (seconds).
+
+Every profile also defines the ``replica`` alias that
+``goals_management.replicas.ReplicaRouter`` sends reporting reads to. It is
+the primary itself unless DATABASE_REPLICA_PATH (SQLite) or
+POSTGRES_REPLICA_HOST and POSTGRES_REPLICA_PORT point elsewhere. Tests get a
+separate replica database, so routing can be told apart from the primary.
+"""
+import os
+from django.conf import settings
+
+
+SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'busy_timeout': 5000,
+    'mmap_size': 256 * 1024 * 1024,
+    'cache_size': -20000,
+    'temp_store': 'MEMORY',
+}
+PROFILES = ('sqlite', 'sqlite-legacy', 'postgresql', 'pgbouncer')
+
+
+def sqlite_database(path):
+    return {'ENGINE': 'django.db.backends.sqlite3', 'NAME': path}
+
+
+def postgresql_database(environ, port=5432, conn_max_age=600):
+    return {
+        'ENGINE': 'django.db.backends.postgresql',
+        'NAME': environ.get('POSTGRES_DB', 'employee_recognition_platform'),
+        'USER': environ.get('POSTGRES_USER', ''),
+        'PASSWORD': environ.get('POSTGRES_PASSWORD', ''),
+        'HOST': environ.get('POSTGRES_HOST', 'localhost'),
+        'PORT': environ.get('POSTGRES_PORT', str(port)),
+        'CONN_MAX_AGE': int(environ.get('DATABASE_CONN_MAX_AGE', conn_max_age)),
+        'CONN_HEALTH_CHECKS': True,
+    }
+
+
+def postgresql_replica_database(primary, environ):
+    return {
+        **primary,
+        'HOST': environ.get('POSTGRES_REPLICA_HOST', primary['HOST']),
+        'PORT': environ.get('POSTGRES_REPLICA_PORT', primary['PORT']),
+        'TEST': {'NAME': f"test_{primary['NAME']}_replica"},
+    }
+
+
+def database_settings(base_dir, environ=os.environ):
+    """Return ``(DATABASES, SQLITE_PRAGMAS)`` for the DATABASE_PROFILE in ``environ``."""
+    profile = environ.get('DATABASE_PROFILE', 'sqlite')
+    if profile not in PROFILES:
+        raise ValueError(f'DATABASE_PROFILE must be one of {", ".join(PROFILES)}, not "{profile}".')
+    if profile in ('sqlite', 'sqlite-legacy'):
+        path = base_dir / 'db.sqlite3'
+        databases = {
+            'default': sqlite_database(path),
+            'replica': sqlite_database(environ.get('DATABASE_REPLICA_PATH', path)),
+        }
+        return databases, SQLITE_PRAGMAS if profile == 'sqlite' else {'journal_mode': 'DELETE'}
+    if profile == 'postgresql':
+        database = postgresql_database(environ)
+    else:
+        database = postgresql_database(environ, port=6432)
+        database['DISABLE_SERVER_SIDE_CURSORS'] = True
+    return {'default': database, 'replica': postgresql_replica_database(database, environ)}, {}
+
+
+def tune_sqlite(sender, connection, **kwargs):
+    """``connection_created`` receiver applying ``settings.SQLITE_PRAGMAS`` to new SQLite connections."""
+    if connection.vendor != 'sqlite' or not settings.SQLITE_PRAGMAS:
+        return
+    with connection.cursor() as cursor:
+        for pragma, value in settings.SQLITE_PRAGMAS.items():
+            cursor.execute(f'PRAGMA {pragma} = {value}')
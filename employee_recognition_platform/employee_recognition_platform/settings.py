@@ -10,8 +10,11 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/4.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 from . import local_settings
+from . caches import cache_settings
+from . databases import database_settings
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -44,6 +47,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'goals_management.profiling.ProfilingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -51,6 +55,7 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'goals_management.replicas.PinPrimaryMiddleware',
 ]
 
 ROOT_URLCONF = 'employee_recognition_platform.urls'
@@ -66,6 +71,7 @@ TEMPLATES = [
                 'django.template.context_processors.request',
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
+                'goals_management.caching.cache_context',
             ],
         },
     },
@@ -77,12 +83,23 @@ WSGI_APPLICATION = 'employee_recognition_platform.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/4.2/ref/settings/#databases
 
-DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
-    }
-}
+# Selected with the DATABASE_PROFILE environment variable; see databases.py
+DATABASES, SQLITE_PRAGMAS = database_settings(BASE_DIR)
+
+# Reporting reads (statistics, department reviews, search, exports) go to the
+# 'replica' alias when enabled; clients are pinned to the primary for
+# DATABASE_REPLICA_PIN_SECONDS after a write.
+DATABASE_ROUTERS = ['goals_management.replicas.ReplicaRouter']
+DATABASE_REPLICA_READS = os.environ.get('DATABASE_REPLICA_READS') == '1'
+DATABASE_REPLICA_PIN_SECONDS = 10
+
+
+# Cache
+# Selected with the CACHE_BACKEND environment variable; see caches.py
+
+CACHES = cache_settings(BASE_DIR)
+PAGE_CACHE_TIMEOUT = 60 * 5
+FRAGMENT_CACHE_TIMEOUT = 60 * 10
 
 
 # Password validation
@@ -159,4 +176,16 @@ TINYMCE_DEFAULT_CONFIG = {
     'contextmenu': 'formats | link image',
     'menubar': True,
     'statusbar': True,
-}
\ No newline at end of file
+}
+# Statistics charts are rendered out of process; see goals_management.rendering
+CHART_RENDER_WORKERS = 2
+CHART_RENDER_QUEUE_SIZE = 32
+# Avatar size variants are built out of process; see user_profile.imaging.
+# 0 workers builds them inline, in the request that uploaded the picture.
+AVATAR_THUMBNAIL_WORKERS = 1
+AVATAR_THUMBNAIL_QUEUE_SIZE = 64
+# Per-request profiling (Server-Timing headers and a JSONL log); see goals_management.profiling
+REQUEST_PROFILING = False
+REQUEST_PROFILING_LOG = BASE_DIR / 'profiling.jsonl'
+REQUEST_PROFILING_LOG_BYTES = 10 * 1024 * 1024
+REQUEST_PROFILING_LOG_BACKUPS = 3
@@ -15,8 +15,9 @@ Including another URLconf
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
 from django.contrib import admin
-from django.urls import path, include
+from django.urls import path, include, re_path
 from django.conf.urls.static import static
+from user_profile.storage import serve_immutable
 from . import settings
 
 
@@ -26,5 +27,12 @@ urlpatterns = [
     path('profile/', include('user_profile.urls')),
     path('accounts/', include('django.contrib.auth.urls')),
     path('tinymce/', include('tinymce.urls')), 
-] + (static(settings.STATIC_URL, document_root=settings.STATIC_ROOT)\
+]
+if settings.DEBUG:
+    # Content-addressed pictures and their avatar variants never change.
+    urlpatterns.append(re_path(
+        rf'^{settings.MEDIA_URL}(?P<path>user_profile/(?:pictures|avatars)/[0-9a-f]{{2}}/[0-9a-f]{{64}}[^/]*)$',
+        serve_immutable, {'document_root': settings.MEDIA_ROOT},
+    ))
+urlpatterns += (static(settings.STATIC_URL, document_root=settings.STATIC_ROOT)\
     + static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT))
\ No newline at end of file
@@ -7,4 +7,5 @@ admin.site.register(models.Employee)
 admin.site.register(models.Goal)
 admin.site.register(models.Review)
 admin.site.register(models.GoalJournal)
-
+admin.site.register(models.GoalBatchUpdate)
+admin.site.register(models.EmployeeScorecard)
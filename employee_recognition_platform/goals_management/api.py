@@ -0,0 +1,351 @@
+"""JSON API for goals, journals, reviews, employees and managers.
+
+``api/<resource>/`` lists the rows the user may read (GET) and creates one
+(POST); ``api/<resource>/<id>/`` reads one (GET), updates it (PATCH merges
+into the row, PUT replaces the writable fields) and deletes it (DELETE).
+``PATCH api/goals/`` with ``{"changes": [{"id": 1, "status": 2}, ...]}``
+changes the status, progress and priority of many goals in one batch.
+Bodies are JSON objects validated by the same forms as the HTML views, and
+the ownership rules follow those views:
+
+- goals: owners read and write their own, managers also read their team's;
+- journals: readable with their goal, written by the goal's owner;
+- reviews: employees read their own, managers read and write their team's;
+- employees and managers: read only; a user sees their own row, a manager
+  their team and an employee their manager.
+
+``?fields=id,status,progress`` selects only those columns, so clients can
+skip the HTML fields. Lists are keyset-paginated (``?cursor=``,
+``?limit=``) and filterable by the parameters in each resource's
+``filters``. Rows are read with ``values_list`` and encoded with orjson when
+the optional package is installed.
+"""
+import json
+from functools import wraps
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.db.models import Q
+from django.forms.models import model_to_dict
+from django.http import HttpResponse, HttpResponseNotAllowed
+from . bulk import BulkUpdateError, clean_changes, update_goals
+from . forms import GoalCreateForm, GoalJournalForm, GoalUpdateForm, ReviewCreateForm, ReviewUpdateForm
+from . models import Employee, Goal, GoalJournal, Manager, Review
+from . pagination import keyset_page
+from . roles import resolve_roles
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+DEFAULT_LIMIT = 50
+MAX_LIMIT = 200
+
+
+def dumps(data):
+    if orjson is not None:
+        return orjson.dumps(data)
+    return json.dumps(data, cls=DjangoJSONEncoder).encode()
+
+
+def loads(body):
+    return orjson.loads(body) if orjson is not None else json.loads(body)
+
+
+class ApiError(Exception):
+    def __init__(self, status, detail, **extra):
+        super().__init__(detail)
+        self.status = status
+        self.payload = {'detail': detail, **extra}
+
+
+class Resource:
+    """A model exposed by the API; ``fields`` maps API names to the columns they are read from."""
+    model = None
+    fields = {}
+    ordering = ('-id',)
+    filters = {}
+    create_form = None
+    update_form = None
+
+    def visible(self, user, roles):
+        """The rows ``user`` may read."""
+        raise NotImplementedError
+
+    def writable(self, user, roles):
+        """The rows ``user`` may update and delete."""
+        return self.model.objects.none()
+
+    def can_create(self, user, roles):
+        return True
+
+    def get_form(self, form, user, roles):
+        return form
+
+    def before_save(self, instance, data, user, roles, created):
+        pass
+
+    def bulk_update(self, user, roles, rows):
+        """Apply a batch of changes; return the changed ids and the batch record."""
+        raise ApiError(405, 'This resource does not support bulk updates.')
+
+
+class GoalResource(Resource):
+    model = Goal
+    fields = {
+        'id': 'id', 'title': 'title', 'description': 'description', 'start_date': 'start_date',
+        'end_date': 'end_date', 'priority': 'priority', 'status': 'status', 'progress': 'progress',
+        'owner': 'owner_id', 'updated_at': 'updated_at',
+    }
+    filters = {'status': 'status', 'priority': 'priority', 'owner': 'owner_id'}
+    create_form = GoalCreateForm
+    update_form = GoalUpdateForm
+
+    def visible(self, user, roles):
+        team = Q(owner__employee__manager_id=roles.manager_id) if roles.is_manager else Q()
+        return Goal.objects.filter(Q(owner=user) | team)
+
+    def writable(self, user, roles):
+        return Goal.objects.filter(owner=user)
+
+    def before_save(self, instance, data, user, roles, created):
+        if created:
+            instance.owner = user
+
+    def bulk_update(self, user, roles, rows):
+        try:
+            changes = clean_changes(rows)
+            return list(changes), update_goals(user, changes)
+        except BulkUpdateError as error:
+            raise ApiError(error.status, str(error), errors=error.errors)
+
+
+class JournalResource(Resource):
+    model = GoalJournal
+    fields = {'id': 'id', 'goal': 'goal_id', 'owner': 'owner_id', 'journal_date': 'journal_date', 'journal': 'journal'}
+    ordering = ('-journal_date', '-id')
+    filters = {'goal': 'goal_id'}
+    create_form = GoalJournalForm
+    update_form = GoalJournalForm
+
+    def visible(self, user, roles):
+        team = Q(goal__owner__employee__manager_id=roles.manager_id) if roles.is_manager else Q()
+        return GoalJournal.objects.filter(Q(goal__owner=user) | team)
+
+    def writable(self, user, roles):
+        return GoalJournal.objects.filter(goal__owner=user)
+
+    def before_save(self, instance, data, user, roles, created):
+        if not created:
+            return
+        try:
+            goal = Goal.objects.filter(pk=data.get('goal'), owner=user).only('pk').first()
+        except (TypeError, ValueError):
+            goal = None
+        if goal is None:
+            raise ApiError(400, 'Invalid data.', errors={'goal': ['Choose one of your goals.']})
+        instance.goal = goal
+        instance.owner = user
+
+
+class ReviewResource(Resource):
+    model = Review
+    fields = {
+        'id': 'id', 'employee': 'employee_id', 'manager': 'manager_id', 'created_date': 'created_date',
+        'goals_achievment': 'goals_achievment', 'goals_review': 'goals_review',
+        'teamwork': 'teamwork', 'teamwork_review': 'teamwork_review',
+        'innovation': 'innovation', 'innovation_review': 'innovation_review',
+        'work_ethics': 'work_ethics', 'work_ethics_review': 'work_ethics_review',
+        'total_review': 'total_review', 'updated_at': 'updated_at',
+    }
+    ordering = ('-created_date', '-id')
+    filters = {'employee': 'employee_id'}
+    create_form = ReviewCreateForm
+    update_form = ReviewUpdateForm
+
+    def visible(self, user, roles):
+        team = Q(manager_id=roles.manager_id) if roles.is_manager else Q()
+        return Review.objects.filter(Q(employee__user=user) | team)
+
+    def writable(self, user, roles):
+        if not roles.is_manager:
+            return Review.objects.none()
+        return Review.objects.filter(manager_id=roles.manager_id)
+
+    def can_create(self, user, roles):
+        return roles.is_manager
+
+    def get_form(self, form, user, roles):
+        form.fields['employee'].queryset = Employee.objects.filter(manager_id=roles.manager_id)
+        return form
+
+    def before_save(self, instance, data, user, roles, created):
+        if created:
+            instance.manager_id = roles.manager_id
+
+
+class EmployeeResource(Resource):
+    model = Employee
+    fields = {
+        'id': 'id', 'first_name': 'first_name', 'last_name': 'last_name', 'email': 'email',
+        'hire_date': 'hire_date', 'term_date': 'term_date', 'position': 'position',
+        'manager': 'manager_id', 'user': 'user_id', 'status': 'status',
+    }
+    filters = {'status': 'status'}
+
+    def visible(self, user, roles):
+        team = Q(manager_id=roles.manager_id) if roles.is_manager else Q()
+        return Employee.objects.filter(Q(user=user) | team)
+
+
+class ManagerResource(Resource):
+    model = Manager
+    fields = {
+        'id': 'id', 'first_name': 'first_name', 'last_name': 'last_name', 'email': 'email',
+        'hire_date': 'hire_date', 'term_date': 'term_date', 'department': 'department',
+        'user': 'user_id', 'status': 'status',
+    }
+
+    def visible(self, user, roles):
+        return Manager.objects.filter(Q(user=user) | Q(pk__in=Employee.objects.filter(user=user).values('manager_id')))
+
+
+RESOURCES = {
+    'goals': GoalResource(),
+    'journals': JournalResource(),
+    'reviews': ReviewResource(),
+    'employees': EmployeeResource(),
+    'managers': ManagerResource(),
+}
+
+
+def json_response(data, status=200):
+    return HttpResponse(dumps(data), status=status, content_type='application/json')
+
+
+def get_resource(name):
+    try:
+        return RESOURCES[name]
+    except KeyError:
+        raise ApiError(404, 'Unknown resource.')
+
+
+def selected_fields(request, resource):
+    requested = [name.strip() for name in request.GET.get('fields', '').split(',') if name.strip()]
+    unknown = [name for name in requested if name not in resource.fields]
+    if unknown:
+        raise ApiError(400, 'Unknown fields.', fields=unknown)
+    return requested or list(resource.fields)
+
+
+def read_rows(queryset, resource, names):
+    return [dict(zip(names, row)) for row in queryset.values_list(*(resource.fields[name] for name in names))]
+
+
+def read_page(request, resource, queryset, names):
+    for parameter, lookup in resource.filters.items():
+        if parameter in request.GET:
+            queryset = queryset.filter(**{lookup: request.GET[parameter]})
+    limit = min(max(int(request.GET.get('limit', DEFAULT_LIMIT)), 1), MAX_LIMIT)
+    columns = [resource.fields[name] for name in names]
+    ordering_columns = [field.lstrip('-') for field in resource.ordering]
+    columns += [column for column in ordering_columns if column not in columns]
+    positions = [columns.index(column) for column in ordering_columns]
+    page = keyset_page(
+        queryset.values_list(*columns), resource.ordering, request.GET.get('cursor'), limit,
+        key=lambda row: [row[position] for position in positions],
+    )
+    return {'results': [dict(zip(names, row)) for row in page.object_list], 'next_cursor': page.next_cursor}
+
+
+def read_payload(request):
+    try:
+        data = loads(request.body or b'{}')
+    except ValueError:
+        data = None
+    if not isinstance(data, dict):
+        raise ApiError(400, 'The request body must be a JSON object.')
+    return data
+
+
+def save(request, resource, roles, instance=None):
+    created = instance is None
+    data = read_payload(request)
+    form_class = resource.create_form if created else resource.update_form
+    if request.method == 'PATCH':
+        data = {**model_to_dict(instance, fields=form_class._meta.fields), **data}
+    form = resource.get_form(form_class(data, instance=instance), request.user, roles)
+    if not form.is_valid():
+        raise ApiError(400, 'Invalid data.', errors={
+            field: [str(error) for error in errors] for field, errors in form.errors.items()
+        })
+    with transaction.atomic():
+        instance = form.save(commit=False)
+        resource.before_save(instance, data, request.user, roles, created)
+        instance.save()
+    return instance
+
+
+def writable_object(resource, user, roles, pk):
+    instance = resource.writable(user, roles).filter(pk=pk).first()
+    if instance is None:
+        if resource.visible(user, roles).filter(pk=pk).exists():
+            raise ApiError(403, 'You may not change this object.')
+        raise ApiError(404, 'Not found.')
+    return instance
+
+
+def api_view(methods):
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, resource, **kwargs):
+            if request.method not in methods:
+                return HttpResponseNotAllowed(methods)
+            if not request.user.is_authenticated:
+                return json_response({'detail': 'Authentication required.'}, status=401)
+            try:
+                return view(request, get_resource(resource), resolve_roles(request), **kwargs)
+            except ApiError as error:
+                return json_response(error.payload, status=error.status)
+            except (TypeError, ValueError):
+                return json_response({'detail': 'Invalid query parameter.'}, status=400)
+        return wrapper
+    return decorator
+
+
+@api_view(['GET', 'HEAD', 'POST', 'PATCH'])
+def collection(request, resource, roles):
+    names = selected_fields(request, resource)
+    if request.method == 'PATCH':
+        ids, batch = resource.bulk_update(request.user, roles, read_payload(request).get('changes'))
+        queryset = resource.visible(request.user, roles).filter(pk__in=ids).order_by(*resource.ordering)
+        return json_response({
+            'batch': batch.pk if batch else None,
+            'updated': batch.goal_count if batch else 0,
+            'results': read_rows(queryset, resource, names),
+        })
+    if request.method == 'POST':
+        if resource.create_form is None:
+            raise ApiError(405, 'This resource is read only.')
+        if not resource.can_create(request.user, roles):
+            raise ApiError(403, 'You may not create this object.')
+        instance = save(request, resource, roles)
+        return json_response(read_rows(resource.model.objects.filter(pk=instance.pk), resource, names)[0], status=201)
+    return json_response(read_page(request, resource, resource.visible(request.user, roles), names))
+
+
+@api_view(['GET', 'HEAD', 'PUT', 'PATCH', 'DELETE'])
+def item(request, resource, roles, pk):
+    if request.method not in ('GET', 'HEAD') and resource.update_form is None:
+        raise ApiError(405, 'This resource is read only.')
+    if request.method == 'DELETE':
+        writable_object(resource, request.user, roles, pk).delete()
+        return HttpResponse(status=204)
+    names = selected_fields(request, resource)
+    if request.method in ('PUT', 'PATCH'):
+        save(request, resource, roles, writable_object(resource, request.user, roles, pk))
+    rows = read_rows(resource.visible(request.user, roles).filter(pk=pk), resource, names)
+    if not rows:
+        raise ApiError(404, 'Not found.')
+    return json_response(rows[0])
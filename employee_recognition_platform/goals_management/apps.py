@@ -4,3 +4,9 @@ from django.apps import AppConfig
 class GoalsManagementConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'goals_management'
+
+    def ready(self):
+        from django.db.backends.signals import connection_created
+        from employee_recognition_platform.databases import tune_sqlite
+        from . import signals
+        connection_created.connect(tune_sqlite, dispatch_uid='tune_sqlite')
@@ -0,0 +1,32 @@
+"""Helpers for async views.
+
+Django 4.2 has no async ``login_required`` and ``request.user`` is loaded
+lazily through the synchronous session and auth backends, so the user is
+resolved once in a worker thread before the view body runs. Templates are
+rendered through ``sync_to_async`` as well, because ``base.html`` follows
+lazy relations of the user (profile pictures) that would otherwise query the
+database on the event loop.
+"""
+from functools import wraps
+from asgiref.sync import sync_to_async
+from django.contrib.auth.views import redirect_to_login
+from django.shortcuts import render
+
+
+async def aload_user(request):
+    """Evaluate ``request.user`` off the event loop and return it."""
+    await sync_to_async(lambda: request.user.is_authenticated)()
+    return request.user
+
+
+def async_login_required(view):
+    @wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        user = await aload_user(request)
+        if not user.is_authenticated:
+            return redirect_to_login(request.get_full_path())
+        return await view(request, *args, **kwargs)
+    return wrapper
+
+
+arender = sync_to_async(render)
@@ -0,0 +1,122 @@
+"""Batch writes: goal status sweeps and team review cycles.
+
+``update_goals`` checks that the user owns every goal in one query, writes
+all changes with one ``bulk_update`` in a transaction and records the batch
+in one ``GoalBatchUpdate`` instead of a journal per goal. ``create_reviews``
+inserts a manager's reviews of their team with one ``bulk_create``.
+
+Neither sends model signals, so both do the signals' upkeep themselves in
+bulk: ``updated_at`` (the ETag version of the pages), page and chart
+invalidation, and for reviews the search documents and scorecards.
+"""
+from django.core.exceptions import ValidationError
+from django.db import connections, router, transaction
+from django.utils.timezone import localtime, now
+from . caching import invalidate_user_pages
+from . charts import invalidate_goal_aggregates
+from . models import Goal, GoalBatchUpdate, Manager, Review, SearchDocument
+from . scorecards import refresh_scorecards
+from . search import review_document
+
+
+BULK_FIELDS = ('status', 'progress', 'priority')
+MAX_BATCH_SIZE = 1000
+
+
+class BulkUpdateError(Exception):
+    def __init__(self, status, detail, errors=None):
+        super().__init__(detail)
+        self.status = status
+        self.errors = errors or {}
+
+
+def clean_changes(rows):
+    """Validate ``[{'id': 1, 'status': 2, ...}, ...]`` and return ``{goal_id: {field: value}}``."""
+    if not isinstance(rows, list) or not rows:
+        raise BulkUpdateError(400, 'Send a list of goal changes.')
+    if len(rows) > MAX_BATCH_SIZE:
+        raise BulkUpdateError(400, f'Send at most {MAX_BATCH_SIZE} goal changes at once.')
+    changes, errors = {}, {}
+    for index, row in enumerate(rows):
+        if not isinstance(row, dict):
+            errors[str(index)] = ['Each change must be an object.']
+            continue
+        row_errors = [f'Unknown field "{name}".' for name in row if name != 'id' and name not in BULK_FIELDS]
+        try:
+            goal_id = int(row.get('id'))
+        except (TypeError, ValueError):
+            goal_id = None
+            row_errors.append('A goal id is required.')
+        if goal_id in changes:
+            row_errors.append(f'Goal {goal_id} is changed twice.')
+        values = {}
+        for name in BULK_FIELDS:
+            if row.get(name) in (None, ''):
+                continue
+            try:
+                values[name] = Goal._meta.get_field(name).clean(row[name], None)
+            except ValidationError as error:
+                row_errors += [f'{name}: {message}' for message in error.messages]
+        if not values:
+            row_errors.append(f'Change at least one of {", ".join(BULK_FIELDS)}.')
+        if row_errors:
+            errors[str(index)] = row_errors
+        else:
+            changes[goal_id] = values
+    if errors:
+        raise BulkUpdateError(400, 'Invalid data.', errors)
+    return changes
+
+
+def update_goals(user, changes):
+    """Apply ``changes`` from ``clean_changes`` to ``user``'s goals; return the ``GoalBatchUpdate`` or None."""
+    with transaction.atomic():
+        goals = list(Goal.objects.select_for_update().filter(owner=user, pk__in=changes).only('pk', *BULK_FIELDS))
+        missing = sorted(changes.keys() - {goal.pk for goal in goals})
+        if missing:
+            raise BulkUpdateError(403, 'You may only change your own goals.', {'goals': missing})
+        stamp = now()
+        changed, fields, summary = [], {'updated_at'}, []
+        for goal in goals:
+            diff = {
+                name: [getattr(goal, name), value]
+                for name, value in changes[goal.pk].items() if getattr(goal, name) != value
+            }
+            if not diff:
+                continue
+            for name, (_old, value) in diff.items():
+                setattr(goal, name, value)
+            goal.updated_at = stamp
+            fields.update(diff)
+            changed.append(goal)
+            summary.append({'id': goal.pk, **diff})
+        if not changed:
+            return None
+        Goal.objects.bulk_update(changed, sorted(fields), batch_size=500)
+        batch = GoalBatchUpdate.objects.create(owner=user, goal_count=len(changed), changes=summary)
+    invalidate_goal_aggregates(user.pk)
+    invalidate_user_pages(user.pk)
+    return batch
+
+
+def create_reviews(manager_id, reviews):
+    """Save ``reviews`` of the manager's team, each with its ``employee`` set, in one transaction."""
+    manager = Manager.objects.get(pk=manager_id)
+    for review in reviews:
+        review.manager = manager
+    if not connections[router.db_for_write(Review)].features.can_return_rows_from_bulk_insert:
+        # Without the new ids the search documents cannot be built in bulk; the signals do it per review.
+        with transaction.atomic():
+            for review in reviews:
+                review.save()
+        return reviews
+    with transaction.atomic():
+        Review.objects.bulk_create(reviews)
+        SearchDocument.objects.bulk_create([review_document(review) for review in reviews])
+        years = {}
+        for review in reviews:
+            years.setdefault(localtime(review.created_date).year, set()).add(review.employee_id)
+        for year, employee_ids in years.items():
+            refresh_scorecards(employee_ids, year)
+    invalidate_user_pages(manager.user_id, *(review.employee.user_id for review in reviews))
+    return reviews
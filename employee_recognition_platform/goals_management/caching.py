@@ -0,0 +1,161 @@
+"""Per-user page and fragment caching.
+
+``cache_per_user`` caches a whole GET response under the view, the user,
+their role and a per-user generation token. Templates cache the base chrome
+with ``{% cache %}`` varied on the same token, which ``cache_context`` puts
+in the context as ``cache_generation``. Signals call
+``invalidate_user_pages`` when a user's goals, journals, reviews, roles or
+profile change. That replaces the token, so every page and fragment of that
+user misses without having to find their keys.
+
+The cache backends below are Django's own with hit and miss counting per key
+namespace; the counts go to the profiling log and the cache_report command
+turns them into hit rates.
+"""
+import hashlib
+import uuid
+from functools import wraps
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.conf import settings
+from django.contrib.messages import get_messages
+from django.core.cache import cache
+from django.core.cache.backends import filebased, locmem, redis
+from django.http import HttpResponse
+from django.template.response import SimpleTemplateResponse
+from django.utils.functional import SimpleLazyObject
+from . profiling import count_cache
+from . roles import resolve_roles
+
+
+GENERATION_KEY = 'page_generation:{user_id}'
+PAGE_CACHE_KEY = 'page.{view}:{user_id}:{role}:{generation}:{path}'
+ANONYMOUS_GENERATION = 'anonymous'
+
+_MISSING = object()
+
+
+def key_namespace(key):
+    """``page.goal_list:3:...`` -> ``page.goal_list``; ``template.cache.sidebar.<hash>`` -> ``template.cache.sidebar``."""
+    if key.startswith('template.cache.'):
+        return key.rsplit('.', 1)[0]
+    return key.split(':', 1)[0]
+
+
+class CountingCacheMixin:
+    def get(self, key, default=None, version=None):
+        value = super().get(key, _MISSING, version)
+        count_cache(key_namespace(key), value is not _MISSING)
+        return default if value is _MISSING else value
+
+
+class LocMemCache(CountingCacheMixin, locmem.LocMemCache):
+    pass
+
+
+class FileBasedCache(CountingCacheMixin, filebased.FileBasedCache):
+    pass
+
+
+class RedisCache(CountingCacheMixin, redis.RedisCache):
+    pass
+
+
+def user_generation(user_id):
+    key = GENERATION_KEY.format(user_id=user_id)
+    generation = cache.get(key)
+    if generation is None:
+        cache.add(key, uuid.uuid4().hex, None)
+        generation = cache.get(key)
+    return generation
+
+
+def request_generation(request):
+    """Return the cache generation of ``request.user``, looked up once per request."""
+    if not hasattr(request, '_cache_generation'):
+        user = request.user
+        request._cache_generation = user_generation(user.pk) if user.is_authenticated else ANONYMOUS_GENERATION
+    return request._cache_generation
+
+
+def invalidate_user_pages(*user_ids):
+    cache.delete_many([GENERATION_KEY.format(user_id=user_id) for user_id in user_ids if user_id])
+
+
+def role_label(request):
+    if not request.user.is_authenticated:
+        return 'anonymous'
+    roles = resolve_roles(request)
+    role = 'manager' if roles.is_manager else 'employee' if roles.is_employee else 'user'
+    return f'{role}-staff' if request.user.is_staff else role
+
+
+def csrf_cookie(request):
+    return request.COOKIES.get(settings.CSRF_COOKIE_NAME, '')
+
+
+def page_cache_key(request):
+    # Pages with forms embed a CSRF token bound to the browser's cookie, so each browser gets its own copy.
+    return PAGE_CACHE_KEY.format(
+        view=request.resolver_match.url_name if request.resolver_match else 'unknown',
+        user_id=request.user.pk or 0,
+        role=role_label(request),
+        generation=request_generation(request),
+        path=hashlib.md5(f'{request.get_full_path()}:{csrf_cookie(request)}'.encode()).hexdigest(),
+    )
+
+
+def has_pending_messages(request):
+    return bool(len(get_messages(request)))
+
+
+def _lookup(request):
+    # Pages showing flashed messages are one-offs: neither served from nor stored in the cache.
+    if request.method not in ('GET', 'HEAD') or has_pending_messages(request):
+        return None, None
+    key = page_cache_key(request)
+    cached = cache.get(key)
+    if cached is None:
+        return key, None
+    content, content_type = cached
+    return key, HttpResponse(content, content_type=content_type)
+
+
+def _store(key, request, response):
+    if isinstance(response, SimpleTemplateResponse):
+        response.render()
+    # A token minted for a browser without a CSRF cookie is only valid with the cookie set on this response.
+    fresh_token = request.META.get('CSRF_COOKIE', csrf_cookie(request)) != csrf_cookie(request)
+    if response.status_code == 200 and not response.streaming and not fresh_token:
+        cache.set(key, (response.content, response['Content-Type']), settings.PAGE_CACHE_TIMEOUT)
+    return response
+
+
+def cache_per_user(view):
+    """Cache ``view``'s GET responses per user, role and query string for PAGE_CACHE_TIMEOUT."""
+    if iscoroutinefunction(view):
+        @wraps(view)
+        async def wrapper(request, *args, **kwargs):
+            key, cached = await sync_to_async(_lookup)(request)
+            if cached is not None:
+                return cached
+            response = await view(request, *args, **kwargs)
+            if key is None:
+                return response
+            return await sync_to_async(_store)(key, request, response)
+        return wrapper
+
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        key, cached = _lookup(request)
+        if cached is not None:
+            return cached
+        response = view(request, *args, **kwargs)
+        return response if key is None else _store(key, request, response)
+    return wrapper
+
+
+def cache_context(request):
+    return {
+        'cache_generation': SimpleLazyObject(lambda: request_generation(request)),
+        'FRAGMENT_CACHE_TIMEOUT': settings.FRAGMENT_CACHE_TIMEOUT,
+    }
@@ -0,0 +1,84 @@
+import hashlib
+import json
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS
+from . models import Goal
+from . statistics import GoalStatistics
+from . profiling import span
+from . rendering import ChartRenderer
+
+
+AGGREGATES_CACHE_KEY = 'goal_aggregates:{user_id}'
+# Goal writes invalidate the aggregates, but only in the cache of the process
+# that made them when the cache is per process, so they also expire.
+AGGREGATES_CACHE_TIMEOUT = 60 * 5
+CHART_CACHE_KEY = 'goal_chart:{chart}:{fingerprint}'
+CHART_CACHE_TIMEOUT = 60 * 60 * 24
+
+
+def goal_aggregates(user):
+    key = AGGREGATES_CACHE_KEY.format(user_id=user.pk)
+    aggregates = cache.get(key)
+    if aggregates is not None:
+        return aggregates
+    # Cached until the next goal write or the timeout, so never fill it from a lagging replica.
+    statistics = GoalStatistics.for_owner(user, using=DEFAULT_DB_ALIAS).compute()
+    aggregates = {
+        'priority': [[value, count] for value, count in statistics['priority'].items() if count],
+        'status': [[value, count] for value, count in statistics['status'].items() if count],
+        'progress': [statistics['progress'][1], statistics['progress'][3]],
+        'total': statistics['total'],
+    }
+    cache.set(key, aggregates, AGGREGATES_CACHE_TIMEOUT)
+    return aggregates
+
+
+def invalidate_goal_aggregates(user_id):
+    cache.delete(AGGREGATES_CACHE_KEY.format(user_id=user_id))
+
+
+def aggregates_fingerprint(aggregates):
+    payload = json.dumps(aggregates, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha1(payload.encode()).hexdigest()
+
+
+def chart_data(chart, aggregates):
+    if chart == 'priority':
+        choices = dict(Goal.PRIORITY_CHOICES)
+        rows = aggregates['priority']
+    elif chart == 'status':
+        choices = dict(Goal.GOAL_STATUS)
+        rows = aggregates['status']
+    else:
+        return ['In progress', 'On hold'], aggregates['progress']
+    labels = [str(choices[value])[2:] for value, _count in rows]
+    values = [count for _value, count in rows]
+    return labels, values
+
+
+def _store_chart(key, png):
+    cache.set(key, png, CHART_CACHE_TIMEOUT)
+
+
+renderer = ChartRenderer(
+    max_workers=settings.CHART_RENDER_WORKERS,
+    max_pending=settings.CHART_RENDER_QUEUE_SIZE,
+    on_done=_store_chart,
+)
+
+
+def request_chart(user, chart):
+    """Return PNG bytes of the user's chart, or None after queueing its render.
+
+    Charts are keyed by a fingerprint of the aggregates, so users with equal
+    aggregates share one render. Raises RenderQueueFull when the backlog is full.
+    """
+    with span('chart'):
+        aggregates = goal_aggregates(user)
+        key = CHART_CACHE_KEY.format(chart=chart, fingerprint=aggregates_fingerprint(aggregates))
+        png = cache.get(key)
+        if png is None:
+            labels, values = chart_data(chart, aggregates)
+            renderer.submit(key, chart, labels, values)
+    return png
@@ -0,0 +1,86 @@
+"""Conditional GET for list and detail pages.
+
+A page's ETag hashes the URL, the viewer, the viewer's cache generation
+(which changes with their roles, profile and login, i.e. the chrome) and a
+version token of the data shown: ``max(updated_at)`` and a row count for
+lists, ``updated_at`` for a single goal or review. Computing it is one
+indexed query at most, so a client revalidating an unchanged page gets a
+304 without the view querying the rest of its data or rendering a template.
+"""
+import hashlib
+from functools import wraps
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import quote_etag
+from . caching import has_pending_messages, request_generation
+
+
+def list_version(queryset):
+    """The version token of a list: its newest ``updated_at`` and its length, which catches deletions."""
+    row = queryset.order_by().aggregate(updated=Max('updated_at'), count=Count('pk'))
+    return row['updated'], row['count']
+
+
+def page_etag(request, version):
+    """Return the ETag of the page at ``request`` showing data at ``version``, or None if it must not get one."""
+    if request.method not in ('GET', 'HEAD') or has_pending_messages(request):
+        return None
+    parts = (request.get_full_path(), request.user.pk, request_generation(request), version)
+    return quote_etag(hashlib.md5(repr(parts).encode()).hexdigest())
+
+
+def not_modified(request, etag):
+    """Return a 304 (or 412) response if the client's copy matches ``etag``, else None."""
+    if etag is None:
+        return None
+    return get_conditional_response(request, etag=etag)
+
+
+def tag_response(response, etag):
+    if etag is not None and response.status_code == 200 and not response.streaming:
+        response['ETag'] = etag
+        patch_cache_control(response, private=True, no_cache=True)
+    return response
+
+
+def _etag(version, request, args, kwargs):
+    return page_etag(request, version(request, *args, **kwargs))
+
+
+def conditional_page(version):
+    """Answer conditional GETs of a function view; ``version(request, *args, **kwargs)`` returns its token."""
+    def decorator(view):
+        if iscoroutinefunction(view):
+            @wraps(view)
+            async def wrapper(request, *args, **kwargs):
+                etag = await sync_to_async(_etag)(version, request, args, kwargs)
+                response = not_modified(request, etag)
+                if response is not None:
+                    return response
+                return tag_response(await view(request, *args, **kwargs), etag)
+            return wrapper
+
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            etag = _etag(version, request, args, kwargs)
+            response = not_modified(request, etag)
+            if response is not None:
+                return response
+            return tag_response(view(request, *args, **kwargs), etag)
+        return wrapper
+    return decorator
+
+
+class ConditionalGetMixin:
+    """Answer conditional GETs of a class-based view from ``get_version()``."""
+
+    def get_version(self):
+        raise NotImplementedError
+
+    def get(self, request, *args, **kwargs):
+        etag = page_etag(request, self.get_version())
+        response = not_modified(request, etag)
+        if response is not None:
+            return response
+        return tag_response(super().get(request, *args, **kwargs), etag)
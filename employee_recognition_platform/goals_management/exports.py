@@ -0,0 +1,224 @@
+"""Streaming bulk export of reviews and goals as CSV, JSONL or Parquet.
+
+Rows are read with ``values_list(...).iterator(chunk_size=...)`` (a server-side
+cursor where the backend supports one), with employee, manager and owner names
+joined in the same query, and encoded one chunk at a time, so memory use does
+not grow with the size of the export. Parquet needs the optional ``pyarrow``
+package.
+"""
+import csv
+import datetime
+import json
+from django.db.models import Q
+from . models import Goal, Review
+from . search import strip_html
+
+
+class ExportError(Exception):
+    pass
+
+
+REVIEW_COLUMNS = (
+    ('id', 'id'),
+    ('created_date', 'created_date'),
+    ('employee_id', 'employee_id'),
+    ('employee_first_name', 'employee__first_name'),
+    ('employee_last_name', 'employee__last_name'),
+    ('manager_id', 'manager_id'),
+    ('manager_first_name', 'manager__first_name'),
+    ('manager_last_name', 'manager__last_name'),
+    ('department', 'manager__department'),
+    ('goals_review', 'goals_review'),
+    ('teamwork_review', 'teamwork_review'),
+    ('innovation_review', 'innovation_review'),
+    ('work_ethics_review', 'work_ethics_review'),
+    ('total_review', 'total_review'),
+    ('goals_achievment', 'goals_achievment'),
+    ('teamwork', 'teamwork'),
+    ('innovation', 'innovation'),
+    ('work_ethics', 'work_ethics'),
+)
+GOAL_COLUMNS = (
+    ('id', 'id'),
+    ('title', 'title'),
+    ('owner_id', 'owner_id'),
+    ('owner_username', 'owner__username'),
+    ('owner_first_name', 'owner__first_name'),
+    ('owner_last_name', 'owner__last_name'),
+    ('department', 'owner__employee__manager__department'),
+    ('start_date', 'start_date'),
+    ('end_date', 'end_date'),
+    ('priority', 'priority'),
+    ('status', 'status'),
+    ('progress', 'progress'),
+    ('description', 'description'),
+)
+HTML_COLUMNS = {'goals_achievment', 'teamwork', 'innovation', 'work_ethics', 'description'}
+FORMATS = {
+    'csv': 'text/csv',
+    'jsonl': 'application/x-ndjson',
+    'parquet': 'application/vnd.apache.parquet',
+}
+
+
+def review_queryset(date_from=None, date_to=None, department=None):
+    queryset = Review.objects.all()
+    if date_from:
+        queryset = queryset.filter(created_date__date__gte=date_from)
+    if date_to:
+        queryset = queryset.filter(created_date__date__lte=date_to)
+    if department:
+        queryset = queryset.filter(manager__department=department)
+    return queryset
+
+
+def goal_queryset(date_from=None, date_to=None, department=None):
+    queryset = Goal.objects.all()
+    if date_from:
+        queryset = queryset.filter(start_date__gte=date_from)
+    if date_to:
+        queryset = queryset.filter(start_date__lte=date_to)
+    if department:
+        queryset = queryset.filter(
+            Q(owner__employee__manager__department=department) | Q(owner__manager__department=department)
+        )
+    return queryset
+
+
+EXPORTS = {
+    'reviews': (Review, review_queryset, REVIEW_COLUMNS),
+    'goals': (Goal, goal_queryset, GOAL_COLUMNS),
+}
+
+
+def resolve_field(model, lookup):
+    *relations, name = lookup.split('__')
+    for relation in relations:
+        model = model._meta.get_field(relation).related_model
+    return model._meta.get_field(name)
+
+
+class Export:
+    """Column names and a lazy row iterator for one export ``kind``."""
+
+    def __init__(self, kind, date_from=None, date_to=None, department=None, chunk_size=2000):
+        if kind not in EXPORTS:
+            raise ExportError(f'Unknown export "{kind}".')
+        model, build_queryset, columns = EXPORTS[kind]
+        self.names = [name for name, _lookup in columns]
+        self.fields = [resolve_field(model, lookup) for _name, lookup in columns]
+        self.chunk_size = chunk_size
+        self.queryset = build_queryset(date_from, date_to, department).order_by('id').values_list(
+            *[lookup for _name, lookup in columns]
+        )
+
+    def rows(self):
+        html_positions = [position for position, name in enumerate(self.names) if name in HTML_COLUMNS]
+        for row in self.queryset.iterator(chunk_size=self.chunk_size):
+            row = list(row)
+            for position in html_positions:
+                row[position] = strip_html(row[position])
+            yield row
+
+
+def _json_value(value):
+    if isinstance(value, (datetime.date, datetime.datetime)):
+        return value.isoformat()
+    return value
+
+
+class _Echo:
+    def write(self, value):
+        return value
+
+
+def stream_csv(export):
+    writer = csv.writer(_Echo())
+    yield writer.writerow(export.names)
+    for row in export.rows():
+        yield writer.writerow(row)
+
+
+def stream_jsonl(export):
+    for row in export.rows():
+        yield json.dumps({name: _json_value(value) for name, value in zip(export.names, row)}) + '\n'
+
+
+class _ChunkSink:
+    """Write-only file object that hands written bytes back to a generator."""
+
+    def __init__(self):
+        self.chunks = []
+        self.position = 0
+        self.closed = False
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        self.position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self.position
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def drain(self):
+        data = b''.join(self.chunks)
+        self.chunks = []
+        return data
+
+
+def arrow_schema(export):
+    import pyarrow as pa
+    types = {
+        'DateField': pa.date32(),
+        'DateTimeField': pa.timestamp('us', tz='UTC'),
+        'CharField': pa.string(),
+        'EmailField': pa.string(),
+        'TextField': pa.string(),
+    }
+    return pa.schema([
+        (name, types.get(field.get_internal_type(), pa.int64()))
+        for name, field in zip(export.names, export.fields)
+    ])
+
+
+def stream_parquet(export, row_group_size=10000):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    schema = arrow_schema(export)
+    sink = _ChunkSink()
+    writer = pq.ParquetWriter(sink, schema)
+    batch = []
+    for row in export.rows():
+        batch.append(row)
+        if len(batch) >= row_group_size:
+            writer.write_table(pa.Table.from_pylist([dict(zip(export.names, row)) for row in batch], schema=schema))
+            batch = []
+            yield sink.drain()
+    if batch:
+        writer.write_table(pa.Table.from_pylist([dict(zip(export.names, row)) for row in batch], schema=schema))
+    writer.close()
+    yield sink.drain()
+
+
+STREAMERS = {
+    'csv': stream_csv,
+    'jsonl': stream_jsonl,
+    'parquet': stream_parquet,
+}
+
+
+def stream_export(format, export):
+    if format not in STREAMERS:
+        raise ExportError(f'Unknown format "{format}".')
+    if format == 'parquet':
+        try:
+            import pyarrow
+        except ImportError:
+            raise ExportError('Parquet export needs the pyarrow package.')
+    return STREAMERS[format](export)
@@ -1,5 +1,7 @@
 from django import forms
+from django.utils.translation import gettext_lazy as _
 from . import models
+from . search import REVIEW_TEXT_FIELDS
 
 
 class DateInput(forms.DateInput):
@@ -44,8 +46,80 @@ class GoalJournalForm(forms.ModelForm):
 
     class Meta:
         model = models.GoalJournal
-        fields = ('journal', 'goal', 'owner')
-        widgets = {
-            'goal': forms.HiddenInput(),
-            'owner': forms.HiddenInput(),
-        }
+        fields = ('journal',)
+
+
+class GoalBulkUpdateForm(forms.Form):
+    NO_CHANGE = [('', _('No change'))]
+
+    status = forms.TypedChoiceField(
+        label=_("status"), choices=NO_CHANGE + list(models.Goal.GOAL_STATUS), coerce=int, empty_value=None, required=False)
+    progress = forms.TypedChoiceField(
+        label=_("progress"), choices=NO_CHANGE + list(models.Goal.PROGRESS_CHOICES), coerce=int, empty_value=None, required=False)
+    priority = forms.TypedChoiceField(
+        label=_("priority"), choices=NO_CHANGE + list(models.Goal.PRIORITY_CHOICES), coerce=int, empty_value=None, required=False)
+
+    def clean(self):
+        cleaned_data = super().clean()
+        if all(value is None for value in cleaned_data.values()):
+            raise forms.ValidationError(_('Choose a status, progress or priority to apply.'))
+        return cleaned_data
+
+    def changes(self, goal_ids):
+        values = {name: value for name, value in self.cleaned_data.items() if value is not None}
+        return [{'id': goal_id, **values} for goal_id in goal_ids]
+
+
+class TeamReviewForm(forms.ModelForm):
+    """One row of the team review form; ``employee`` is a hidden id checked against the manager's team."""
+    employee = forms.TypedChoiceField(coerce=int, widget=forms.HiddenInput)
+
+    class Meta:
+        model = models.Review
+        fields = ('goals_achievment', 'goals_review', 'teamwork', 'teamwork_review', 'innovation', 'innovation_review', 'work_ethics', 'work_ethics_review', 'total_review')
+        widgets = {field: forms.Textarea(attrs={'rows': 3, 'class': 'small-input'}) for field in REVIEW_TEXT_FIELDS}
+
+    def __init__(self, *args, team=(), **kwargs):
+        super().__init__(*args, **kwargs)
+        self.team = {employee.pk: employee for employee in team}
+        self.fields['employee'].choices = [(pk, str(employee)) for pk, employee in self.team.items()]
+
+    @property
+    def team_member(self):
+        return self.team.get(self.initial.get('employee'))
+
+
+class BaseTeamReviewFormSet(forms.BaseFormSet):
+    """A review form per team member; rows left untouched are skipped."""
+
+    def __init__(self, *args, team=(), **kwargs):
+        self.team = list(team)
+        kwargs['initial'] = kwargs.get('initial') or [{'employee': employee.pk} for employee in self.team]
+        super().__init__(*args, **kwargs)
+
+    def get_form_kwargs(self, index):
+        return {'team': self.team, 'empty_permitted': True}
+
+    def filled_forms(self):
+        return [form for form in self.forms if form.has_changed()]
+
+    def clean(self):
+        if any(self.errors):
+            return
+        employees = [form.cleaned_data['employee'] for form in self.filled_forms()]
+        if not employees:
+            raise forms.ValidationError(_('Fill in the review of at least one team member.'))
+        if len(employees) != len(set(employees)):
+            raise forms.ValidationError(_('Each team member can only be reviewed once.'))
+
+    def reviews(self):
+        """The unsaved reviews of the filled rows, each with its employee set."""
+        reviews = []
+        for form in self.filled_forms():
+            review = form.save(commit=False)
+            review.employee = form.team[form.cleaned_data['employee']]
+            reviews.append(review)
+        return reviews
+
+
+TeamReviewFormSet = forms.formset_factory(TeamReviewForm, formset=BaseTeamReviewFormSet, extra=0)
@@ -0,0 +1,93 @@
+import statistics
+import time
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.test import Client
+from django.urls import reverse
+from goals_management.caching import invalidate_user_pages
+from goals_management.models import Goal
+
+
+class Rollback(Exception):
+    pass
+
+
+def p95(latencies):
+    if len(latencies) < 2:
+        return latencies[0] if latencies else 0.0
+    return statistics.quantiles(latencies, n=100, method='inclusive')[94]
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare the bytes and latency of reading a user's goals from the goal list page and from the JSON "
+        'API, with every field and with a sparse fieldset. The goals are created in a transaction that is '
+        'rolled back.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--goals', type=int, default=500)
+        parser.add_argument('--repeat', type=int, default=20)
+        parser.add_argument('--limit', type=int, default=200, help='API page size.')
+        parser.add_argument('--fields', default='id,status,progress', help='The sparse fieldset.')
+
+    def seed(self, user, size):
+        statuses = [value for value, _label in Goal.GOAL_STATUS]
+        priorities = [value for value, _label in Goal.PRIORITY_CHOICES]
+        progresses = [value for value, _label in Goal.PROGRESS_CHOICES]
+        Goal.objects.bulk_create([
+            Goal(
+                title=f'Benchmark goal {i}', description=f'<p>Deliver milestone {i}</p>', owner=user,
+                status=statuses[i % len(statuses)], priority=priorities[i % len(priorities)],
+                progress=progresses[i % len(progresses)],
+            )
+            for i in range(size)
+        ])
+
+    def read_page(self, client, user):
+        invalidate_user_pages(user.pk)
+        return [client.get(reverse('goal_list'))]
+
+    def read_api(self, client, params):
+        responses, params = [], dict(params)
+        while True:
+            response = client.get(reverse('api_collection', kwargs={'resource': 'goals'}), params)
+            responses.append(response)
+            cursor = response.json()['next_cursor']
+            if not cursor:
+                return responses
+            params['cursor'] = cursor
+
+    def measure(self, read, repeat):
+        read()
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            responses = read()
+            timings.append((time.perf_counter() - started) * 1000)
+        return sum(len(response.content) for response in responses), len(responses), timings
+
+    def handle(self, *args, **options):
+        host = next((host for host in settings.ALLOWED_HOSTS if host != '*' and not host.startswith('.')), 'localhost')
+        client = Client(HTTP_HOST=host)
+        variants = (
+            ('goal_list page', lambda user: self.read_page(client, user)),
+            ('api all fields', lambda user: self.read_api(client, {'limit': options['limit']})),
+            ('api sparse', lambda user: self.read_api(client, {'limit': options['limit'], 'fields': options['fields']})),
+        )
+        self.stdout.write(f"{'variant':<16} {'requests':>8} {'bytes':>10} {'median ms':>10} {'p95 ms':>10}")
+        try:
+            with transaction.atomic():
+                user = get_user_model().objects.create(username='benchmark-api')
+                self.seed(user, options['goals'])
+                client.force_login(user)
+                for name, read in variants:
+                    size, requests, timings = self.measure(lambda: read(user), options['repeat'])
+                    self.stdout.write(
+                        f'{name:<16} {requests:>8} {size:>10} {statistics.median(timings):>10.1f} {p95(timings):>10.1f}'
+                    )
+                raise Rollback
+        except Rollback:
+            pass
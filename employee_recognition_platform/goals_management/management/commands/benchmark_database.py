@@ -0,0 +1,121 @@
+import json
+import os
+import random
+import statistics
+import subprocess
+import sys
+import threading
+import time
+import uuid
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DatabaseError, connection
+from employee_recognition_platform.databases import PROFILES
+from goals_management.models import Goal, GoalJournal
+from goals_management.views import goal_list_queryset, journal_timeline
+
+
+def p95(latencies):
+    if len(latencies) < 2:
+        return latencies[0] if latencies else 0.0
+    return statistics.quantiles(latencies, n=100, method='inclusive')[94]
+
+
+class Command(BaseCommand):
+    help = (
+        'Run mixed read/write traffic (goal list and journal timeline reads, journal posts) from several '
+        'threads against each DATABASE_PROFILE and compare throughput, p95 latency and lock errors. '
+        'Every profile must point at a migrated database; the rows written are removed afterwards.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--profiles', nargs='+', choices=PROFILES, default=['sqlite-legacy', 'sqlite'])
+        parser.add_argument('--threads', type=int, default=8)
+        parser.add_argument('--duration', type=float, default=10.0)
+        parser.add_argument('--write-ratio', type=float, default=0.2)
+        parser.add_argument('--goals', type=int, default=20)
+        parser.add_argument('--run', action='store_true', help='Measure the current profile and print JSON.')
+
+    def handle(self, *args, **options):
+        if options['run']:
+            self.stdout.write(json.dumps(self.run(options)))
+            return
+        self.stdout.write(
+            f"{'profile':<14} {'threads':>7} {'reads/s':>9} {'writes/s':>9} "
+            f"{'read p95':>9} {'write p95':>10} {'errors':>7}"
+        )
+        for profile in options['profiles']:
+            command = [
+                sys.executable, 'manage.py', 'benchmark_database', '--run',
+                '--threads', str(options['threads']), '--duration', str(options['duration']),
+                '--write-ratio', str(options['write_ratio']), '--goals', str(options['goals']),
+            ]
+            result = subprocess.run(
+                command, cwd=settings.BASE_DIR, capture_output=True, text=True,
+                env={**os.environ, 'DATABASE_PROFILE': profile},
+            )
+            if result.returncode:
+                raise CommandError(f'{profile} run failed:\n{result.stderr}')
+            row = json.loads(result.stdout.strip().splitlines()[-1])
+            self.stdout.write(
+                f"{profile:<14} {options['threads']:>7} {row['reads_per_second']:>9.1f} "
+                f"{row['writes_per_second']:>9.1f} {row['read_p95_ms']:>9.1f} {row['write_p95_ms']:>10.1f} "
+                f"{row['errors']:>7}"
+            )
+
+    def run(self, options):
+        user = get_user_model().objects.create(username=f'benchmark-database-{uuid.uuid4().hex[:12]}')
+        try:
+            goal_ids = [
+                goal.pk for goal in Goal.objects.bulk_create(
+                    [Goal(owner=user, title=f'Benchmark goal {i}') for i in range(options['goals'])]
+                )
+            ]
+            if not goal_ids or goal_ids[0] is None:
+                goal_ids = list(Goal.objects.filter(owner=user).values_list('pk', flat=True))
+            connection.close()
+            reads, writes, errors = [], [], []
+            deadline = time.perf_counter() + options['duration']
+            lock = threading.Lock()
+
+            def worker():
+                local_reads, local_writes, local_errors = [], [], 0
+                try:
+                    while time.perf_counter() < deadline:
+                        write = random.random() < options['write_ratio']
+                        started = time.perf_counter()
+                        try:
+                            if write:
+                                GoalJournal.objects.create(
+                                    goal_id=random.choice(goal_ids), owner=user, journal='Benchmark progress note',
+                                )
+                            else:
+                                list(goal_list_queryset(user)[:50])
+                                journal_timeline(random.choice(goal_ids))
+                        except DatabaseError:
+                            local_errors += 1
+                            continue
+                        elapsed = (time.perf_counter() - started) * 1000
+                        (local_writes if write else local_reads).append(elapsed)
+                finally:
+                    connection.close()
+                with lock:
+                    reads.extend(local_reads)
+                    writes.extend(local_writes)
+                    errors.append(local_errors)
+
+            threads = [threading.Thread(target=worker) for _ in range(options['threads'])]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        finally:
+            user.delete()
+        return {
+            'reads_per_second': len(reads) / options['duration'],
+            'writes_per_second': len(writes) / options['duration'],
+            'read_p95_ms': p95(reads),
+            'write_p95_ms': p95(writes),
+            'errors': sum(errors),
+        }
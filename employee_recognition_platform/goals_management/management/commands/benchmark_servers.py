@@ -0,0 +1,142 @@
+import asyncio
+import importlib.util
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+from django.conf import settings
+from django.contrib.auth import BACKEND_SESSION_KEY, HASH_SESSION_KEY, SESSION_KEY, get_user_model
+from django.contrib.sessions.backends.db import SessionStore
+from django.core.management.base import BaseCommand, CommandError
+from django.urls import reverse
+
+
+ENDPOINTS = {
+    'goal_list': ('goal_list', ''),
+    'review_list': ('review_list', ''),
+    'search': ('search', '?query=goal'),
+    'statistics_data': ('statistics_data', ''),
+    'profile': ('profile', ''),
+}
+SERVERS = {
+    'asgi': ('uvicorn', lambda port, workers: [
+        sys.executable, '-m', 'uvicorn', 'employee_recognition_platform.asgi:application',
+        '--port', str(port), '--workers', str(workers), '--no-access-log', '--log-level', 'warning',
+    ]),
+    'wsgi': ('gunicorn', lambda port, workers: [
+        sys.executable, '-m', 'gunicorn', 'employee_recognition_platform.wsgi:application',
+        '--bind', f'127.0.0.1:{port}', '--workers', str(workers), '--threads', '4', '--log-level', 'warning',
+    ]),
+}
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+async def fetch(port, path, cookie):
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    try:
+        writer.write(
+            f'GET {path} HTTP/1.1\r\nHost: localhost\r\nCookie: {cookie}\r\nConnection: close\r\n\r\n'.encode()
+        )
+        await writer.drain()
+        status_line = await reader.readline()
+        await reader.read()
+        return int(status_line.split()[1])
+    finally:
+        writer.close()
+
+
+async def load(port, path, cookie, concurrency, duration):
+    """Keep ``concurrency`` requests in flight for ``duration`` seconds; return latencies and errors."""
+    latencies, errors = [], 0
+    deadline = time.perf_counter() + duration
+
+    async def client():
+        nonlocal errors
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            try:
+                status = await fetch(port, path, cookie)
+            except (OSError, IndexError, ValueError):
+                status = None
+            if status == 200:
+                latencies.append((time.perf_counter() - started) * 1000)
+            else:
+                errors += 1
+
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    return latencies, errors
+
+
+class Command(BaseCommand):
+    help = (
+        'Load-test the read endpoints under uvicorn (ASGI) and gunicorn (WSGI) and compare requests per '
+        'second and latency at rising concurrency. Needs the uvicorn and gunicorn packages.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--username', required=True, help='Existing user the requests are made as.')
+        parser.add_argument('--servers', nargs='+', choices=sorted(SERVERS), default=sorted(SERVERS))
+        parser.add_argument('--endpoints', nargs='+', choices=sorted(ENDPOINTS), default=sorted(ENDPOINTS))
+        parser.add_argument('--concurrency', nargs='+', type=int, default=[1, 10, 50, 100])
+        parser.add_argument('--duration', type=float, default=10.0, help='Seconds per measurement.')
+        parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+
+    def session_cookie(self, username):
+        try:
+            user = get_user_model().objects.get(username=username)
+        except get_user_model().DoesNotExist:
+            raise CommandError(f'No user "{username}".')
+        session = SessionStore()
+        session[SESSION_KEY] = str(user.pk)
+        session[BACKEND_SESSION_KEY] = settings.AUTHENTICATION_BACKENDS[0]
+        session[HASH_SESSION_KEY] = user.get_session_auth_hash()
+        session.create()
+        return f'{settings.SESSION_COOKIE_NAME}={session.session_key}'
+
+    def start(self, server, workers):
+        module, command = SERVERS[server]
+        if importlib.util.find_spec(module) is None:
+            raise CommandError(f'{server} benchmark needs the {module} package.')
+        port = free_port()
+        process = subprocess.Popen(command(port, workers), cwd=settings.BASE_DIR)
+        for _ in range(100):
+            try:
+                socket.create_connection(('127.0.0.1', port), timeout=0.1).close()
+                return process, port
+            except OSError:
+                time.sleep(0.1)
+        process.terminate()
+        raise CommandError(f'{server} server did not start.')
+
+    def handle(self, *args, **options):
+        cookie = self.session_cookie(options['username'])
+        self.stdout.write(
+            f"{'server':<6} {'endpoint':<16} {'clients':>7} {'req/s':>9} {'p50 ms':>9} {'p99 ms':>9} {'errors':>7}"
+        )
+        for server in options['servers']:
+            process, port = self.start(server, options['workers'])
+            try:
+                for endpoint in options['endpoints']:
+                    name, query = ENDPOINTS[endpoint]
+                    path = reverse(name) + query
+                    for concurrency in options['concurrency']:
+                        latencies, errors = asyncio.run(load(port, path, cookie, concurrency, options['duration']))
+                        rps = len(latencies) / options['duration']
+                        if len(latencies) > 1:
+                            cuts = statistics.quantiles(latencies, n=100, method='inclusive')
+                            p50, p99 = cuts[49], cuts[98]
+                        else:
+                            p50 = p99 = latencies[0] if latencies else 0.0
+                        self.stdout.write(
+                            f'{server:<6} {endpoint:<16} {concurrency:>7} {rps:>9.1f} {p50:>9.1f} {p99:>9.1f} {errors:>7}'
+                        )
+            finally:
+                process.terminate()
+                process.wait()
@@ -0,0 +1,79 @@
+import random
+import time
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection, models, transaction
+from django.test.utils import CaptureQueriesContext
+from goals_management.models import Goal
+from goals_management.statistics import GoalStatistics
+
+
+class Rollback(Exception):
+    pass
+
+
+def legacy_statistics(user):
+    goals = Goal.objects.filter(owner=user)
+    priority_counts = list(goals.values('priority').annotate(count=models.Count('priority')))
+    status_counts = list(goals.values('status').annotate(count=models.Count('status')))
+    in_progress_goals = goals.filter(status=1)
+    on_hold_goals = goals.filter(status=3)
+    in_progress_progress_sum = in_progress_goals.aggregate(progress_sum=models.Sum('progress'))['progress_sum']
+    on_hold_progress_sum = on_hold_goals.aggregate(progress_sum=models.Sum('progress'))['progress_sum']
+    total_in_progress_goals = in_progress_goals.count()
+    total_on_hold_goals = on_hold_goals.count()
+    total_goals = Goal.objects.filter(owner=user).count()
+    return priority_counts, status_counts, in_progress_progress_sum, on_hold_progress_sum, \
+        total_in_progress_goals, total_on_hold_goals, total_goals
+
+
+class Command(BaseCommand):
+    help = 'Compare query count and wall time of GoalStatistics against the per-breakdown queries it replaced.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', nargs='+', type=int, default=[10_000, 100_000, 1_000_000])
+        parser.add_argument('--repeat', type=int, default=5)
+        parser.add_argument('--batch-size', type=int, default=5_000)
+
+    def measure(self, func, user, repeat):
+        with CaptureQueriesContext(connection) as queries:
+            func(user)
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            func(user)
+            timings.append(time.perf_counter() - started)
+        return len(queries), min(timings) * 1000
+
+    def seed(self, user, size, batch_size):
+        statuses = [value for value, _label in Goal.GOAL_STATUS]
+        priorities = [value for value, _label in Goal.PRIORITY_CHOICES]
+        progresses = [value for value, _label in Goal.PROGRESS_CHOICES]
+        for offset in range(0, size, batch_size):
+            Goal.objects.bulk_create([
+                Goal(
+                    title=f'Benchmark goal {offset + i}',
+                    owner=user,
+                    status=random.choice(statuses),
+                    priority=random.choice(priorities),
+                    progress=random.choice(progresses),
+                )
+                for i in range(min(batch_size, size - offset))
+            ])
+
+    def handle(self, *args, **options):
+        self.stdout.write(f"{'goals':>10} {'variant':<16} {'queries':>8} {'best ms':>10}")
+        for size in options['sizes']:
+            try:
+                with transaction.atomic():
+                    user = get_user_model().objects.create(username=f'benchmark-statistics-{size}')
+                    self.seed(user, size, options['batch_size'])
+                    for name, func in (
+                        ('legacy', legacy_statistics),
+                        ('GoalStatistics', lambda user: GoalStatistics.for_owner(user).compute()),
+                    ):
+                        query_count, best = self.measure(func, user, options['repeat'])
+                        self.stdout.write(f'{size:>10} {name:<16} {query_count:>8} {best:>10.1f}')
+                    raise Rollback
+            except Rollback:
+                pass
@@ -0,0 +1,37 @@
+from collections import Counter
+from pathlib import Path
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from goals_management.profiling import read_log
+
+
+class Command(BaseCommand):
+    help = (
+        'Report cache hit rates per key namespace (page.<view>, template.cache.<fragment>, user_roles, ...) '
+        'from the request profiling log; run the server with REQUEST_PROFILING = True to collect them.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--log', default=None, help='Defaults to REQUEST_PROFILING_LOG (rotated files included).')
+        parser.add_argument('--url-name', default=None, help='Only count requests to this URL name.')
+
+    def handle(self, *args, **options):
+        path = Path(options['log'] or settings.REQUEST_PROFILING_LOG)
+        hits, misses = Counter(), Counter()
+        for record in read_log(path):
+            if options['url_name'] and record.get('url_name') != options['url_name']:
+                continue
+            for namespace, counts in (record.get('cache') or {}).items():
+                hits[namespace] += counts['hits']
+                misses[namespace] += counts['misses']
+        if not hits and not misses:
+            raise CommandError(f'No cache lookups in {path}.')
+        namespaces = sorted(hits.keys() | misses.keys(), key=lambda name: hits[name] + misses[name], reverse=True)
+        width = max(len(name) for name in namespaces + ['total'])
+        self.stdout.write(f'{"namespace":<{width}}  {"lookups":>8}  {"hits":>8}  {"misses":>8}  {"hit rate":>8}')
+        for name in namespaces + ['total']:
+            if name == 'total':
+                hit, miss = sum(hits.values()), sum(misses.values())
+            else:
+                hit, miss = hits[name], misses[name]
+            self.stdout.write(f'{name:<{width}}  {hit + miss:>8}  {hit:>8}  {miss:>8}  {hit / (hit + miss):>8.1%}')
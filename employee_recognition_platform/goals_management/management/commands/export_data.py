@@ -0,0 +1,41 @@
+import sys
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.dateparse import parse_date
+from goals_management.exports import EXPORTS, FORMATS, Export, ExportError, stream_export
+
+
+class Command(BaseCommand):
+    help = 'Stream every review or goal to CSV, JSONL or Parquet without loading them into memory.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('kind', choices=sorted(EXPORTS))
+        parser.add_argument('--format', choices=sorted(FORMATS), default='csv')
+        parser.add_argument('--output', default='-', help='Output file, or - for stdout.')
+        parser.add_argument('--from', dest='date_from', type=parse_date, help='YYYY-MM-DD, inclusive.')
+        parser.add_argument('--to', dest='date_to', type=parse_date, help='YYYY-MM-DD, inclusive.')
+        parser.add_argument('--department')
+        parser.add_argument('--chunk-size', type=int, default=2000)
+
+    def handle(self, *args, **options):
+        try:
+            export = Export(
+                options['kind'],
+                date_from=options['date_from'],
+                date_to=options['date_to'],
+                department=options['department'],
+                chunk_size=options['chunk_size'],
+            )
+            chunks = stream_export(options['format'], export)
+        except ExportError as error:
+            raise CommandError(error)
+        binary = options['format'] == 'parquet'
+        if options['output'] == '-':
+            output = sys.stdout.buffer if binary else sys.stdout
+        else:
+            output = open(options['output'], 'wb' if binary else 'w', newline=None if binary else '')
+        try:
+            for chunk in chunks:
+                output.write(chunk)
+        finally:
+            if options['output'] != '-':
+                output.close()
@@ -0,0 +1,39 @@
+import statistics
+from collections import defaultdict
+from pathlib import Path
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from goals_management.profiling import read_log
+
+
+def percentile_table(values):
+    if len(values) == 1:
+        return values * 3
+    cuts = statistics.quantiles(values, n=100, method='inclusive')
+    return [cuts[49], cuts[94], cuts[98]]
+
+
+class Command(BaseCommand):
+    help = 'Summarise the request profiling log into p50/p95/p99 per URL name.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--log', default=None, help='Defaults to REQUEST_PROFILING_LOG (rotated files included).')
+        parser.add_argument(
+            '--metric', default='total_ms',
+            help='Numeric field to summarise, e.g. total_ms, sql_ms, sql_count, template_ms or chart_ms.',
+        )
+
+    def handle(self, *args, **options):
+        path = Path(options['log'] or settings.REQUEST_PROFILING_LOG)
+        metric = options['metric']
+        samples = defaultdict(list)
+        for record in read_log(path):
+            samples[record.get('url_name') or record.get('path')].append(record.get(metric) or 0)
+        if not samples:
+            raise CommandError(f'No profiled requests in {path}.')
+        width = max(len(name) for name in samples)
+        self.stdout.write(f'{"url name":<{width}}  {"requests":>8}  {"p50":>9}  {"p95":>9}  {"p99":>9}  ({metric})')
+        rows = sorted(samples.items(), key=lambda item: percentile_table(item[1])[1], reverse=True)
+        for name, values in rows:
+            p50, p95, p99 = percentile_table(values)
+            self.stdout.write(f'{name:<{width}}  {len(values):>8}  {p50:>9.2f}  {p95:>9.2f}  {p99:>9.2f}')
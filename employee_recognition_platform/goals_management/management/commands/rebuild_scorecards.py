@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+from goals_management.scorecards import rebuild_scorecards
+
+
+class Command(BaseCommand):
+    help = 'Rebuild every employee review scorecard from the Review table.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        total = rebuild_scorecards(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt {total} scorecards.'))
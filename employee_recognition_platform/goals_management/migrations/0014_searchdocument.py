@@ -0,0 +1,77 @@
+# Generated by Django 4.2.2 on 2026-10-18 15:11
+
+from django.db import migrations, models
+
+
+SQLITE_FORWARD = [
+    """CREATE VIRTUAL TABLE goals_management_searchdocument_fts USING fts5(
+        title, body,
+        content='goals_management_searchdocument', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )""",
+    """CREATE TRIGGER goals_management_searchdocument_ai AFTER INSERT ON goals_management_searchdocument BEGIN
+        INSERT INTO goals_management_searchdocument_fts(rowid, title, body) VALUES (new.id, new.title, new.body);
+    END""",
+    """CREATE TRIGGER goals_management_searchdocument_ad AFTER DELETE ON goals_management_searchdocument BEGIN
+        INSERT INTO goals_management_searchdocument_fts(goals_management_searchdocument_fts, rowid, title, body)
+        VALUES ('delete', old.id, old.title, old.body);
+    END""",
+    """CREATE TRIGGER goals_management_searchdocument_au AFTER UPDATE ON goals_management_searchdocument BEGIN
+        INSERT INTO goals_management_searchdocument_fts(goals_management_searchdocument_fts, rowid, title, body)
+        VALUES ('delete', old.id, old.title, old.body);
+        INSERT INTO goals_management_searchdocument_fts(rowid, title, body) VALUES (new.id, new.title, new.body);
+    END""",
+]
+SQLITE_REVERSE = [
+    "DROP TRIGGER IF EXISTS goals_management_searchdocument_au",
+    "DROP TRIGGER IF EXISTS goals_management_searchdocument_ad",
+    "DROP TRIGGER IF EXISTS goals_management_searchdocument_ai",
+    "DROP TABLE IF EXISTS goals_management_searchdocument_fts",
+]
+POSTGRESQL_FORWARD = [
+    """CREATE INDEX goals_management_searchdocument_vector ON goals_management_searchdocument
+        USING GIN (to_tsvector('english'::regconfig, COALESCE(title, '') || ' ' || COALESCE(body, '')))""",
+]
+POSTGRESQL_REVERSE = [
+    "DROP INDEX IF EXISTS goals_management_searchdocument_vector",
+]
+
+
+def run_vendor_sql(statements):
+    def run(apps, schema_editor):
+        for statement in statements.get(schema_editor.connection.vendor, []):
+            schema_editor.execute(statement)
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('goals_management', '0013_alter_review_created_date'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SearchDocument',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('goal', 'Goal'), ('review', 'Review'), ('journal', 'Goal journal')], max_length=10, verbose_name='kind')),
+                ('object_id', models.PositiveBigIntegerField(verbose_name='object id')),
+                ('target_id', models.PositiveBigIntegerField(verbose_name='target id')),
+                ('title', models.CharField(blank=True, max_length=255, verbose_name='title')),
+                ('body', models.TextField(blank=True, verbose_name='body')),
+            ],
+            options={
+                'verbose_name': 'search document',
+                'verbose_name_plural': 'search documents',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='searchdocument',
+            constraint=models.UniqueConstraint(fields=('kind', 'object_id'), name='unique_search_document'),
+        ),
+        migrations.RunPython(
+            run_vendor_sql({'sqlite': SQLITE_FORWARD, 'postgresql': POSTGRESQL_FORWARD}),
+            run_vendor_sql({'sqlite': SQLITE_REVERSE, 'postgresql': POSTGRESQL_REVERSE}),
+        ),
+    ]
@@ -0,0 +1,73 @@
+# Generated by Django 4.2.2 on 2026-10-18 15:13
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import tinymce.models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('goals_management', '0015_searchdocument_readers'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='goal',
+            name='description',
+            field=tinymce.models.HTMLField(blank=True, max_length=2000, null=True, verbose_name='description'),
+        ),
+        migrations.AlterField(
+            model_name='goal',
+            name='owner',
+            field=models.ForeignKey(blank=True, db_index=False, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='goal_owner', to=settings.AUTH_USER_MODEL, verbose_name='owner'),
+        ),
+        migrations.AlterField(
+            model_name='review',
+            name='employee',
+            field=models.ForeignKey(blank=True, db_index=False, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='rewiews', to='goals_management.employee', verbose_name='employee'),
+        ),
+        migrations.AlterField(
+            model_name='review',
+            name='goals_achievment',
+            field=tinymce.models.HTMLField(blank=True, max_length=2000, null=True, verbose_name='goals achievment'),
+        ),
+        migrations.AlterField(
+            model_name='review',
+            name='innovation',
+            field=tinymce.models.HTMLField(blank=True, max_length=2000, null=True, verbose_name='innovation'),
+        ),
+        migrations.AlterField(
+            model_name='review',
+            name='manager',
+            field=models.ForeignKey(blank=True, db_index=False, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='reviews_manager', to='goals_management.manager', verbose_name='manager'),
+        ),
+        migrations.AlterField(
+            model_name='review',
+            name='teamwork',
+            field=tinymce.models.HTMLField(blank=True, max_length=2000, null=True, verbose_name='teamwork'),
+        ),
+        migrations.AlterField(
+            model_name='review',
+            name='work_ethics',
+            field=tinymce.models.HTMLField(blank=True, max_length=2000, null=True, verbose_name='work ethics'),
+        ),
+        migrations.AddIndex(
+            model_name='goal',
+            index=models.Index(fields=['owner', 'status'], name='goal_owner_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='goal',
+            index=models.Index(fields=['owner', 'priority', 'start_date'], name='goal_owner_priority_start_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='review',
+            index=models.Index(fields=['manager', 'created_date'], name='review_manager_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='review',
+            index=models.Index(fields=['employee', 'created_date'], name='review_employee_created_idx'),
+        ),
+    ]
@@ -0,0 +1,44 @@
+# Generated by Django 4.2.2 on 2026-10-18 15:16
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('goals_management', '0016_list_view_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EmployeeScorecard',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('year', models.PositiveSmallIntegerField(verbose_name='year')),
+                ('review_count', models.PositiveIntegerField(default=0, verbose_name='review count')),
+                ('goals_avg', models.FloatField(default=0, verbose_name='goals review average')),
+                ('teamwork_avg', models.FloatField(default=0, verbose_name='teamwork review average')),
+                ('innovation_avg', models.FloatField(default=0, verbose_name='innovation review average')),
+                ('work_ethics_avg', models.FloatField(default=0, verbose_name='work ethics review average')),
+                ('total_avg', models.FloatField(default=0, verbose_name='total review average')),
+                ('overall_avg', models.FloatField(default=0, verbose_name='overall average')),
+                ('latest_review_date', models.DateTimeField(blank=True, null=True, verbose_name='latest review date')),
+                ('latest_goals_review', models.PositiveSmallIntegerField(choices=[(0, '🔴 Nearly Meets Expectations'), (8, '🟡 Meets Expectations'), (15, '🟢 Exceeds Expectations')], default=0, verbose_name='latest goals review')),
+                ('latest_teamwork_review', models.PositiveSmallIntegerField(choices=[(0, '🔴 Nearly Meets Expectations'), (8, '🟡 Meets Expectations'), (15, '🟢 Exceeds Expectations')], default=0, verbose_name='latest teamwork review')),
+                ('latest_innovation_review', models.PositiveSmallIntegerField(choices=[(0, '🔴 Nearly Meets Expectations'), (8, '🟡 Meets Expectations'), (15, '🟢 Exceeds Expectations')], default=0, verbose_name='latest innovation review')),
+                ('latest_work_ethics_review', models.PositiveSmallIntegerField(choices=[(0, '🔴 Nearly Meets Expectations'), (8, '🟡 Meets Expectations'), (15, '🟢 Exceeds Expectations')], default=0, verbose_name='latest work ethics review')),
+                ('latest_total_review', models.PositiveSmallIntegerField(choices=[(0, '🔴 Nearly Meets Expectations'), (8, '🟡 Meets Expectations'), (15, '🟢 Exceeds Expectations')], default=0, verbose_name='latest total review')),
+                ('employee', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='scorecards', to='goals_management.employee', verbose_name='employee')),
+            ],
+            options={
+                'verbose_name': 'employee scorecard',
+                'verbose_name_plural': 'employee scorecards',
+                'ordering': ['-year'],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='employeescorecard',
+            constraint=models.UniqueConstraint(fields=('employee', 'year'), name='unique_employee_scorecard_year'),
+        ),
+    ]
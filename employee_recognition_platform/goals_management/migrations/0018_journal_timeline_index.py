@@ -0,0 +1,23 @@
+# Generated by Django 4.2.2 on 2026-10-18 15:32
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('goals_management', '0017_employeescorecard'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='goaljournal',
+            index=models.Index(fields=['goal', '-journal_date', '-id'], name='journal_goal_date_idx'),
+        ),
+        migrations.AlterField(
+            model_name='goaljournal',
+            name='goal',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='journals', to='goals_management.goal', verbose_name='goal'),
+        ),
+    ]
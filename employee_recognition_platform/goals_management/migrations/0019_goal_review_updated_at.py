@@ -0,0 +1,34 @@
+# Generated by Django 4.2.2 on 2026-10-18 16:40
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('goals_management', '0018_journal_timeline_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='goal',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, default=django.utils.timezone.now, verbose_name='updated at'),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='review',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, default=django.utils.timezone.now, verbose_name='updated at'),
+            preserve_default=False,
+        ),
+        migrations.AddIndex(
+            model_name='goal',
+            index=models.Index(fields=['owner', 'updated_at'], name='goal_owner_updated_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='review',
+            index=models.Index(fields=['employee', 'updated_at'], name='review_employee_updated_idx'),
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 4.2.2 on 2026-10-18 15:53
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('goals_management', '0019_goal_review_updated_at'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GoalBatchUpdate',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='created at')),
+                ('goal_count', models.PositiveIntegerField(default=0, verbose_name='goal count')),
+                ('changes', models.JSONField(default=list, verbose_name='changes')),
+                ('owner', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='goal_batch_updates', to=settings.AUTH_USER_MODEL, verbose_name='owner')),
+            ],
+            options={
+                'verbose_name': 'goal batch update',
+                'verbose_name_plural': 'goal batch updates',
+                'ordering': ['-created_at'],
+            },
+        ),
+    ]
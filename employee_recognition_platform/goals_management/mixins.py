@@ -0,0 +1,16 @@
+class MemoizedObjectMixin:
+    """Resolve a detail view's object once per request.
+
+    Django's generic views call ``get_object()`` from ``get``/``post``, and
+    overrides of ``get_initial``, ``test_func`` or ``get_success_url`` tend to
+    call it again; each call is another query. The first result is kept, so
+    put ``select_related``/``prefetch_related`` in ``get_queryset`` and every
+    caller shares the one fetch.
+    """
+
+    def get_object(self, queryset=None):
+        if queryset is not None:
+            return super().get_object(queryset)
+        if not hasattr(self, '_memoized_object'):
+            self._memoized_object = super().get_object()
+        return self._memoized_object
@@ -93,7 +93,7 @@ class Employee(models.Model):
     
 class Goal(models.Model):
     title = models.CharField(_("title"), max_length=150, db_index=True, blank=True, null=True)
-    description = HTMLField(_("description"), max_length=2000, db_index=True, blank=True, null=True)
+    description = HTMLField(_("description"), max_length=2000, blank=True, null=True)
     start_date = models.DateField(_("start date"), auto_now=False, auto_now_add=False, default= now)
     end_date = models.DateField(_("end date"), auto_now=False, null=True, blank=True)
     owner = models.ForeignKey(
@@ -102,6 +102,7 @@ class Goal(models.Model):
         on_delete=models.CASCADE,
         related_name="goal_owner",
         null=True, blank=True,
+        db_index=False,
         )
 
     PRIORITY_CHOICES = (
@@ -147,10 +148,16 @@ class Goal(models.Model):
         default=0,
         db_index=True
     )
+    updated_at = models.DateTimeField(_("updated at"), auto_now=True)
 
     class Meta:
         verbose_name = _("goal")
         verbose_name_plural = _("goals")
+        indexes = [
+            models.Index(fields=['owner', 'status'], name='goal_owner_status_idx'),
+            models.Index(fields=['owner', 'priority', 'start_date'], name='goal_owner_priority_start_idx'),
+            models.Index(fields=['owner', 'updated_at'], name='goal_owner_updated_idx'),
+        ]
 
     def __str__(self):
         status = dict(Goal.GOAL_STATUS)[self.status]
@@ -170,28 +177,28 @@ class Review(models.Model):
         (15, _('\U0001F7E2 Exceeds Expectations')),
     )
     created_date = models.DateTimeField(_("created date"), auto_now=False, auto_now_add=False, default=now)
-    goals_achievment = HTMLField(_("goals achievment"), max_length=2000, db_index=True, blank=True, null=True)
+    goals_achievment = HTMLField(_("goals achievment"), max_length=2000, blank=True, null=True)
     goals_review = models.PositiveSmallIntegerField(
         _("goals review"), 
         choices=SCORE_CHOICES, 
         default=0,
         db_index=True
     )
-    teamwork = HTMLField(_("teamwork"), max_length=2000, db_index=True, blank=True, null=True)
+    teamwork = HTMLField(_("teamwork"), max_length=2000, blank=True, null=True)
     teamwork_review = models.PositiveSmallIntegerField(
         _("teamwork review"), 
         choices=SCORE_CHOICES, 
         default=0,
         db_index=True
     )
-    innovation = HTMLField(_("innovation"), max_length=2000, db_index=True, blank=True, null=True)
+    innovation = HTMLField(_("innovation"), max_length=2000, blank=True, null=True)
     innovation_review = models.PositiveSmallIntegerField(
         _("innovation review"), 
         choices=SCORE_CHOICES, 
         default=0,
         db_index=True
     )
-    work_ethics = HTMLField(_("work ethics"), max_length=2000, db_index=True, blank=True, null=True)
+    work_ethics = HTMLField(_("work ethics"), max_length=2000, blank=True, null=True)
     work_ethics_review = models.PositiveSmallIntegerField(
         _("work ethics review"), 
         choices=SCORE_CHOICES, 
@@ -210,6 +217,7 @@ class Review(models.Model):
         on_delete=models.CASCADE,
         related_name="reviews_manager",
         null=True, blank=True,
+        db_index=False,
     )
     employee = models.ForeignKey(
         Employee,
@@ -217,12 +225,19 @@ class Review(models.Model):
         on_delete=models.CASCADE, 
         related_name="rewiews",
         null=True, blank=True,
+        db_index=False,
     )
+    updated_at = models.DateTimeField(_("updated at"), auto_now=True)
 
 
     class Meta:
         verbose_name = _("review")
         verbose_name_plural = _("reviews")
+        indexes = [
+            models.Index(fields=['manager', 'created_date'], name='review_manager_created_idx'),
+            models.Index(fields=['employee', 'created_date'], name='review_employee_created_idx'),
+            models.Index(fields=['employee', 'updated_at'], name='review_employee_updated_idx'),
+        ]
 
     def __str__(self):
         return f'{self.employee}, {self.total_review}'
@@ -239,7 +254,8 @@ class GoalJournal(models.Model):
         Goal, 
         verbose_name=_("goal"), 
         on_delete=models.CASCADE,
-        related_name='journals')
+        related_name='journals',
+        db_index=False)
     owner = models.ForeignKey(
         User, 
         verbose_name=_("owner"), 
@@ -254,10 +270,108 @@ class GoalJournal(models.Model):
         ordering = ['-journal_date']
         verbose_name = _("goal journal")
         verbose_name_plural = _("goal journals")
+        indexes = [
+            models.Index(fields=['goal', '-journal_date', '-id'], name='journal_goal_date_idx'),
+        ]
 
     def __str__(self):
         return f"{self.journal_date}: {self.owner}"
 
     def get_absolute_url(self):
         return reverse("goaljournal_detail", kwargs={"pk": self.pk})
-    
\ No newline at end of file
+    
+
+class GoalBatchUpdate(models.Model):
+    owner = models.ForeignKey(
+        User,
+        verbose_name=_("owner"),
+        on_delete=models.CASCADE,
+        related_name='goal_batch_updates',
+        )
+    created_at = models.DateTimeField(_("created at"), auto_now_add=True)
+    goal_count = models.PositiveIntegerField(_("goal count"), default=0)
+    changes = models.JSONField(_("changes"), default=list)
+
+    class Meta:
+        ordering = ['-created_at']
+        verbose_name = _("goal batch update")
+        verbose_name_plural = _("goal batch updates")
+
+    def __str__(self):
+        return f"{self.created_at}: {self.owner}, {self.goal_count} goals"
+
+
+class SearchDocument(models.Model):
+    KIND_CHOICES = (
+        ('goal', _('Goal')),
+        ('review', _('Review')),
+        ('journal', _('Goal journal')),
+    )
+    kind = models.CharField(_("kind"), max_length=10, choices=KIND_CHOICES)
+    object_id = models.PositiveBigIntegerField(_("object id"))
+    target_id = models.PositiveBigIntegerField(_("target id"))
+    title = models.CharField(_("title"), max_length=255, blank=True)
+    body = models.TextField(_("body"), blank=True)
+    owner = models.ForeignKey(
+        User,
+        verbose_name=_("owner"),
+        on_delete=models.CASCADE,
+        related_name='+',
+        null=True, blank=True,
+    )
+    reviewer = models.ForeignKey(
+        User,
+        verbose_name=_("reviewer"),
+        on_delete=models.CASCADE,
+        related_name='+',
+        null=True, blank=True,
+    )
+
+    class Meta:
+        verbose_name = _("search document")
+        verbose_name_plural = _("search documents")
+        constraints = [
+            models.UniqueConstraint(fields=['kind', 'object_id'], name='unique_search_document'),
+        ]
+
+    def __str__(self):
+        return f'{self.kind} #{self.object_id}: {self.title}'
+
+    def get_absolute_url(self):
+        if self.kind == 'review':
+            return reverse("review_detail", kwargs={'pk': self.target_id})
+        return reverse("goal_detail", kwargs={'pk': self.target_id})
+
+
+class EmployeeScorecard(models.Model):
+    employee = models.ForeignKey(
+        Employee,
+        verbose_name=_("employee"),
+        on_delete=models.CASCADE,
+        related_name='scorecards',
+    )
+    year = models.PositiveSmallIntegerField(_("year"))
+    review_count = models.PositiveIntegerField(_("review count"), default=0)
+    goals_avg = models.FloatField(_("goals review average"), default=0)
+    teamwork_avg = models.FloatField(_("teamwork review average"), default=0)
+    innovation_avg = models.FloatField(_("innovation review average"), default=0)
+    work_ethics_avg = models.FloatField(_("work ethics review average"), default=0)
+    total_avg = models.FloatField(_("total review average"), default=0)
+    overall_avg = models.FloatField(_("overall average"), default=0)
+    latest_review_date = models.DateTimeField(_("latest review date"), null=True, blank=True)
+    latest_goals_review = models.PositiveSmallIntegerField(_("latest goals review"), choices=Review.SCORE_CHOICES, default=0)
+    latest_teamwork_review = models.PositiveSmallIntegerField(_("latest teamwork review"), choices=Review.SCORE_CHOICES, default=0)
+    latest_innovation_review = models.PositiveSmallIntegerField(_("latest innovation review"), choices=Review.SCORE_CHOICES, default=0)
+    latest_work_ethics_review = models.PositiveSmallIntegerField(_("latest work ethics review"), choices=Review.SCORE_CHOICES, default=0)
+    latest_total_review = models.PositiveSmallIntegerField(_("latest total review"), choices=Review.SCORE_CHOICES, default=0)
+
+    class Meta:
+        ordering = ['-year']
+        verbose_name = _("employee scorecard")
+        verbose_name_plural = _("employee scorecards")
+        constraints = [
+            models.UniqueConstraint(fields=['employee', 'year'], name='unique_employee_scorecard_year'),
+        ]
+
+    def __str__(self):
+        return f"{self.employee} {self.year}: {self.overall_avg:.1f}"
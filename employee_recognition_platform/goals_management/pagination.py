@@ -0,0 +1,74 @@
+"""Keyset (cursor) pagination helpers.
+
+A cursor is the urlsafe base64 of a JSON list holding the ordering values of
+the last row on the previous page, so fetching any page is a bounded query
+that seeks through an index instead of counting and skipping rows.
+"""
+import base64
+import datetime
+import json
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+
+
+def encode_cursor(values):
+    values = [value.isoformat() if isinstance(value, (datetime.date, datetime.datetime)) else value for value in values]
+    payload = json.dumps(values, separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(payload).decode().rstrip('=')
+
+
+def decode_cursor(cursor, length):
+    if not cursor:
+        return None
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+    except ValueError:
+        return None
+    if not isinstance(values, list) or len(values) != length:
+        return None
+    return values
+
+
+def keyset_filter(ordering, values):
+    """Build the Q selecting rows strictly after ``values`` in ``ordering``."""
+    condition = Q()
+    for position, field in enumerate(ordering):
+        name = field.lstrip('-')
+        lookup = 'lt' if field.startswith('-') else 'gt'
+        step = Q(**{f'{name}__{lookup}': values[position]})
+        for previous, value in zip(ordering[:position], values):
+            step &= Q(**{previous.lstrip('-'): value})
+        condition |= step
+    return condition
+
+
+class KeysetPage:
+    def __init__(self, object_list, next_cursor):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+
+def keyset_page(queryset, ordering, cursor=None, per_page=20, key=None):
+    """Return the ``KeysetPage`` of ``queryset`` following ``cursor``.
+
+    ``ordering`` must end with a unique field (normally ``id``) so that every
+    row has a distinct position. ``key(row)`` returns a row's ordering values;
+    by default they are read as attributes of a model instance.
+    """
+    queryset = queryset.order_by(*ordering)
+    after = decode_cursor(cursor, len(ordering))
+    if after is not None:
+        try:
+            queryset = queryset.filter(keyset_filter(ordering, after))
+        except (TypeError, ValueError, ValidationError):
+            pass
+    rows = list(queryset[:per_page + 1])
+    if len(rows) <= per_page:
+        return KeysetPage(rows, None)
+    rows = rows[:per_page]
+    if key is None:
+        return KeysetPage(rows, encode_cursor([getattr(rows[-1], field.lstrip('-')) for field in ordering]))
+    return KeysetPage(rows, encode_cursor(key(rows[-1])))
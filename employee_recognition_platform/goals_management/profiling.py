@@ -0,0 +1,200 @@
+"""Opt-in per-request profiling.
+
+With REQUEST_PROFILING = True, ``ProfilingMiddleware`` records for every
+request the SQL query count and time, the queries that ran more than once,
+template render time, time spent in named ``span`` blocks (chart
+rendering) and cache hits and misses per key namespace. The numbers are sent back as ``Server-Timing`` headers and
+appended to the JSONL log REQUEST_PROFILING_LOG, which rotates at
+REQUEST_PROFILING_LOG_BYTES. The profiling_summary command turns the log
+into per-URL percentiles and cache_report into cache hit rates.
+
+When profiling is off the middleware removes itself at startup
+(``MiddlewareNotUsed``) and ``span`` only looks up an unset context variable.
+"""
+import contextvars
+import hashlib
+import json
+import logging
+import logging.handlers
+import os
+import re
+import time
+from collections import Counter
+from contextlib import ExitStack, contextmanager
+from datetime import datetime, timezone
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.template import base as template_base
+
+
+_current = contextvars.ContextVar('request_profile', default=None)
+_log = logging.getLogger('goals_management.profiling.requests')
+_log.propagate = False
+
+NUMBER = re.compile(r'\b\d+(\.\d+)?\b')
+STRING = re.compile(r"'(?:[^']|'')*'")
+IN_LIST = re.compile(r'\((?:%s|\?)(?:\s*,\s*(?:%s|\?))+\)')
+
+
+def fingerprint(sql):
+    """Normalise ``sql`` so repeats of one query with other parameters match."""
+    sql = IN_LIST.sub('(...)', STRING.sub('?', NUMBER.sub('?', sql)))
+    return hashlib.sha1(sql.encode()).hexdigest()[:12], sql
+
+
+class RequestProfile:
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.sql_count = 0
+        self.sql_ms = 0.0
+        self.queries = Counter()
+        self.statements = {}
+        self.spans = Counter()
+        self.cache_hits = Counter()
+        self.cache_misses = Counter()
+        self.template_depth = 0
+
+    def execute(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.sql_ms += (time.perf_counter() - started) * 1000
+            self.sql_count += 1
+            key, normalised = fingerprint(sql)
+            self.queries[key] += 1
+            self.statements.setdefault(key, normalised)
+
+    def duplicates(self):
+        return [
+            {'fingerprint': key, 'count': count, 'sql': self.statements[key][:300]}
+            for key, count in self.queries.most_common() if count > 1
+        ]
+
+    def record(self, request, response):
+        match = request.resolver_match
+        return {
+            'time': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            'method': request.method,
+            'path': request.path,
+            'url_name': match.view_name if match else None,
+            'status': response.status_code,
+            'total_ms': round((time.perf_counter() - self.started) * 1000, 2),
+            'sql_count': self.sql_count,
+            'sql_ms': round(self.sql_ms, 2),
+            'duplicates': self.duplicates(),
+            'cache': {
+                namespace: {'hits': self.cache_hits[namespace], 'misses': self.cache_misses[namespace]}
+                for namespace in sorted(self.cache_hits.keys() | self.cache_misses.keys())
+            },
+            **{f'{name}_ms': round(ms, 2) for name, ms in self.spans.items()},
+        }
+
+
+@contextmanager
+def span(name):
+    """Add the time spent in the block to the current request's ``name`` timing."""
+    profile = _current.get()
+    if profile is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        profile.spans[name] += (time.perf_counter() - started) * 1000
+
+
+def count_cache(namespace, hit):
+    profile = _current.get()
+    if profile is not None:
+        (profile.cache_hits if hit else profile.cache_misses)[namespace] += 1
+
+
+_original_template_render = template_base.Template.render
+
+
+def _profiled_template_render(self, context):
+    profile = _current.get()
+    if profile is None or profile.template_depth:
+        return _original_template_render(self, context)
+    profile.template_depth += 1
+    try:
+        with span('template'):
+            return _original_template_render(self, context)
+    finally:
+        profile.template_depth -= 1
+
+
+def server_timing(record):
+    metrics = [
+        f'sql;dur={record["sql_ms"]};desc="{record["sql_count"]} queries"',
+        f'sql-dup;desc="{sum(d["count"] - 1 for d in record["duplicates"])} duplicated"',
+    ]
+    if record['cache']:
+        hits = sum(counts['hits'] for counts in record['cache'].values())
+        lookups = hits + sum(counts['misses'] for counts in record['cache'].values())
+        metrics.append(f'cache;desc="{hits}/{lookups} hits"')
+    metrics += [
+        f'{key[:-3]};dur={value}' for key, value in record.items()
+        if key.endswith('_ms') and key not in ('sql_ms', 'total_ms')
+    ]
+    metrics.append(f'total;dur={record["total_ms"]}')
+    return ', '.join(metrics)
+
+
+def read_log(path):
+    """Yield the records of the profiling log at ``path``, oldest rotated file first."""
+    paths = sorted(path.parent.glob(f'{path.name}.*'), reverse=True) + [path]
+    for log in paths:
+        if not log.exists():
+            continue
+        with log.open(encoding='utf-8') as lines:
+            for line in lines:
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    continue
+
+
+def _configure_log():
+    path = str(settings.REQUEST_PROFILING_LOG)
+    for handler in list(_log.handlers):
+        if handler.baseFilename == os.path.abspath(path):
+            return
+        _log.removeHandler(handler)
+        handler.close()
+    handler = logging.handlers.RotatingFileHandler(
+        path,
+        maxBytes=settings.REQUEST_PROFILING_LOG_BYTES,
+        backupCount=settings.REQUEST_PROFILING_LOG_BACKUPS,
+        encoding='utf-8',
+    )
+    handler.setFormatter(logging.Formatter('%(message)s'))
+    _log.addHandler(handler)
+    _log.setLevel(logging.INFO)
+
+
+class ProfilingMiddleware:
+    def __init__(self, get_response):
+        if not settings.REQUEST_PROFILING:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        template_base.Template.render = _profiled_template_render
+        _configure_log()
+
+    def __call__(self, request):
+        profile = RequestProfile()
+        token = _current.set(profile)
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(profile.execute))
+                response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        record = profile.record(request, response)
+        response['Server-Timing'] = server_timing(record)
+        _log.info(json.dumps(record))
+        return response
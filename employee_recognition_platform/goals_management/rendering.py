@@ -0,0 +1,142 @@
+"""Chart rendering worker pool.
+
+Figures are drawn with the object-oriented matplotlib API in separate
+processes, so rendering never holds the GIL of a web worker and never
+touches pyplot's global state. This module must not import Django models:
+it is imported again by every spawned worker.
+"""
+import io
+import logging
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+
+logger = logging.getLogger(__name__)
+
+
+class RenderQueueFull(Exception):
+    pass
+
+
+def _png(fig):
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format='png')
+    return buffer.getvalue()
+
+
+def render_priority_chart(labels, values):
+    import seaborn as sns
+    import matplotlib.ticker as ticker
+    from matplotlib.figure import Figure
+    with sns.axes_style('whitegrid'):
+        fig = Figure(figsize=(5, 4))
+        ax = fig.subplots()
+    sns.barplot(x=labels, y=values, hue=labels, palette='dark:#5A9_r', legend=False, ax=ax)
+    ax.set(xlabel='Priority')
+    ax.yaxis.set_major_locator(ticker.MaxNLocator(integer=True))
+    ax.set_title('Goals by Priority')
+    fig.tight_layout()
+    for i, v in enumerate(values):
+        ax.text(i, v, str(v), ha='center', va='bottom', color='black')
+    return _png(fig)
+
+
+def render_status_chart(labels, values):
+    import seaborn as sns
+    from matplotlib.figure import Figure
+    from matplotlib.patches import Circle
+    fig = Figure(figsize=(5, 4))
+    ax = fig.subplots()
+    palette = sns.color_palette("BrBG", len(values))
+    ax.pie(values, labels=labels, colors=palette, autopct='%1.0f%%', startangle=90)
+    ax.axis('equal')
+    ax.set_title('Goal Distribution by Status')
+    fig.tight_layout()
+    ax.add_artist(Circle((0, 0), 0.70, fc='white'))
+    return _png(fig)
+
+
+def render_progress_chart(labels, values):
+    import seaborn as sns
+    from matplotlib.figure import Figure
+    with sns.axes_style('whitegrid'):
+        fig = Figure(figsize=(5, 2))
+        ax = fig.subplots()
+    sns.barplot(x=values, y=labels, hue=labels, palette='dark:#5A9_r', legend=False, ax=ax)
+    ax.set(xlabel='Progress (%)', ylabel='Status')
+    ax.set_title('Average Goal Progress')
+    fig.subplots_adjust(left=0.3, bottom=0.3)
+    for i, v in enumerate(values):
+        ax.text(v + 0.02, i, f'{int(v)}%', ha='left', va='center', color='white')
+    return _png(fig)
+
+
+RENDERERS = {
+    'priority': render_priority_chart,
+    'status': render_status_chart,
+    'progress': render_progress_chart,
+}
+
+
+def render_chart(chart, labels, values):
+    return RENDERERS[chart](labels, values)
+
+
+class ChartRenderer:
+    """Process pool with a bounded backlog that renders each job key once.
+
+    ``submit`` never blocks: a job already queued or running under the same
+    key is shared, and ``RenderQueueFull`` is raised once ``max_pending``
+    jobs are outstanding. ``on_done(key, png)`` is called from the pool's
+    result thread when a render succeeds.
+    """
+
+    def __init__(self, max_workers=2, max_pending=32, on_done=None):
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.on_done = on_done
+        self._executor = None
+        self._pending = {}
+        self._lock = threading.Lock()
+
+    def _get_executor(self):
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context('spawn'),
+            )
+        return self._executor
+
+    def is_pending(self, key):
+        with self._lock:
+            return key in self._pending
+
+    def submit(self, key, chart, labels, values):
+        with self._lock:
+            if key in self._pending:
+                return self._pending[key]
+            if len(self._pending) >= self.max_pending:
+                raise RenderQueueFull(key)
+            future = self._get_executor().submit(render_chart, chart, labels, values)
+            self._pending[key] = future
+        future.add_done_callback(lambda f: self._finish(key, f))
+        return future
+
+    def _finish(self, key, future):
+        try:
+            png = future.result()
+        except Exception:
+            logger.exception('Rendering chart %s failed', key)
+        else:
+            if self.on_done is not None:
+                self.on_done(key, png)
+        finally:
+            with self._lock:
+                self._pending.pop(key, None)
+
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
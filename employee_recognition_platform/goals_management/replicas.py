@@ -0,0 +1,163 @@
+"""Read-replica routing for reporting reads.
+
+Views decorated with ``replica_reads`` (statistics, department reviews,
+search, exports) read ``goals_management`` and ``user_profile`` models from
+the ``replica`` alias when DATABASE_REPLICA_READS is on. Everything else,
+and every write, uses the primary.
+
+Replicas lag behind, so reads stay on the primary when they must see a
+write:
+
+- once a request has written, its remaining reads use the primary;
+- after a successful POST (creating a goal, posting a journal),
+  ``PinPrimaryMiddleware`` sets a short-lived cookie so the redirect and the
+  next few requests of that client read from the primary too.
+"""
+import contextvars
+from functools import wraps
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import DEFAULT_DB_ALIAS
+from django.template.response import SimpleTemplateResponse
+
+
+REPLICA_DB_ALIAS = 'replica'
+ROUTED_APPS = {'goals_management', 'user_profile'}
+PIN_COOKIE = 'pin_primary'
+
+_state = contextvars.ContextVar('replica_reads', default=None)
+
+
+class ReplicaState:
+    def __init__(self):
+        self.wrote = False
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        state = _state.get()
+        if state is None or state.wrote or model._meta.app_label not in ROUTED_APPS:
+            return None
+        return REPLICA_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        state = _state.get()
+        if state is not None:
+            state.wrote = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # The replica holds the same rows as the primary.
+        if {obj1._state.db, obj2._state.db} <= {DEFAULT_DB_ALIAS, REPLICA_DB_ALIAS}:
+            return True
+        return None
+
+
+def _bind(state, iterator):
+    iterator = iter(iterator)
+    while True:
+        token = _state.set(state)
+        try:
+            chunk = next(iterator)
+        except StopIteration:
+            return
+        finally:
+            _state.reset(token)
+        yield chunk
+
+
+async def _abind(state, iterator):
+    iterator = aiter(iterator)
+    while True:
+        token = _state.set(state)
+        try:
+            chunk = await anext(iterator)
+        except StopAsyncIteration:
+            return
+        finally:
+            _state.reset(token)
+        yield chunk
+
+
+def _bind_streaming(response, state):
+    # Streaming bodies are read after the view returns; keep them on the replica.
+    if response.streaming:
+        if response.is_async:
+            response.streaming_content = _abind(state, response.streaming_content)
+        else:
+            response.streaming_content = _bind(state, response.streaming_content)
+    return response
+
+
+def _use_replica(request):
+    return settings.DATABASE_REPLICA_READS and PIN_COOKIE not in request.COOKIES
+
+
+def replica_reads(view):
+    """Serve ``view``'s reads of the routed apps from the replica."""
+    if iscoroutinefunction(view):
+        @wraps(view)
+        async def wrapper(request, *args, **kwargs):
+            if not _use_replica(request):
+                return await view(request, *args, **kwargs)
+            state = ReplicaState()
+            token = _state.set(state)
+            try:
+                response = await view(request, *args, **kwargs)
+            finally:
+                _state.reset(token)
+            return _bind_streaming(response, state)
+        return wrapper
+
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        if not _use_replica(request):
+            return view(request, *args, **kwargs)
+        state = ReplicaState()
+        token = _state.set(state)
+        try:
+            response = view(request, *args, **kwargs)
+            if isinstance(response, SimpleTemplateResponse):
+                response.render()
+        finally:
+            _state.reset(token)
+        return _bind_streaming(response, state)
+    return wrapper
+
+
+class PinPrimaryMiddleware:
+    """Send a client's reads to the primary for a few seconds after it writes.
+
+    Installed only when DATABASE_REPLICA_READS is on, and async-capable so
+    it does not push the async views off the event loop.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.DATABASE_REPLICA_READS:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        return self.pin(request, self.get_response(request))
+
+    async def __acall__(self, request):
+        return self.pin(request, await self.get_response(request))
+
+    def pin(self, request, response):
+        if (
+            settings.DATABASE_REPLICA_READS
+            and request.method not in ('GET', 'HEAD', 'OPTIONS', 'TRACE')
+            and response.status_code < 400
+        ):
+            response.set_cookie(
+                PIN_COOKIE, '1', max_age=settings.DATABASE_REPLICA_PIN_SECONDS, httponly=True, samesite='Lax',
+            )
+        return response
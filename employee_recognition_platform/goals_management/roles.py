@@ -0,0 +1,84 @@
+"""Per-user role resolution.
+
+The ids of the user's Manager, Employee and profile rows are loaded with one
+query, cached under ``user_roles:<user id>`` and memoised on the request, so
+a view asks "is this a manager, and which one?" without touching the
+database. Signals drop the cache entry whenever one of those rows is saved or
+deleted.
+"""
+from dataclasses import dataclass
+from typing import Optional
+from django.contrib.auth import get_user_model
+from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
+from django.core.cache import cache
+from django.utils.functional import cached_property
+
+
+ROLES_CACHE_KEY = 'user_roles:{user_id}'
+ROLES_CACHE_TIMEOUT = 60 * 60
+
+
+@dataclass(frozen=True)
+class UserRoles:
+    manager_id: Optional[int] = None
+    employee_id: Optional[int] = None
+    profile_id: Optional[int] = None
+    manager_profile_id: Optional[int] = None
+
+    @property
+    def is_manager(self):
+        return self.manager_id is not None
+
+    @property
+    def is_employee(self):
+        return self.employee_id is not None
+
+
+ANONYMOUS = UserRoles()
+
+
+def load_roles(user_id):
+    row = get_user_model().objects.filter(pk=user_id).values(
+        'manager__id', 'employee__id', 'profile__id', 'manager_user_profile__id',
+    ).first() or {}
+    return UserRoles(
+        manager_id=row.get('manager__id'),
+        employee_id=row.get('employee__id'),
+        profile_id=row.get('profile__id'),
+        manager_profile_id=row.get('manager_user_profile__id'),
+    )
+
+
+def resolve_roles(request):
+    """Return the ``UserRoles`` of ``request.user``, loading them at most once per request."""
+    roles = getattr(request, '_user_roles', None)
+    if roles is not None:
+        return roles
+    user = request.user
+    if not user.is_authenticated:
+        roles = ANONYMOUS
+    else:
+        key = ROLES_CACHE_KEY.format(user_id=user.pk)
+        roles = cache.get(key)
+        if roles is None:
+            roles = load_roles(user.pk)
+            cache.set(key, roles, ROLES_CACHE_TIMEOUT)
+    request._user_roles = roles
+    return roles
+
+
+def invalidate_roles(*user_ids):
+    cache.delete_many([ROLES_CACHE_KEY.format(user_id=user_id) for user_id in user_ids if user_id])
+
+
+class RoleMixin:
+    """Expose the requesting user's cached ``UserRoles`` as ``self.roles``."""
+
+    @cached_property
+    def roles(self):
+        return resolve_roles(self.request)
+
+
+class ManagerRequiredMixin(LoginRequiredMixin, RoleMixin, UserPassesTestMixin):
+    def test_func(self) -> bool | None:
+        return self.roles.is_manager
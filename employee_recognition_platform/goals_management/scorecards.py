@@ -0,0 +1,96 @@
+from django.db import transaction
+from django.db.models import Avg, Count
+from django.db.models.functions import ExtractYear
+from django.utils.timezone import localtime
+from . models import EmployeeScorecard, Review
+
+
+CATEGORY_FIELDS = {
+    'goals': 'goals_review',
+    'teamwork': 'teamwork_review',
+    'innovation': 'innovation_review',
+    'work_ethics': 'work_ethics_review',
+    'total': 'total_review',
+}
+OVERALL_CATEGORIES = ('goals', 'teamwork', 'innovation', 'work_ethics')
+
+
+def review_bucket(review):
+    """Return the ``(employee_id, year)`` scorecard a review belongs to, or None."""
+    if not review.employee_id or not review.created_date:
+        return None
+    return review.employee_id, localtime(review.created_date).year
+
+
+def scorecard_values(reviews):
+    """Compute the scorecard fields of ``reviews``, all within one (employee, year) bucket."""
+    row = reviews.aggregate(
+        review_count=Count('id'),
+        **{f'{category}_avg': Avg(field) for category, field in CATEGORY_FIELDS.items()},
+    )
+    if not row['review_count']:
+        return None
+    values = {key: value or 0 for key, value in row.items()}
+    values['overall_avg'] = sum(values[f'{category}_avg'] for category in OVERALL_CATEGORIES) / len(OVERALL_CATEGORIES)
+    latest = reviews.order_by('-created_date', '-id').first()
+    values['latest_review_date'] = latest.created_date
+    for category, field in CATEGORY_FIELDS.items():
+        values[f'latest_{field}'] = getattr(latest, field)
+    return values
+
+
+def refresh_scorecard(employee_id, year):
+    reviews = Review.objects.filter(employee_id=employee_id, created_date__year=year)
+    values = scorecard_values(reviews)
+    if values is None:
+        EmployeeScorecard.objects.filter(employee_id=employee_id, year=year).delete()
+        return None
+    scorecard, _created = EmployeeScorecard.objects.update_or_create(
+        employee_id=employee_id, year=year, defaults=values,
+    )
+    return scorecard
+
+
+def build_scorecards(reviews, batch_size=1000):
+    """Compute the scorecards of ``reviews`` from one grouped aggregate and one ordered pass, keyed by bucket."""
+    reviews = reviews.filter(employee__isnull=False)
+    rows = reviews.order_by().values(
+        'employee_id', year=ExtractYear('created_date'),
+    ).annotate(
+        review_count=Count('id'),
+        **{f'{category}_avg': Avg(field) for category, field in CATEGORY_FIELDS.items()},
+    )
+    scorecards = {}
+    for row in rows:
+        scorecard = EmployeeScorecard(**row)
+        scorecard.overall_avg = sum(row[f'{category}_avg'] for category in OVERALL_CATEGORIES) / len(OVERALL_CATEGORIES)
+        scorecards[row['employee_id'], row['year']] = scorecard
+    latest_reviews = reviews.order_by('created_date', 'id').only(
+        'employee_id', 'created_date', *CATEGORY_FIELDS.values(),
+    )
+    for review in latest_reviews.iterator(chunk_size=batch_size):
+        scorecard = scorecards.get(review_bucket(review))
+        if scorecard is None:
+            continue
+        scorecard.latest_review_date = review.created_date
+        for field in CATEGORY_FIELDS.values():
+            setattr(scorecard, f'latest_{field}', getattr(review, field))
+    return scorecards
+
+
+def rebuild_scorecards(batch_size=1000):
+    """Recreate every scorecard."""
+    scorecards = build_scorecards(Review.objects.all(), batch_size)
+    with transaction.atomic():
+        EmployeeScorecard.objects.all().delete()
+        EmployeeScorecard.objects.bulk_create(scorecards.values(), batch_size=batch_size)
+    return len(scorecards)
+
+
+def refresh_scorecards(employee_ids, year):
+    """Recompute the ``year`` scorecards of several employees with the same two queries ``rebuild_scorecards`` uses."""
+    scorecards = build_scorecards(Review.objects.filter(employee_id__in=employee_ids, created_date__year=year))
+    with transaction.atomic():
+        EmployeeScorecard.objects.filter(employee_id__in=employee_ids, year=year).delete()
+        EmployeeScorecard.objects.bulk_create(scorecards.values())
+    return list(scorecards.values())
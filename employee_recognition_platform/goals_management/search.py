@@ -0,0 +1,235 @@
+"""Full-text search index over goals, reviews and goal journals.
+
+Every searchable object is flattened into one ``SearchDocument`` row with its
+TinyMCE markup stripped. On SQLite the rows are mirrored into an FTS5 table by
+triggers, on PostgreSQL they are covered by a GIN ``to_tsvector`` index (both
+created in migration 0014). Other backends fall back to ``LIKE``. Each row
+records the users allowed to see it, so results are always scoped.
+"""
+import html
+import re
+from django.db import connection, transaction
+from django.utils.html import strip_tags
+from . models import Goal, GoalJournal, Review, SearchDocument
+from . pagination import decode_cursor, encode_cursor
+
+
+REVIEW_TEXT_FIELDS = ('goals_achievment', 'teamwork', 'innovation', 'work_ethics')
+WHITESPACE = re.compile(r'\s+')
+
+
+def strip_html(value):
+    if not value:
+        return ''
+    return WHITESPACE.sub(' ', html.unescape(strip_tags(value))).strip()
+
+
+def goal_document(goal):
+    return SearchDocument(
+        kind='goal',
+        object_id=goal.pk,
+        target_id=goal.pk,
+        title=goal.title or '',
+        body=strip_html(goal.description),
+        owner_id=goal.owner_id,
+    )
+
+
+def review_document(review):
+    return SearchDocument(
+        kind='review',
+        object_id=review.pk,
+        target_id=review.pk,
+        title=f'{review.employee} Review',
+        body=' '.join(strip_html(getattr(review, field)) for field in REVIEW_TEXT_FIELDS),
+        owner_id=review.employee.user_id if review.employee else None,
+        reviewer_id=review.manager.user_id if review.manager else None,
+    )
+
+
+def journal_document(journal):
+    return SearchDocument(
+        kind='journal',
+        object_id=journal.pk,
+        target_id=journal.goal_id,
+        title=f'{journal.goal.title} journal',
+        body=strip_html(journal.journal),
+        owner_id=journal.goal.owner_id,
+    )
+
+
+DOCUMENT_BUILDERS = {
+    Goal: goal_document,
+    Review: review_document,
+    GoalJournal: journal_document,
+}
+DOCUMENT_KINDS = {
+    Goal: 'goal',
+    Review: 'review',
+    GoalJournal: 'journal',
+}
+
+
+def index_object(instance):
+    document = DOCUMENT_BUILDERS[type(instance)](instance)
+    SearchDocument.objects.update_or_create(
+        kind=document.kind,
+        object_id=document.object_id,
+        defaults={
+            'target_id': document.target_id,
+            'title': document.title,
+            'body': document.body,
+            'owner_id': document.owner_id,
+            'reviewer_id': document.reviewer_id,
+        },
+    )
+    if isinstance(instance, Goal):
+        SearchDocument.objects.filter(kind='journal', target_id=instance.pk).update(
+            title=f'{instance.title} journal',
+            owner_id=instance.owner_id,
+        )
+
+
+def reindex_reviews(reviews):
+    """Rebuild the documents of ``reviews``, e.g. after their employee or manager moved to another user."""
+    documents = [review_document(review) for review in reviews.select_related('employee', 'manager')]
+    with transaction.atomic():
+        SearchDocument.objects.filter(kind='review', object_id__in=[document.object_id for document in documents]).delete()
+        SearchDocument.objects.bulk_create(documents)
+    return len(documents)
+
+
+def unindex_object(instance):
+    SearchDocument.objects.filter(kind=DOCUMENT_KINDS[type(instance)], object_id=instance.pk).delete()
+
+
+def source_querysets():
+    return (
+        (Goal, Goal.objects.all()),
+        (Review, Review.objects.select_related('employee', 'manager')),
+        (GoalJournal, GoalJournal.objects.select_related('goal').order_by()),
+    )
+
+
+def rebuild_index(batch_size=2000):
+    SearchDocument.objects.all().delete()
+    total = 0
+    for model, queryset in source_querysets():
+        build = DOCUMENT_BUILDERS[model]
+        batch = []
+        for instance in queryset.iterator(chunk_size=batch_size):
+            batch.append(build(instance))
+            if len(batch) >= batch_size:
+                SearchDocument.objects.bulk_create(batch)
+                total += len(batch)
+                batch = []
+        SearchDocument.objects.bulk_create(batch)
+        total += len(batch)
+    if connection.vendor == 'sqlite':
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "INSERT INTO goals_management_searchdocument_fts(goals_management_searchdocument_fts) "
+                "VALUES ('optimize')"
+            )
+    return total
+
+
+def like_pattern(query):
+    """``%query%`` for ``LIKE ... ESCAPE '!'``, with the query's own wildcards matched literally."""
+    escaped = query.replace('!', '!!').replace('%', '!%').replace('_', '!_')
+    return f'%{escaped}%'
+
+
+def fts5_query(query):
+    terms = [term.replace('"', '""') for term in query.split()]
+    return ' '.join(f'"{term}"' for term in terms if term)
+
+
+class SearchResults:
+    """Ranked search results visible to one user, read page by page.
+
+    Results are ordered by ``(score, id)`` where a lower score ranks higher,
+    and pages are addressed by a keyset cursor holding the last row's
+    ``(score, id)``, so every page is a bounded ``LIMIT`` query whatever
+    the offset.
+    """
+
+    POSTGRESQL_VECTOR = "to_tsvector('english'::regconfig, COALESCE(d.title, '') || ' ' || COALESCE(d.body, ''))"
+
+    def __init__(self, query, user):
+        self.query = query
+        self.user = user
+        self.vendor = connection.vendor
+
+    def _scored_sql(self):
+        table = SearchDocument._meta.db_table
+        scope = "(d.owner_id = %s OR d.reviewer_id = %s)"
+        scope_params = [self.user.pk, self.user.pk]
+        if self.vendor == 'sqlite':
+            return (
+                f"SELECT d.*, bm25({table}_fts, 10.0, 1.0) AS score "
+                f"FROM {table}_fts f JOIN {table} d ON d.id = f.rowid "
+                f"WHERE {table}_fts MATCH %s AND {scope}",
+                [fts5_query(self.query), *scope_params],
+            )
+        if self.vendor == 'postgresql':
+            return (
+                f"SELECT d.*, -ts_rank({self.POSTGRESQL_VECTOR}, websearch_to_tsquery('english', %s)) AS score "
+                f"FROM {table} d "
+                f"WHERE {self.POSTGRESQL_VECTOR} @@ websearch_to_tsquery('english', %s) AND {scope}",
+                [self.query, self.query, *scope_params],
+            )
+        return (
+            f"SELECT d.*, 0.0 AS score FROM {table} d "
+            f"WHERE (UPPER(d.title) LIKE UPPER(%s) ESCAPE '!' OR UPPER(d.body) LIKE UPPER(%s) ESCAPE '!') AND {scope}",
+            [like_pattern(self.query), like_pattern(self.query), *scope_params],
+        )
+
+    def _raw(self, after=None, limit=None):
+        sql, params = self._scored_sql()
+        sql = f"SELECT * FROM ({sql}) ranked"
+        if after is not None:
+            sql += " WHERE score > %s OR (score = %s AND id > %s)"
+            params = [*params, after[0], after[0], after[1]]
+        sql += " ORDER BY score, id"
+        if limit is not None:
+            sql += f" LIMIT {int(limit)}"
+        return SearchDocument.objects.raw(sql, params)
+
+    def _after(self, cursor):
+        after = decode_cursor(cursor, 2)
+        try:
+            return (float(after[0]), int(after[1])) if after else None
+        except (TypeError, ValueError):
+            return None
+
+    def _paginate(self, rows, per_page):
+        if len(rows) <= per_page:
+            return rows, None
+        rows = rows[:per_page]
+        return rows, encode_cursor([rows[-1].score, rows[-1].id])
+
+    def page(self, cursor=None, per_page=20):
+        """Return ``(results, next_cursor)``; ``next_cursor`` is None on the last page."""
+        return self._paginate(list(self._raw(after=self._after(cursor), limit=per_page + 1)), per_page)
+
+    async def apage(self, cursor=None, per_page=20):
+        rows = [row async for row in self._raw(after=self._after(cursor), limit=per_page + 1)]
+        return self._paginate(rows, per_page)
+
+    def iterator(self):
+        return self._raw().iterator()
+
+    async def aiterator(self, batch_size=500):
+        """Yield every result, fetching one keyset page of ``batch_size`` at a time."""
+        cursor = None
+        while True:
+            rows, cursor = await self.apage(cursor, batch_size)
+            for row in rows:
+                yield row
+            if cursor is None:
+                return
+
+
+def search(query, user):
+    return SearchResults(query, user)
@@ -0,0 +1,118 @@
+from django.contrib.auth import get_user_model
+from django.db.models import Q
+from django.db.models.signals import post_save, post_delete, pre_save
+from django.dispatch import receiver
+from django.utils.timezone import now
+from . models import Employee, Goal, GoalJournal, Manager, Review
+from . caching import invalidate_user_pages
+from . charts import invalidate_goal_aggregates
+from . roles import invalidate_roles
+from . search import index_object, reindex_reviews, unindex_object
+from . scorecards import refresh_scorecard, review_bucket
+
+
+@receiver(post_save, sender=Goal)
+@receiver(post_delete, sender=Goal)
+def goal_changed(sender, instance, **kwargs):
+    if instance.owner_id:
+        invalidate_goal_aggregates(instance.owner_id)
+
+
+@receiver(post_save, sender=Goal)
+@receiver(post_delete, sender=Goal)
+@receiver(post_save, sender=GoalJournal)
+@receiver(post_delete, sender=GoalJournal)
+def owner_pages_changed(sender, instance, **kwargs):
+    invalidate_user_pages(instance.owner_id)
+
+
+@receiver(post_save, sender=GoalJournal)
+@receiver(post_delete, sender=GoalJournal)
+def touch_journal_goal(sender, instance, raw=False, **kwargs):
+    if not raw:
+        Goal.objects.filter(pk=instance.goal_id).update(updated_at=now())
+
+
+@receiver(post_save, sender=Review)
+@receiver(post_delete, sender=Review)
+def review_pages_changed(sender, instance, **kwargs):
+    lookups = Q()
+    if instance.employee_id:
+        lookups |= Q(employee__id=instance.employee_id)
+    if instance.manager_id:
+        lookups |= Q(manager__id=instance.manager_id)
+    if lookups:
+        invalidate_user_pages(*get_user_model().objects.filter(lookups).values_list('pk', flat=True))
+
+
+@receiver(post_save, sender=Goal)
+@receiver(post_save, sender=Review)
+@receiver(post_save, sender=GoalJournal)
+def update_search_index(sender, instance, raw=False, **kwargs):
+    if not raw:
+        index_object(instance)
+
+
+@receiver(post_delete, sender=Goal)
+@receiver(post_delete, sender=Review)
+@receiver(post_delete, sender=GoalJournal)
+def remove_from_search_index(sender, instance, **kwargs):
+    unindex_object(instance)
+
+
+@receiver(pre_save, sender=Review)
+def remember_scorecard_bucket(sender, instance, raw=False, **kwargs):
+    previous = None
+    if instance.pk and not raw:
+        previous = Review.objects.filter(pk=instance.pk).only('employee_id', 'created_date').first()
+    instance._previous_scorecard_bucket = review_bucket(previous) if previous else None
+
+
+@receiver(post_save, sender=Review)
+@receiver(post_delete, sender=Review)
+def update_scorecard(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    buckets = {review_bucket(instance), getattr(instance, '_previous_scorecard_bucket', None)}
+    buckets.discard(None)
+    for employee_id, year in buckets:
+        refresh_scorecard(employee_id, year)
+
+
+@receiver(post_save, sender=get_user_model())
+def new_user_roles(sender, instance, created=False, **kwargs):
+    if created:
+        invalidate_roles(instance.pk)
+
+
+@receiver(post_save, sender=get_user_model())
+def user_pages_changed(sender, instance, **kwargs):
+    invalidate_user_pages(instance.pk)
+
+
+@receiver(pre_save, sender=Manager)
+@receiver(pre_save, sender=Employee)
+def remember_role_user(sender, instance, raw=False, **kwargs):
+    instance._previous_user_id = None
+    if instance.pk and not raw:
+        instance._previous_user_id = sender.objects.filter(pk=instance.pk).values_list('user_id', flat=True).first()
+
+
+@receiver(post_save, sender=Manager)
+@receiver(post_save, sender=Employee)
+@receiver(post_delete, sender=Manager)
+@receiver(post_delete, sender=Employee)
+def role_changed(sender, instance, **kwargs):
+    user_ids = (instance.user_id, getattr(instance, '_previous_user_id', None))
+    invalidate_roles(*user_ids)
+    invalidate_user_pages(*user_ids)
+
+
+@receiver(post_save, sender=Manager)
+@receiver(post_save, sender=Employee)
+def reindex_role_reviews(sender, instance, created=False, raw=False, **kwargs):
+    # Review documents copy the employee's and manager's users to scope search results.
+    if raw or created or getattr(instance, '_previous_user_id', None) == instance.user_id:
+        return
+    lookup = 'employee' if sender is Employee else 'manager'
+    reindex_reviews(Review.objects.filter(**{lookup: instance}))
@@ -0,0 +1,55 @@
+from django.db.models import Avg, Count, Q
+from . models import Goal
+
+
+class GoalStatistics:
+    """Per-owner goal breakdowns computed in a single aggregate query."""
+
+    def __init__(self, queryset=None):
+        self.queryset = Goal.objects.all() if queryset is None else queryset
+
+    @classmethod
+    def for_owner(cls, user, using=None):
+        return cls(Goal.objects.db_manager(using).filter(owner=user))
+
+    def _expressions(self):
+        expressions = {'total': Count('id')}
+        for value, _label in Goal.PRIORITY_CHOICES:
+            expressions[f'priority_{value}'] = Count('id', filter=Q(priority=value))
+        for value, _label in Goal.GOAL_STATUS:
+            expressions[f'status_{value}'] = Count('id', filter=Q(status=value))
+            expressions[f'progress_{value}'] = Avg('progress', filter=Q(status=value))
+        return expressions
+
+    def compute(self):
+        return self._result(self.queryset.order_by().aggregate(**self._expressions()))
+
+    async def acompute(self):
+        return self._result(await self.queryset.order_by().aaggregate(**self._expressions()))
+
+    def _result(self, row):
+        return {
+            'total': row['total'],
+            'priority': {value: row[f'priority_{value}'] for value, _label in Goal.PRIORITY_CHOICES},
+            'status': {value: row[f'status_{value}'] for value, _label in Goal.GOAL_STATUS},
+            'progress': {value: float(row[f'progress_{value}'] or 0) for value, _label in Goal.GOAL_STATUS},
+        }
+
+    def labelled(self, statistics=None):
+        statistics = self.compute() if statistics is None else statistics
+        return {
+            'total': statistics['total'],
+            'priority': [
+                {'value': value, 'label': str(label)[2:], 'count': statistics['priority'][value]}
+                for value, label in Goal.PRIORITY_CHOICES
+            ],
+            'status': [
+                {
+                    'value': value,
+                    'label': str(label)[2:],
+                    'count': statistics['status'][value],
+                    'average_progress': statistics['progress'][value],
+                }
+                for value, label in Goal.GOAL_STATUS
+            ],
+        }
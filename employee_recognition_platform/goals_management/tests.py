@@ -1,3 +1,1340 @@
-from django.test import TestCase
+import csv
+import io
+import json
+import logging
+import math
+import os
+import re
+import shutil
+import statistics
+import tempfile
+import threading
+import time
+import warnings
+from concurrent.futures import Future
+from datetime import datetime, timedelta, timezone as dt_timezone
+from importlib.util import find_spec
+from unittest import mock, skipUnless
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.core.handlers.asgi import ASGIHandler
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.http import JsonResponse, StreamingHttpResponse
+from django.test import RequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import URLPattern, reverse
+from django.utils.timezone import now
+from employee_recognition_platform.caches import cache_settings
+from employee_recognition_platform.databases import database_settings
+from . exports import GOAL_COLUMNS, REVIEW_COLUMNS
+from . import charts, urls, views
+from . bulk import BulkUpdateError, clean_changes, update_goals
+from . models import Employee, EmployeeScorecard, Goal, GoalBatchUpdate, GoalJournal, Manager, Review, SearchDocument
+from . pagination import keyset_filter
+from . conditional import list_version
+from . profiling import fingerprint
+from . rendering import ChartRenderer, RenderQueueFull, render_chart
+from . management.commands.benchmark_statistics import legacy_statistics
+from . replicas import PIN_COOKIE, PinPrimaryMiddleware, replica_reads
+from . roles import UserRoles, resolve_roles
+from . statistics import GoalStatistics
+from . search import SearchResults, fts5_query, like_pattern, search, strip_html
 
-# Create your tests here.
+
+User = get_user_model()
+
+VIEW_BUDGETS_PATH = settings.BASE_DIR / 'view_budgets.json'
+# The cookie a browser gets from the login form; pages with a CSRF token are only cached for browsers that have one.
+CSRF_COOKIE = 'c' * 32
+UPDATE_VIEW_BUDGETS = os.environ.get('UPDATE_VIEW_BUDGETS') == '1'
+
+
+def seed_organisation(employees=10, goals=5, journals=3, reviews=2):
+    """Create a manager with a team whose members own goals, journals and reviews."""
+    manager_user = User.objects.create_user('manager', is_staff=True)
+    manager = Manager.objects.create(
+        first_name='Mary', last_name='Manager', email='mary@example.com', department='R&D', user=manager_user,
+    )
+    team = []
+    for e in range(employees):
+        user = User.objects.create_user(f'employee{e}')
+        employee = Employee.objects.create(
+            first_name=f'Eve{e}', last_name='Employee', email=f'eve{e}@example.com',
+            position='Engineer', manager=manager, user=user,
+        )
+        team.append(employee)
+        for g in range(goals):
+            goal = Goal.objects.create(
+                owner=user, title=f'Goal {g} of {user}', description=f'<p>Deliver milestone {g}</p>',
+                status=g % 5, priority=g % 3, progress=(g * 20) % 110,
+            )
+            for j in range(journals):
+                GoalJournal.objects.create(goal=goal, owner=user, journal=f'Progress note {j}')
+        for r in range(reviews):
+            Review.objects.create(
+                employee=employee, manager=manager, created_date=now() - timedelta(days=365 * r),
+                goals_achievment='<p>Shipped</p>', teamwork='<p>Helpful</p>',
+                innovation='<p>Curious</p>', work_ethics='<p>Reliable</p>', total_review=8,
+            )
+    return manager, team
+
+
+class ViewBudgetMixin:
+    """Request every named URL of ``urlconf`` and hold it to its budget in view_budgets.json.
+
+    Each entry declares the query count and latency (median of a few warm
+    requests) a view may spend. Run with UPDATE_VIEW_BUDGETS=1 to rewrite
+    the entries from the measured values.
+    """
+    urlconf = None
+    repeat = 3
+
+    def budget_cases(self):
+        """Map each URL name to ``(user, kwargs, query_string)``; ``user`` None means anonymous."""
+        raise NotImplementedError
+
+    def setUp(self):
+        cache.clear()
+
+    @classmethod
+    def load_budgets(cls):
+        if VIEW_BUDGETS_PATH.exists():
+            return json.loads(VIEW_BUDGETS_PATH.read_text())
+        return {}
+
+    def measure(self, user, url):
+        self.client.logout()
+        if user is not None:
+            self.client.force_login(user)
+        self.client.get(url)
+        timings = []
+        for _ in range(self.repeat):
+            with CaptureQueriesContext(connection) as queries:
+                started = time.perf_counter()
+                response = self.client.get(url)
+                if response.streaming:
+                    b''.join(response.streaming_content)
+                timings.append((time.perf_counter() - started) * 1000)
+        self.assertLess(response.status_code, 400, url)
+        return len(queries), statistics.median(timings)
+
+    def test_every_named_url_has_a_budget_case(self):
+        names = {pattern.name for pattern in self.urlconf.urlpatterns if isinstance(pattern, URLPattern)}
+        self.assertEqual(names, set(self.budget_cases()))
+
+    def test_view_budgets(self):
+        budgets = self.load_budgets()
+        measured = {}
+        for name, (user, kwargs, query_string) in sorted(self.budget_cases().items()):
+            url = reverse(name, kwargs=kwargs) + query_string
+            query_count, latency = self.measure(user, url)
+            measured[name] = {'queries': query_count, 'latency_ms': max(100, math.ceil(latency * 5))}
+            if UPDATE_VIEW_BUDGETS:
+                continue
+            with self.subTest(view=name):
+                self.assertIn(name, budgets, f'{name} has no entry in {VIEW_BUDGETS_PATH.name}')
+                self.assertLessEqual(query_count, budgets[name]['queries'], f'{name} query budget exceeded')
+                self.assertLessEqual(latency, budgets[name]['latency_ms'], f'{name} latency budget exceeded')
+        if UPDATE_VIEW_BUDGETS:
+            budgets.update(measured)
+            VIEW_BUDGETS_PATH.write_text(json.dumps(dict(sorted(budgets.items())), indent=4) + '\n')
+
+
+class GoalsManagementViewBudgetTests(ViewBudgetMixin, TestCase):
+    urlconf = urls
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.manager, cls.team = seed_organisation()
+        cls.employee = cls.team[0]
+        cls.goal = Goal.objects.filter(owner=cls.employee.user).first()
+        cls.review = Review.objects.filter(employee=cls.employee).first()
+        cls.hr_user = User.objects.create_superuser('hr')
+
+    def budget_cases(self):
+        employee_user = self.employee.user
+        manager_user = self.manager.user
+        return {
+            'index': (None, {}, ''),
+            'search': (employee_user, {}, '?query=milestone'),
+            'smart': (None, {}, ''),
+            'statistics': (employee_user, {}, ''),
+            'statistics_data': (employee_user, {}, ''),
+            'statistics_chart': (employee_user, {'chart': 'status'}, ''),
+            'goal_list': (employee_user, {}, ''),
+            'bulk_update_goals': (employee_user, {}, ''),
+            'employees_list': (manager_user, {}, ''),
+            'employee_detail': (manager_user, {'pk': self.employee.pk}, ''),
+            'employee_goals_list': (manager_user, {'pk': self.employee.pk}, ''),
+            'create_review': (manager_user, {'pk': self.employee.pk}, ''),
+            'create_review_for_any': (manager_user, {}, ''),
+            'create_team_reviews': (manager_user, {}, ''),
+            'goal_detail': (employee_user, {'pk': self.goal.pk}, ''),
+            'goal_journals': (employee_user, {'pk': self.goal.pk}, ''),
+            'update_goal': (employee_user, {'pk': self.goal.pk}, ''),
+            'delete_goal': (employee_user, {'pk': self.goal.pk}, ''),
+            'create_goal': (employee_user, {}, ''),
+            'review_list': (employee_user, {}, ''),
+            'department_reviews': (manager_user, {}, ''),
+            'review_detail': (manager_user, {'pk': self.review.pk}, ''),
+            'update_review': (manager_user, {'pk': self.review.pk}, ''),
+            'delete_review': (manager_user, {'pk': self.review.pk}, ''),
+            'export': (self.hr_user, {'kind': 'reviews', 'format': 'csv'}, ''),
+            'api_collection': (employee_user, {'resource': 'goals'}, '?fields=id,status,progress'),
+            'api_item': (employee_user, {'resource': 'goals', 'pk': self.goal.pk}, ''),
+        }
+
+
+@skipUnless(connection.vendor == 'sqlite', 'EXPLAIN QUERY PLAN output is SQLite specific')
+class ListViewIndexTests(TestCase):
+    """Every list view queryset must be answered from an index, never a table scan."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.employee_user = User.objects.create_user('employee')
+        cls.manager_user = User.objects.create_user('manager')
+        cls.manager = Manager.objects.create(first_name='Mary', last_name='Manager', user=cls.manager_user)
+        cls.employee = Employee.objects.create(
+            first_name='Eve', last_name='Employee', user=cls.employee_user, manager=cls.manager,
+        )
+
+    def query_plan(self, view_class, user, url, **kwargs):
+        request = RequestFactory().get(url)
+        request.user = user
+        view = view_class()
+        view.setup(request, **kwargs)
+        return view.get_queryset().explain()
+
+    def assertUsesIndex(self, plan, table, index=None):
+        steps = [line for line in plan.splitlines() if f' {table} ' in f'{line} ']
+        self.assertTrue(steps, f'{table} missing from plan:\n{plan}')
+        for step in steps:
+            self.assertNotIn('SCAN', step, f'table scan in plan:\n{plan}')
+        if index:
+            self.assertTrue(any(index in step for step in steps), f'{index} not used in plan:\n{plan}')
+
+    def test_goal_list(self):
+        plan = views.goal_list_queryset(self.employee_user).explain()
+        self.assertUsesIndex(plan, 'goals_management_goal', 'goal_owner_')
+
+    def test_goal_list_status_filter(self):
+        plan = views.goal_list_queryset(self.employee_user, '1').explain()
+        self.assertUsesIndex(plan, 'goals_management_goal', 'goal_owner_status_idx')
+
+    def test_department_goals_list(self):
+        plan = self.query_plan(
+            views.DepartmentGoalsListView, self.manager_user, '/', pk=self.employee.pk,
+        )
+        self.assertUsesIndex(plan, 'goals_management_goal', 'goal_owner_')
+
+    def test_department_goals_list_filters(self):
+        plan = self.query_plan(
+            views.DepartmentGoalsListView, self.manager_user,
+            '/?priority=1&status=all&start_date=2023-01-01&end_date=2023-12-31', pk=self.employee.pk,
+        )
+        self.assertUsesIndex(plan, 'goals_management_goal', 'goal_owner_priority_start_idx')
+
+    def test_review_list(self):
+        plan = views.review_list_queryset(self.employee_user).explain()
+        self.assertUsesIndex(plan, 'goals_management_review', 'review_employee_')
+
+    def test_list_version_tokens(self):
+        for queryset, index in (
+            (Goal.objects.filter(owner=self.employee_user), 'goal_owner_updated_idx'),
+            (Review.objects.filter(employee=self.employee), 'review_employee_updated_idx'),
+        ):
+            with CaptureQueriesContext(connection) as queries:
+                list_version(queryset)
+            with connection.cursor() as cursor:
+                cursor.execute('EXPLAIN QUERY PLAN ' + queries.captured_queries[0]['sql'])
+                plan = '\n'.join(str(row[-1]) for row in cursor.fetchall())
+            self.assertUsesIndex(plan, queryset.model._meta.db_table, index)
+
+    def test_department_reviews_list(self):
+        plan = self.query_plan(views.DepartmentReviewsListView, self.manager_user, '/department-reviews/')
+        self.assertUsesIndex(plan, 'goals_management_review', 'review_manager_created_idx')
+
+    def test_department_reviews_list_year_filter(self):
+        plan = self.query_plan(views.DepartmentReviewsListView, self.manager_user, '/department-reviews/?year=2023')
+        self.assertUsesIndex(plan, 'goals_management_review', 'review_manager_created_idx')
+
+    def test_goal_journal_timeline(self):
+        goal = Goal.objects.create(owner=self.employee_user, title='Goal')
+        page = views.journal_timeline(goal.pk)
+        queryset = GoalJournal.objects.filter(goal_id=goal.pk).order_by(*views.JOURNAL_ORDERING)
+        after = keyset_filter(views.JOURNAL_ORDERING, [now().isoformat(), 1])
+        for plan in (queryset.explain(), queryset.filter(after).explain()):
+            self.assertUsesIndex(plan, 'goals_management_goaljournal', 'journal_goal_date_idx')
+            self.assertNotIn('TEMP B-TREE', plan)
+        self.assertEqual(page.object_list, [])
+
+    def test_department_employees_list(self):
+        plan = self.query_plan(views.DepartmentEmployeesListView, self.manager_user, '/employees/')
+        self.assertUsesIndex(plan, 'goals_management_employee')
+
+
+class SearchScopingTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.manager, cls.team = seed_organisation(employees=2, goals=1, journals=1, reviews=1)
+        cls.employee, cls.colleague = cls.team
+        cls.other_manager_user = User.objects.create_user('other-manager')
+        Manager.objects.create(
+            first_name='Otto', last_name='Other', email='otto@example.com', department='Sales', user=cls.other_manager_user,
+        )
+
+    def found(self, query, user):
+        return {(document.kind, document.target_id) for document in search(query, user).page(per_page=100)[0]}
+
+    def test_users_only_find_their_own_goals_and_journals(self):
+        own_goal = Goal.objects.get(owner=self.employee.user)
+        other_goal = Goal.objects.get(owner=self.colleague.user)
+        found = self.found('milestone', self.employee.user)
+        self.assertIn(('goal', own_goal.pk), found)
+        self.assertNotIn(('goal', other_goal.pk), found)
+        self.assertEqual({kind for kind, target in self.found('progress', self.employee.user)}, {'journal'})
+        self.assertNotIn(('journal', other_goal.pk), self.found('progress', self.employee.user))
+
+    def test_reviews_are_found_by_their_employee_and_manager_only(self):
+        own_review = Review.objects.get(employee=self.employee)
+        other_review = Review.objects.get(employee=self.colleague)
+        self.assertEqual(self.found('reliable', self.employee.user), {('review', own_review.pk)})
+        self.assertEqual(self.found('reliable', self.manager.user), {('review', own_review.pk), ('review', other_review.pk)})
+        self.assertEqual(self.found('reliable', self.other_manager_user), set())
+
+    def test_reassigning_an_employee_moves_their_reviews(self):
+        review = Review.objects.get(employee=self.employee)
+        old_user, new_user = self.employee.user, User.objects.create_user('successor')
+        self.employee.user = new_user
+        self.employee.save()
+        self.assertEqual(self.found('reliable', old_user), set())
+        self.assertEqual(self.found('reliable', new_user), {('review', review.pk)})
+
+    def test_reassigning_a_manager_moves_their_reviews(self):
+        old_user, new_user = self.manager.user, User.objects.create_user('new-manager')
+        self.manager.user = new_user
+        self.manager.save()
+        self.assertEqual(self.found('reliable', old_user), set())
+        self.assertEqual(len(self.found('reliable', new_user)), 2)
+        self.assertEqual(len(self.found('reliable', self.employee.user)), 1)
+
+
+class ScorecardTests(TestCase):
+    SNAPSHOT_FIELDS = (
+        'employee_id', 'year', 'review_count', 'goals_avg', 'teamwork_avg', 'innovation_avg', 'work_ethics_avg',
+        'total_avg', 'overall_avg', 'latest_review_date', 'latest_total_review',
+    )
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.manager, cls.team = seed_organisation(employees=2, goals=0, journals=0, reviews=0)
+        cls.employee, cls.colleague = cls.team
+
+    def review(self, employee, year, month, score):
+        return Review.objects.create(
+            employee=employee, manager=self.manager, created_date=datetime(year, month, 1, 12, tzinfo=dt_timezone.utc),
+            goals_review=score, teamwork_review=score, innovation_review=score, work_ethics_review=score, total_review=score,
+        )
+
+    def snapshot(self):
+        return list(EmployeeScorecard.objects.order_by('employee_id', 'year').values_list(*self.SNAPSHOT_FIELDS))
+
+    def test_saving_reviews_refreshes_the_scorecard(self):
+        self.review(self.employee, 2023, 3, 8)
+        latest = self.review(self.employee, 2023, 9, 15)
+        scorecard = EmployeeScorecard.objects.get(employee=self.employee, year=2023)
+        self.assertEqual((scorecard.review_count, scorecard.total_avg, scorecard.overall_avg), (2, 11.5, 11.5))
+        self.assertEqual(scorecard.latest_total_review, 15)
+        latest.total_review = 0
+        latest.save()
+        scorecard.refresh_from_db()
+        self.assertEqual((scorecard.total_avg, scorecard.latest_total_review), (4, 0))
+
+    def test_deleting_reviews_refreshes_and_finally_removes_the_scorecard(self):
+        first = self.review(self.employee, 2023, 3, 8)
+        second = self.review(self.employee, 2023, 9, 15)
+        second.delete()
+        scorecard = EmployeeScorecard.objects.get(employee=self.employee, year=2023)
+        self.assertEqual((scorecard.review_count, scorecard.latest_total_review), (1, 8))
+        first.delete()
+        self.assertFalse(EmployeeScorecard.objects.exists())
+
+    def test_moving_a_review_recomputes_the_old_bucket(self):
+        self.review(self.employee, 2023, 3, 8)
+        moved = self.review(self.employee, 2023, 9, 15)
+        moved.employee = self.colleague
+        moved.save()
+        self.assertEqual(EmployeeScorecard.objects.get(employee=self.employee, year=2023).review_count, 1)
+        self.assertEqual(EmployeeScorecard.objects.get(employee=self.colleague, year=2023).latest_total_review, 15)
+        moved.created_date = datetime(2024, 2, 1, 12, tzinfo=dt_timezone.utc)
+        moved.save()
+        self.assertFalse(EmployeeScorecard.objects.filter(employee=self.colleague, year=2023).exists())
+        self.assertEqual(EmployeeScorecard.objects.get(employee=self.colleague, year=2024).review_count, 1)
+
+    def test_rebuild_matches_the_incremental_scorecards(self):
+        for month, score in ((1, 0), (5, 15), (11, 8)):
+            self.review(self.employee, 2023, month, score)
+            self.review(self.colleague, 2024, month, score)
+        self.review(self.employee, 2024, 6, 8).delete()
+        incremental = self.snapshot()
+        self.assertEqual(len(incremental), 2)
+        output = io.StringIO()
+        call_command('rebuild_scorecards', stdout=output)
+        self.assertIn('Rebuilt 2 scorecards.', output.getvalue())
+        self.assertEqual(self.snapshot(), incremental)
+
+
+class SearchIndexTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('searcher')
+        cls.goal = Goal.objects.create(
+            owner=cls.user, title='100% coverage', description='<p>Cover&nbsp;<b>every</b>\n module</p>',
+        )
+        cls.other = Goal.objects.create(owner=cls.user, title='1000 coverage', description='<p>Almost</p>')
+        cls.journal = GoalJournal.objects.create(goal=cls.goal, owner=cls.user, journal='Reached 40_percent today')
+
+    def found(self, query, vendor=None):
+        results = SearchResults(query, self.user)
+        if vendor:
+            results.vendor = vendor
+        return {(document.kind, document.object_id) for document in results.page(per_page=100)[0]}
+
+    def test_html_is_stripped(self):
+        self.assertEqual(strip_html('<p>Cover&nbsp;<b>every</b>\n module</p>'), 'Cover every module')
+        document = SearchDocument.objects.get(kind='goal', object_id=self.goal.pk)
+        self.assertEqual(document.body, 'Cover every module')
+        self.assertEqual(self.found('every'), {('goal', self.goal.pk)})
+        self.assertEqual(self.found('nbsp'), set())
+
+    @skipUnless(connection.vendor == 'sqlite', 'FTS5 is only used on SQLite')
+    def test_fts5_table_mirrors_the_documents(self):
+        table = SearchDocument._meta.db_table
+        with connection.cursor() as cursor:
+            cursor.execute(f'SELECT rowid FROM {table}_fts WHERE {table}_fts MATCH %s', [fts5_query('coverage')])
+            rowids = {row[0] for row in cursor.fetchall()}
+        self.assertEqual(rowids, set(SearchDocument.objects.values_list('id', flat=True)))
+
+    def test_signals_keep_documents_current(self):
+        self.goal.title = 'Full coverage'
+        self.goal.save()
+        self.assertEqual(SearchDocument.objects.get(kind='journal', object_id=self.journal.pk).title, 'Full coverage journal')
+        self.assertIn(('goal', self.goal.pk), self.found('full'))
+        self.journal.delete()
+        self.assertEqual(self.found('reached'), set())
+        self.goal.delete()
+        self.assertFalse(SearchDocument.objects.filter(object_id=self.goal.pk, kind='goal').exists())
+        self.assertEqual(self.found('every'), set())
+
+    def test_rebuild_command(self):
+        SearchDocument.objects.all().delete()
+        self.assertEqual(self.found('coverage'), set())
+        output = io.StringIO()
+        call_command('rebuild_search_index', stdout=output)
+        self.assertIn('Indexed 3 documents.', output.getvalue())
+        self.assertEqual(self.found('coverage'), {('goal', self.goal.pk), ('goal', self.other.pk), ('journal', self.journal.pk)})
+
+    def test_query_building(self):
+        self.assertEqual(fts5_query('say "hi"  there'), '"say" """hi""" "there"')
+        self.assertEqual(like_pattern('40_% off!'), '%40!_!% off!!%')
+        results = SearchResults('goals & reviews', self.user)
+        results.vendor = 'postgresql'
+        sql, params = results._scored_sql()
+        self.assertIn("websearch_to_tsquery('english', %s)", sql)
+        self.assertEqual(params, ['goals & reviews', 'goals & reviews', self.user.pk, self.user.pk])
+
+    def test_like_fallback_matches_wildcards_literally(self):
+        self.assertEqual(self.found('100%', vendor='other'), {('goal', self.goal.pk), ('journal', self.journal.pk)})
+        self.assertEqual(self.found('40_percent', vendor='other'), {('journal', self.journal.pk)})
+        self.assertEqual(self.found('40%percent', vendor='other'), set())
+        self.assertEqual(self.found('0 COVERAGE', vendor='other'), {('goal', self.other.pk)})
+
+
+class ExportTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.manager, cls.team = seed_organisation(employees=2, goals=2, journals=0, reviews=2)
+        sales_user = User.objects.create_user('sales-manager')
+        sales = Manager.objects.create(first_name='Sam', last_name='Sales', email='sam@example.com', department='Sales', user=sales_user)
+        seller_user = User.objects.create_user('seller')
+        cls.seller = Employee.objects.create(
+            first_name='Sid', last_name='Seller', email='sid@example.com', position='Rep', manager=sales, user=seller_user,
+        )
+        cls.sales_review = Review.objects.create(
+            employee=cls.seller, manager=sales, created_date=now(), goals_achievment='<p>Closed <b>deals</b></p>', total_review=15,
+        )
+        cls.sales_goal = Goal.objects.create(owner=seller_user, title='Close deals', start_date=now().date() - timedelta(days=400))
+        cls.hr_user = User.objects.create_superuser('hr')
+
+    def setUp(self):
+        self.client.force_login(self.hr_user)
+
+    def export(self, kind, format, **params):
+        response = self.client.get(reverse('export', kwargs={'kind': kind, 'format': format}), params)
+        self.assertEqual(response.status_code, 200)
+        return b''.join(response.streaming_content)
+
+    def test_csv_round_trip(self):
+        rows = list(csv.DictReader(io.StringIO(self.export('reviews', 'csv').decode())))
+        self.assertEqual(list(rows[0]), [name for name, _lookup in REVIEW_COLUMNS])
+        self.assertEqual([int(row['id']) for row in rows], list(Review.objects.order_by('id').values_list('id', flat=True)))
+        row = next(row for row in rows if int(row['id']) == self.sales_review.pk)
+        self.assertEqual(
+            (row['employee_last_name'], row['department'], row['total_review'], row['goals_achievment']),
+            ('Seller', 'Sales', '15', 'Closed deals'),
+        )
+
+    def test_jsonl_round_trip(self):
+        rows = [json.loads(line) for line in self.export('goals', 'jsonl').decode().splitlines()]
+        self.assertEqual(len(rows), Goal.objects.count())
+        row = next(row for row in rows if row['id'] == self.sales_goal.pk)
+        self.assertEqual(list(row), [name for name, _lookup in GOAL_COLUMNS])
+        self.assertEqual(row['start_date'], self.sales_goal.start_date.isoformat())
+        self.assertEqual((row['owner_username'], row['department'], row['title']), ('seller', 'Sales', 'Close deals'))
+
+    @skipUnless(find_spec('pyarrow'), 'Parquet export needs pyarrow')
+    def test_parquet_round_trip(self):
+        import pyarrow.parquet as pq
+        table = pq.read_table(io.BytesIO(self.export('reviews', 'parquet')))
+        self.assertEqual(table.column_names, [name for name, _lookup in REVIEW_COLUMNS])
+        rows = {row['id']: row for row in table.to_pylist()}
+        self.assertEqual(set(rows), set(Review.objects.values_list('id', flat=True)))
+        row = rows[self.sales_review.pk]
+        self.assertEqual(row['created_date'], self.sales_review.created_date)
+        self.assertEqual((row['total_review'], row['goals_achievment']), (15, 'Closed deals'))
+        goals = pq.read_table(io.BytesIO(self.export('goals', 'parquet'))).to_pylist()
+        self.assertIn(self.sales_goal.start_date, [goal['start_date'] for goal in goals])
+
+    def test_date_range_and_department_filters(self):
+        today = now().date()
+        rows = list(csv.DictReader(io.StringIO(self.export('reviews', 'csv', **{'from': today - timedelta(days=30)}).decode())))
+        expected = Review.objects.filter(created_date__date__gte=today - timedelta(days=30))
+        self.assertEqual({int(row['id']) for row in rows}, set(expected.values_list('id', flat=True)))
+        self.assertLess(len(rows), Review.objects.count())
+        rows = list(csv.DictReader(io.StringIO(self.export('reviews', 'csv', department='Sales').decode())))
+        self.assertEqual([int(row['id']) for row in rows], [self.sales_review.pk])
+        rows = [json.loads(line) for line in self.export(
+            'goals', 'jsonl', department='Sales', to=today - timedelta(days=300),
+        ).decode().splitlines()]
+        self.assertEqual([row['id'] for row in rows], [self.sales_goal.pk])
+        self.assertEqual(self.export('goals', 'jsonl', department='Marketing'), b'')
+
+
+class ChartCacheTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.manager, cls.team = seed_organisation(employees=2, goals=3, journals=0, reviews=0)
+        cls.user, cls.colleague = (employee.user for employee in cls.team)
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.user)
+        patcher = mock.patch.object(charts.renderer, 'submit')
+        self.submit = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_aggregates_are_cached_per_user_until_their_goals_change(self):
+        aggregates = charts.goal_aggregates(self.user)
+        colleague_aggregates = charts.goal_aggregates(self.colleague)
+        with self.assertNumQueries(0):
+            self.assertEqual(charts.goal_aggregates(self.user), aggregates)
+        Goal.objects.create(owner=self.user, title='One more', status=4)
+        with self.assertNumQueries(0):
+            self.assertEqual(charts.goal_aggregates(self.colleague), colleague_aggregates)
+        fresh = charts.goal_aggregates(self.user)
+        self.assertEqual(fresh['total'], aggregates['total'] + 1)
+        self.assertNotEqual(charts.aggregates_fingerprint(fresh), charts.aggregates_fingerprint(aggregates))
+
+    def test_aggregates_expire(self):
+        charts.goal_aggregates(self.user)
+        later = time.time() + charts.AGGREGATES_CACHE_TIMEOUT + 1
+        with mock.patch('time.time', return_value=later), self.assertNumQueries(1):
+            charts.goal_aggregates(self.user)
+
+    def test_chart_is_served_from_the_cache_until_a_goal_is_saved(self):
+        url = reverse('statistics_chart', kwargs={'chart': 'status'})
+        self.assertEqual(self.client.get(url).status_code, 202)
+        key, chart, labels, values = self.submit.call_args.args
+        self.assertEqual((chart, sum(values)), ('status', 3))
+        charts._store_chart(key, b'png')
+        response = self.client.get(url)
+        self.assertEqual((response.status_code, response.content), (200, b'png'))
+        goal = Goal.objects.filter(owner=self.user).first()
+        goal.status = 4
+        goal.save()
+        self.assertEqual(self.client.get(url).status_code, 202)
+        self.assertNotEqual(self.submit.call_args.args[0], key)
+
+
+class PendingExecutor:
+    """Stands in for the process pool: jobs stay pending until the test resolves them."""
+
+    def __init__(self):
+        self.jobs = []
+
+    def submit(self, fn, *args):
+        future = Future()
+        self.jobs.append((future, args))
+        return future
+
+
+class ChartRendererTests(TestCase):
+    def setUp(self):
+        self.executor = PendingExecutor()
+        self.done = []
+        self.renderer = ChartRenderer(max_pending=2, on_done=lambda key, png: self.done.append((key, png)))
+        self.renderer._get_executor = lambda: self.executor
+
+    def test_concurrent_requests_share_one_render_job(self):
+        barrier = threading.Barrier(8)
+        futures = []
+
+        def request():
+            barrier.wait()
+            futures.append(self.renderer.submit('chart:status:a', 'status', ['Done'], [1]))
+
+        threads = [threading.Thread(target=request) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len(self.executor.jobs), 1)
+        self.assertEqual({id(future) for future in futures}, {id(self.executor.jobs[0][0])})
+        self.assertTrue(self.renderer.is_pending('chart:status:a'))
+        self.executor.jobs[0][0].set_result(b'png')
+        self.assertEqual(self.done, [('chart:status:a', b'png')])
+        self.assertFalse(self.renderer.is_pending('chart:status:a'))
+
+    def test_failed_render_frees_the_key_without_storing(self):
+        future = self.renderer.submit('chart:status:a', 'status', ['Done'], [1])
+        with self.assertLogs('goals_management.rendering', 'ERROR'):
+            future.set_exception(ValueError('bad data'))
+        self.assertEqual(self.done, [])
+        self.assertFalse(self.renderer.is_pending('chart:status:a'))
+
+    def test_full_backlog_is_refused(self):
+        self.renderer.submit('chart:status:a', 'status', ['Done'], [1])
+        self.renderer.submit('chart:status:b', 'status', ['Done'], [2])
+        with self.assertRaises(RenderQueueFull):
+            self.renderer.submit('chart:status:c', 'status', ['Done'], [3])
+        self.renderer.submit('chart:status:a', 'status', ['Done'], [1])
+        self.executor.jobs[0][0].set_result(b'png')
+        self.renderer.submit('chart:status:c', 'status', ['Done'], [3])
+        self.assertEqual(len(self.executor.jobs), 3)
+
+    def test_full_backlog_is_a_503(self):
+        user = get_user_model().objects.create(username='charts')
+        self.client.force_login(user)
+        cache.clear()
+        with mock.patch.object(charts.renderer, 'submit', side_effect=RenderQueueFull('key')):
+            response = self.client.get(reverse('statistics_chart', kwargs={'chart': 'priority'}))
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response['Retry-After'], '2')
+
+    def test_charts_render_without_warnings(self):
+        data = {
+            'priority': (['Low', 'Medium', 'High'], [3, 1, 2]),
+            'status': (['Draft', 'Done'], [2, 4]),
+            'progress': (['In Progress', 'On Hold'], [40.0, 25.0]),
+        }
+        for chart, (labels, values) in data.items():
+            with self.subTest(chart=chart), warnings.catch_warnings():
+                warnings.simplefilter('error')
+                self.assertTrue(render_chart(chart, labels, values).startswith(b'\x89PNG'))
+
+
+class GoalStatisticsTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user, other = (get_user_model().objects.create(username=name) for name in ('owner', 'other'))
+        Goal.objects.bulk_create([
+            Goal(title=f'Goal {i}', owner=cls.user, status=i % 5, priority=i % 2, progress=(i * 30) % 110)
+            for i in range(23)
+        ] + [Goal(title='Not mine', owner=other, status=1, priority=2, progress=100)])
+
+    def test_compute_matches_the_per_breakdown_queries(self):
+        priority_counts, status_counts, in_progress_sum, on_hold_sum, in_progress, on_hold, total = \
+            legacy_statistics(self.user)
+        with self.assertNumQueries(1):
+            computed = GoalStatistics.for_owner(self.user).compute()
+        self.assertEqual(computed['total'], total)
+        self.assertEqual(
+            {value: count for value, count in computed['priority'].items() if count},
+            {row['priority']: row['count'] for row in priority_counts},
+        )
+        self.assertEqual(
+            {value: count for value, count in computed['status'].items() if count},
+            {row['status']: row['count'] for row in status_counts},
+        )
+        self.assertEqual((computed['status'][1], computed['status'][3]), (in_progress, on_hold))
+        self.assertAlmostEqual(computed['progress'][1] * in_progress, in_progress_sum)
+        self.assertAlmostEqual(computed['progress'][3] * on_hold, on_hold_sum)
+
+    def test_owner_without_goals(self):
+        computed = GoalStatistics.for_owner(get_user_model().objects.create(username='new')).compute()
+        self.assertEqual(computed['total'], 0)
+        self.assertEqual(set(computed['status'].values()), {0})
+        self.assertEqual(set(computed['progress'].values()), {0.0})
+
+
+class ProfilingMiddlewareTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.manager, cls.team = seed_organisation(employees=2, goals=3)
+        cls.employee = cls.team[0]
+
+    def setUp(self):
+        log_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, log_dir)
+        self.log = os.path.join(log_dir, 'profiling.jsonl')
+        self.client.force_login(self.employee.user)
+        self.client.cookies[settings.CSRF_COOKIE_NAME] = CSRF_COOKIE
+
+    def test_disabled_profiling_adds_nothing(self):
+        with override_settings(REQUEST_PROFILING=False, REQUEST_PROFILING_LOG=self.log):
+            response = self.client.get(reverse('goal_list'))
+        self.assertNotIn('Server-Timing', response)
+        self.assertFalse(os.path.exists(self.log))
+
+    def test_profiled_requests_are_timed_logged_and_summarised(self):
+        with override_settings(REQUEST_PROFILING=True, REQUEST_PROFILING_LOG=self.log):
+            responses = [self.client.get(reverse('goal_list')) for _ in range(3)]
+            self.client.get(reverse('statistics'))
+            timing = responses[0]['Server-Timing']
+            self.assertRegex(timing, r'sql;dur=[\d.]+;desc="\d+ queries"')
+            self.assertIn('template;dur=', timing)
+            self.assertIn('total;dur=', timing)
+            self.assertNotIn('template;dur=', responses[-1]['Server-Timing'])
+            with open(self.log) as log:
+                records = [json.loads(line) for line in log]
+            self.assertEqual([record['url_name'] for record in records], ['goal_list'] * 3 + ['statistics'])
+            self.assertGreater(records[0]['sql_count'], 0)
+            self.assertIn('chart_ms', records[-1])
+            self.assertEqual(records[2]['cache']['page.goal_list'], {'hits': 1, 'misses': 0})
+            output = io.StringIO()
+            call_command('profiling_summary', metric='sql_count', stdout=output)
+            report = io.StringIO()
+            call_command('cache_report', url_name='goal_list', stdout=report)
+        lines = output.getvalue().splitlines()
+        self.assertIn('p95', lines[0])
+        self.assertTrue(any(line.startswith('goal_list') and ' 3 ' in line for line in lines))
+        page_line = next(line for line in report.getvalue().splitlines() if line.startswith('page.goal_list'))
+        self.assertEqual(page_line.split()[1:], ['3', '2', '1', '66.7%'])
+
+    def test_duplicate_queries_share_a_fingerprint(self):
+        first, _sql = fingerprint('SELECT * FROM "goal" WHERE "id" IN (%s, %s, %s)')
+        second, _sql = fingerprint('SELECT * FROM "goal" WHERE "id" IN (%s, %s)')
+        self.assertEqual(first, second)
+
+
+class RoleResolutionTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.manager, cls.team = seed_organisation(employees=2, goals=1, journals=0, reviews=1)
+        cls.employee = cls.team[0]
+
+    def setUp(self):
+        cache.clear()
+
+    def roles_for(self, user):
+        request = RequestFactory().get('/')
+        request.user = user
+        return resolve_roles(request)
+
+    def test_roles_are_loaded_once_and_cached(self):
+        with self.assertNumQueries(1):
+            roles = self.roles_for(self.manager.user)
+        self.assertEqual(roles, UserRoles(manager_id=self.manager.pk))
+        with self.assertNumQueries(0):
+            self.assertTrue(self.roles_for(self.manager.user).is_manager)
+
+    def test_role_changes_invalidate_the_cache(self):
+        user = self.employee.user
+        self.assertFalse(self.roles_for(user).is_manager)
+        manager = Manager.objects.create(first_name='Nina', last_name='New', user=user)
+        self.assertEqual(self.roles_for(user).manager_id, manager.pk)
+        manager.user = self.team[1].user
+        manager.save()
+        self.assertFalse(self.roles_for(user).is_manager)
+        self.assertEqual(self.roles_for(self.team[1].user).manager_id, manager.pk)
+
+    def test_manager_views_reject_employees(self):
+        self.client.force_login(self.employee.user)
+        for name, kwargs in (
+            ('employees_list', {}),
+            ('department_reviews', {}),
+            ('create_review_for_any', {}),
+            ('employee_goals_list', {'pk': self.employee.pk}),
+        ):
+            with self.subTest(view=name):
+                self.assertEqual(self.client.get(reverse(name, kwargs=kwargs)).status_code, 403)
+
+
+class MemoizedObjectTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.manager, cls.team = seed_organisation(employees=1, goals=1, journals=25, reviews=1)
+        cls.user = cls.team[0].user
+        cls.goal = Goal.objects.get(owner=cls.user)
+
+    def goal_selects(self, queries):
+        return [
+            query['sql'] for query in queries.captured_queries
+            if query['sql'].startswith('SELECT') and 'FROM "goals_management_goal"' in query['sql']
+        ]
+
+    def test_journal_post_fetches_the_goal_once(self):
+        self.client.force_login(self.user)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(
+                reverse('goal_detail', kwargs={'pk': self.goal.pk}),
+                {'journal': 'Kept going', 'goal': self.goal.pk, 'owner': self.user.pk},
+            )
+        self.assertRedirects(response, reverse('goal_detail', kwargs={'pk': self.goal.pk}), fetch_redirect_response=False)
+        self.assertEqual(len(self.goal_selects(queries)), 1)
+
+    def test_goal_detail_renders_only_the_newest_journals(self):
+        self.client.force_login(self.user)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('goal_detail', kwargs={'pk': self.goal.pk}))
+        self.assertEqual(len(self.goal_selects(queries)), 1)
+        self.assertEqual(len(response.context['journals']), views.JOURNALS_PER_PAGE)
+        self.assertContains(response, 'class="journal-more"')
+
+    def test_journal_timeline_pages_through_every_entry_once(self):
+        self.client.force_login(self.user)
+        url = reverse('goal_journals', kwargs={'pk': self.goal.pk})
+        seen, cursor = [], ''
+        while True:
+            with CaptureQueriesContext(connection) as queries:
+                data = self.client.get(url, {'format': 'json', 'cursor': cursor}).json()
+            journal_selects = [
+                query for query in queries.captured_queries if 'FROM "goals_management_goaljournal"' in query['sql']
+            ]
+            self.assertEqual(len(journal_selects), 1)
+            seen += [entry['id'] for entry in data['results']]
+            cursor = data['next_cursor']
+            if not cursor:
+                break
+        expected = GoalJournal.objects.filter(goal=self.goal).order_by('-journal_date', '-id')
+        self.assertEqual(seen, list(expected.values_list('id', flat=True)))
+
+    def test_journal_timeline_is_limited_to_the_owner_and_their_manager(self):
+        url = reverse('goal_journals', kwargs={'pk': self.goal.pk})
+        response = self.client.get(url, {'format': 'json'})
+        self.assertRedirects(response, f"{reverse('login')}?next={url}%3Fformat%3Djson", fetch_redirect_response=False)
+        self.client.force_login(User.objects.create_user('outsider'))
+        self.assertEqual(self.client.get(url, {'format': 'json'}).status_code, 404)
+        self.client.force_login(self.manager.user)
+        self.assertEqual(len(self.client.get(url, {'format': 'json'}).json()['results']), views.JOURNALS_PER_PAGE)
+
+
+class AsyncViewTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.manager, cls.team = seed_organisation(employees=1, goals=3, journals=1, reviews=2)
+        cls.user = cls.team[0].user
+
+    async def test_read_views_serve_over_asgi(self):
+        await sync_to_async(self.async_client.force_login)(self.user)
+        for name, query in (
+            ('goal_list', {}),
+            ('goal_list', {'status': '1'}),
+            ('review_list', {}),
+            ('search', {'query': 'milestone'}),
+        ):
+            with self.subTest(view=name, query=query):
+                response = await self.async_client.get(reverse(name), query)
+                self.assertEqual(response.status_code, 200)
+        response = await self.async_client.get(reverse('statistics_data'))
+        self.assertEqual(response.json()['total'], 3)
+
+    async def test_search_json_streams_from_the_async_iterator(self):
+        await sync_to_async(self.async_client.force_login)(self.user)
+        response = await self.async_client.get(reverse('search'), {'query': 'milestone', 'format': 'json'})
+        body = b''.join([chunk async for chunk in response.streaming_content])
+        self.assertEqual(len(json.loads(body)['results']), 3)
+
+    async def test_anonymous_requests_are_redirected_to_login(self):
+        response = await self.async_client.get(reverse('goal_list'))
+        self.assertEqual(response.status_code, 302)
+        self.assertIn(settings.LOGIN_URL, response['Location'])
+
+
+class DatabaseProfileTests(TestCase):
+    def test_profiles(self):
+        base_dir = settings.BASE_DIR
+        databases, pragmas = database_settings(base_dir, {})
+        self.assertEqual(databases['default']['NAME'], base_dir / 'db.sqlite3')
+        self.assertEqual(pragmas['journal_mode'], 'WAL')
+        self.assertEqual(database_settings(base_dir, {'DATABASE_PROFILE': 'sqlite-legacy'})[1], {'journal_mode': 'DELETE'})
+        databases, pragmas = database_settings(base_dir, {'DATABASE_PROFILE': 'postgresql', 'POSTGRES_DB': 'erp'})
+        self.assertEqual(databases['default']['NAME'], 'erp')
+        self.assertTrue(databases['default']['CONN_HEALTH_CHECKS'])
+        self.assertGreater(databases['default']['CONN_MAX_AGE'], 0)
+        databases, pragmas = database_settings(base_dir, {'DATABASE_PROFILE': 'pgbouncer'})
+        self.assertTrue(databases['default']['DISABLE_SERVER_SIDE_CURSORS'])
+        with self.assertRaises(ValueError):
+            database_settings(base_dir, {'DATABASE_PROFILE': 'oracle'})
+
+    def test_replica_alias(self):
+        base_dir = settings.BASE_DIR
+        databases, _pragmas = database_settings(base_dir, {})
+        self.assertEqual(databases['replica']['NAME'], databases['default']['NAME'])
+        databases, _pragmas = database_settings(base_dir, {'DATABASE_REPLICA_PATH': '/srv/replica.sqlite3'})
+        self.assertEqual(databases['replica']['NAME'], '/srv/replica.sqlite3')
+        databases, _pragmas = database_settings(
+            base_dir, {'DATABASE_PROFILE': 'postgresql', 'POSTGRES_DB': 'erp', 'POSTGRES_REPLICA_HOST': 'standby'},
+        )
+        self.assertEqual(databases['replica']['HOST'], 'standby')
+        self.assertEqual(databases['replica']['NAME'], 'erp')
+        self.assertNotEqual(databases['replica']['TEST']['NAME'], databases['default'].get('TEST', {}).get('NAME'))
+
+    @skipUnless(connection.vendor == 'sqlite', 'SQLite pragmas')
+    def test_new_sqlite_connections_are_tuned(self):
+        with connection.cursor() as cursor:
+            cursor.execute('PRAGMA synchronous')
+            self.assertEqual(cursor.fetchone()[0], 1)
+            cursor.execute('PRAGMA busy_timeout')
+            self.assertEqual(cursor.fetchone()[0], settings.SQLITE_PRAGMAS['busy_timeout'])
+
+
+@override_settings(DATABASE_REPLICA_READS=True)
+class ReplicaRoutingTests(TestCase):
+    """The test replica is a separate database, so rows written to it only show which alias was read."""
+    databases = {'default', 'replica'}
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('reporter')
+        cls.goal = Goal.objects.create(owner=cls.user, title='On the primary')
+        cls.user.save(using='replica')
+        for i in range(3):
+            Goal.objects.using('replica').create(owner_id=cls.user.pk, title=f'On the replica {i}')
+
+    def test_reporting_views_read_the_replica(self):
+        self.client.force_login(self.user)
+        self.assertEqual(self.client.get(reverse('statistics_data')).json()['total'], 3)
+        with override_settings(DATABASE_REPLICA_READS=False):
+            self.assertEqual(self.client.get(reverse('statistics_data')).json()['total'], 1)
+
+    def test_other_views_and_apps_stay_on_the_primary(self):
+        self.assertEqual(Goal.objects.all().db, 'default')
+
+        @replica_reads
+        def view(request):
+            return JsonResponse({'goal': Goal.objects.all().db, 'user': User.objects.all().db})
+
+        response = view(RequestFactory().get('/'))
+        self.assertEqual(json.loads(response.content), {'goal': 'replica', 'user': 'default'})
+
+    def test_reads_after_a_write_use_the_primary(self):
+        @replica_reads
+        def view(request):
+            before = Goal.objects.all().db
+            GoalJournal.objects.create(goal=self.goal, owner=self.user, journal='Written mid-request')
+            return JsonResponse({'before': before, 'after': Goal.objects.all().db})
+
+        response = view(RequestFactory().get('/'))
+        self.assertEqual(json.loads(response.content), {'before': 'replica', 'after': 'default'})
+
+    def test_streamed_content_reads_the_replica(self):
+        @replica_reads
+        def view(request):
+            return StreamingHttpResponse(Goal.objects.all().db for _ in range(2))
+
+        self.assertEqual(b''.join(view(RequestFactory().get('/')).streaming_content), b'replicareplica')
+
+    def test_client_is_pinned_to_the_primary_after_posting(self):
+        self.client.force_login(self.user)
+        response = self.client.post(reverse('goal_detail', kwargs={'pk': self.goal.pk}), {'journal': 'Kept going'})
+        self.assertEqual(response.cookies[PIN_COOKIE]['max-age'], settings.DATABASE_REPLICA_PIN_SECONDS)
+        self.assertEqual(self.client.get(reverse('statistics_data')).json()['total'], 1)
+
+    def test_middleware_chain_stays_async(self):
+        for enabled in (True, False):
+            with self.subTest(enabled=enabled), override_settings(DEBUG=True, DATABASE_REPLICA_READS=enabled):
+                with self.assertLogs('django.request', 'DEBUG') as logs:
+                    logging.getLogger('django.request').debug('Loading the ASGI middleware chain.')
+                    ASGIHandler()
+                # Django logs the adaptation it prepares for the sync-only ProfilingMiddleware before that
+                # middleware declines (REQUEST_PROFILING is off), so it is not part of the chain.
+                adapted = [line for line in logs.output if 'adapted' in line and 'ProfilingMiddleware' not in line]
+                self.assertEqual(adapted, [])
+
+    def test_pin_middleware_is_not_installed_without_replica_reads(self):
+        with override_settings(DATABASE_REPLICA_READS=False), self.assertRaises(MiddlewareNotUsed):
+            PinPrimaryMiddleware(lambda request: None)
+
+
+class CachingTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.manager, cls.team = seed_organisation(employees=2, goals=2, journals=1, reviews=1)
+        cls.employee = cls.team[0]
+        cls.user = cls.employee.user
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.user)
+        self.client.cookies[settings.CSRF_COOKIE_NAME] = CSRF_COOKIE
+
+    def test_cache_backends(self):
+        self.assertEqual(cache_settings(settings.BASE_DIR, {})['default']['BACKEND'], 'goals_management.caching.LocMemCache')
+        caches = cache_settings(settings.BASE_DIR, {'CACHE_BACKEND': 'redis', 'REDIS_URL': 'redis://cache:6379/0'})
+        self.assertEqual(caches['default']['LOCATION'], 'redis://cache:6379/0')
+        with self.assertRaises(ValueError):
+            cache_settings(settings.BASE_DIR, {'CACHE_BACKEND': 'memcached'})
+
+    def test_goal_list_is_cached_per_user_until_their_goals_change(self):
+        url = reverse('goal_list')
+        with CaptureQueriesContext(connection) as first:
+            self.client.get(url)
+        with CaptureQueriesContext(connection) as second:
+            self.client.get(url)
+        self.assertFalse(any('"goals_management_goal"."title"' in query['sql'] for query in second.captured_queries))
+        self.assertLess(len(second), len(first))
+        self.client.force_login(self.team[1].user)
+        self.assertNotContains(self.client.get(url), f'of {self.user}')
+        self.client.force_login(self.user)
+        Goal.objects.create(owner=self.user, title='Freshly planned')
+        self.assertContains(self.client.get(url), 'Freshly planned')
+
+    def test_pages_with_csrf_tokens_are_cached_per_browser(self):
+        url = reverse('goal_list')
+        self.client.get(url)
+        self.assertIsNone(self.client.get(url).context)
+        other_browser = self.client_class(enforce_csrf_checks=True)
+        other_browser.force_login(self.user)
+        self.assertIn(settings.CSRF_COOKIE_NAME, other_browser.get(url).cookies)
+        self.assertIsNotNone(other_browser.get(url).context)
+        cached = other_browser.get(url)
+        self.assertIsNone(cached.context)
+        token = re.search(r'name="csrfmiddlewaretoken" value="(\w+)"', cached.content.decode()).group(1)
+        goal = Goal.objects.filter(owner=self.user).first()
+        response = other_browser.post(reverse('bulk_update_goals'), {
+            'csrfmiddlewaretoken': token, 'goals': [goal.pk], 'status': 2,
+        })
+        self.assertEqual(response.status_code, 302)
+
+    def test_review_list_is_invalidated_by_review_changes(self):
+        url = reverse('review_list')
+        self.client.get(url)
+        review = Review.objects.filter(employee=self.employee).first()
+        review.total_review = 3
+        review.save()
+        self.assertContains(self.client.get(url), review.get_total_review_display())
+
+    def test_pages_with_flashed_messages_are_not_cached(self):
+        response = self.client.post(reverse('create_goal'), {
+            'title': 'With a message', 'start_date': '2024-01-01', 'priority': 1, 'status': 0, 'progress': 0,
+        }, follow=True)
+        self.assertContains(response, 'Goal is created successfully!')
+        self.assertNotContains(self.client.get(reverse('goal_list')), 'Goal is created successfully!')
+
+    def test_chrome_fragments_are_cached_until_the_user_changes(self):
+        url = reverse('goal_detail', kwargs={'pk': Goal.objects.filter(owner=self.user).first().pk})
+        self.client.get(url)
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(url)
+        self.assertFalse(any('user_profile_profile' in query['sql'] for query in queries.captured_queries))
+        self.user.username = 'renamed-employee'
+        self.user.save()
+        self.assertContains(self.client.get(url), 'renamed-employee')
+
+
+class ConditionalGetTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.manager, cls.team = seed_organisation(employees=1, goals=2, journals=1, reviews=1)
+        cls.employee = cls.team[0]
+        cls.user = cls.employee.user
+        cls.goal = Goal.objects.filter(owner=cls.user).first()
+        cls.review = Review.objects.get(employee=cls.employee)
+
+    def setUp(self):
+        cache.clear()
+
+    def revalidate(self, url, etag):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        app_queries = [query for query in queries.captured_queries if 'goals_management_' in query['sql']]
+        return response, app_queries
+
+    def test_goal_list_revalidates_with_one_query_until_a_goal_changes(self):
+        self.client.force_login(self.user)
+        url = reverse('goal_list')
+        etag = self.client.get(url)['ETag']
+        response, app_queries = self.revalidate(url, etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(len(app_queries), 1)
+        self.assertEqual(response.content, b'')
+        self.goal.progress = 50
+        self.goal.save()
+        response, _queries = self.revalidate(url, etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_goal_detail_changes_with_its_journals(self):
+        self.client.force_login(self.user)
+        url = reverse('goal_detail', kwargs={'pk': self.goal.pk})
+        etag = self.client.get(url)['ETag']
+        self.assertEqual(self.revalidate(url, etag)[0].status_code, 304)
+        GoalJournal.objects.create(goal=self.goal, owner=self.user, journal='Another step')
+        self.assertEqual(self.revalidate(url, etag)[0].status_code, 200)
+
+    def test_review_and_employee_details_change_with_the_review(self):
+        self.client.force_login(self.manager.user)
+        urls = [
+            reverse('review_detail', kwargs={'pk': self.review.pk}),
+            reverse('employee_detail', kwargs={'pk': self.employee.pk}),
+        ]
+        etags = [self.client.get(url)['ETag'] for url in urls]
+        for url, etag in zip(urls, etags):
+            self.assertEqual(self.revalidate(url, etag)[0].status_code, 304)
+        self.review.total_review = 15
+        self.review.save()
+        for url, etag in zip(urls, etags):
+            self.assertEqual(self.revalidate(url, etag)[0].status_code, 200)
+
+    def test_review_list_etag_depends_on_the_viewer(self):
+        self.client.force_login(self.user)
+        url = reverse('review_list')
+        etag = self.client.get(url)['ETag']
+        self.assertEqual(self.revalidate(url, etag)[0].status_code, 304)
+        self.client.force_login(self.manager.user)
+        self.assertEqual(self.revalidate(url, etag)[0].status_code, 200)
+
+    def test_pages_with_flashed_messages_get_no_etag(self):
+        self.client.force_login(self.user)
+        url = reverse('goal_detail', kwargs={'pk': self.goal.pk})
+        response = self.client.post(url, {'journal': 'Posted'}, follow=True)
+        self.assertContains(response, 'Goal journal added!')
+        self.assertNotIn('ETag', response)
+
+
+class ApiTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.manager, cls.team = seed_organisation(employees=2, goals=3, journals=1, reviews=1)
+        cls.employee, cls.colleague = cls.team
+        cls.user = cls.employee.user
+        cls.goal = Goal.objects.filter(owner=cls.user).first()
+        cls.other_goal = Goal.objects.filter(owner=cls.colleague.user).first()
+
+    def url(self, resource, pk=None):
+        if pk is None:
+            return reverse('api_collection', kwargs={'resource': resource})
+        return reverse('api_item', kwargs={'resource': resource, 'pk': pk})
+
+    def send(self, method, url, data):
+        return getattr(self.client, method)(url, json.dumps(data), content_type='application/json')
+
+    def test_sparse_fields(self):
+        self.client.force_login(self.user)
+        response = self.client.get(self.url('goals'), {'fields': 'id,status,progress'})
+        self.assertEqual(response.status_code, 200)
+        results = response.json()['results']
+        self.assertEqual(len(results), 3)
+        self.assertEqual(set(results[0]), {'id', 'status', 'progress'})
+        response = self.client.get(self.url('goals'), {'fields': 'id,secret'})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()['fields'], ['secret'])
+
+    def test_cursor_pages_through_every_row(self):
+        self.client.force_login(self.manager.user)
+        seen, params = [], {'fields': 'id', 'limit': 2}
+        while True:
+            page = self.client.get(self.url('goals'), params).json()
+            seen += [row['id'] for row in page['results']]
+            if not page['next_cursor']:
+                break
+            params['cursor'] = page['next_cursor']
+        expected = Goal.objects.filter(owner__employee__manager=self.manager).order_by('-id')
+        self.assertEqual(seen, list(expected.values_list('id', flat=True)))
+
+    def test_ownership(self):
+        self.client.force_login(self.user)
+        self.assertEqual(self.client.get(self.url('goals', self.other_goal.pk)).status_code, 404)
+        self.assertEqual(self.send('patch', self.url('goals', self.other_goal.pk), {'progress': 5}).status_code, 404)
+        self.client.force_login(self.manager.user)
+        self.assertEqual(self.client.get(self.url('goals', self.goal.pk)).json()['id'], self.goal.pk)
+        self.assertEqual(self.send('patch', self.url('goals', self.goal.pk), {'progress': 5}).status_code, 403)
+
+    def test_create_goal_journal_and_review(self):
+        self.client.force_login(self.user)
+        response = self.send('post', self.url('goals'), {
+            'title': 'Ship the API', 'description': 'JSON', 'start_date': '2024-01-01',
+            'end_date': '2024-06-30', 'priority': 1, 'status': 0, 'progress': 0,
+        })
+        self.assertEqual(response.status_code, 201, response.content)
+        self.assertEqual(response.json()['owner'], self.user.pk)
+        response = self.send('post', self.url('journals'), {'goal': self.goal.pk, 'journal': 'Started'})
+        self.assertEqual(response.status_code, 201, response.content)
+        response = self.send('post', self.url('journals'), {'goal': self.other_goal.pk, 'journal': 'Sneaky'})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('goal', response.json()['errors'])
+        self.assertEqual(self.send('post', self.url('reviews'), {'employee': self.employee.pk}).status_code, 403)
+        self.client.force_login(self.manager.user)
+        response = self.send('post', self.url('reviews'), {
+            'employee': self.employee.pk, 'goals_achievment': 'Shipped', 'goals_review': 8,
+            'teamwork': 'Helpful', 'teamwork_review': 15, 'innovation': 'Curious', 'innovation_review': 8,
+            'work_ethics': 'Reliable', 'work_ethics_review': 8, 'total_review': 8,
+        })
+        self.assertEqual(response.status_code, 201, response.content)
+        self.assertEqual(response.json()['manager'], self.manager.pk)
+
+    def test_patch_and_delete(self):
+        self.client.force_login(self.user)
+        response = self.send('patch', self.url('goals', self.goal.pk), {'progress': 70})
+        self.assertEqual(response.status_code, 200, response.content)
+        self.assertEqual(response.json()['progress'], 70)
+        self.goal.refresh_from_db()
+        self.assertEqual(self.goal.progress, 70)
+        response = self.send('patch', self.url('goals', self.goal.pk), {'progress': 'lots'})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('progress', response.json()['errors'])
+        self.assertEqual(self.client.delete(self.url('goals', self.goal.pk)).status_code, 204)
+        self.assertFalse(Goal.objects.filter(pk=self.goal.pk).exists())
+
+    def test_read_only_resources_and_anonymous_requests(self):
+        self.client.force_login(self.manager.user)
+        response = self.client.get(self.url('employees'), {'fields': 'id'})
+        self.assertEqual(len(response.json()['results']), 2)
+        self.assertEqual(self.send('patch', self.url('employees', self.employee.pk), {'position': 'CTO'}).status_code, 405)
+        self.assertEqual(self.send('post', self.url('managers'), {}).status_code, 405)
+        self.assertEqual(self.client.get(self.url('unknown')).status_code, 404)
+        self.client.logout()
+        self.assertEqual(self.client.get(self.url('goals')).status_code, 401)
+
+
+class BulkGoalUpdateTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.manager, cls.team = seed_organisation(employees=2, goals=4, journals=0, reviews=0)
+        cls.user = cls.team[0].user
+        cls.goals = list(Goal.objects.filter(owner=cls.user).order_by('pk'))
+        cls.other_goal = Goal.objects.filter(owner=cls.team[1].user).first()
+
+    def setUp(self):
+        cache.clear()
+
+    def test_changes_are_validated(self):
+        with self.assertRaises(BulkUpdateError) as raised:
+            clean_changes([{'id': 1, 'status': 9}, {'id': 'x', 'progress': 10}, {'id': 2, 'title': 'No'}, {'id': 3}])
+        self.assertEqual(set(raised.exception.errors), {'0', '1', '2', '3'})
+        with self.assertRaises(BulkUpdateError):
+            clean_changes([{'id': 1, 'status': 1}, {'id': 1, 'status': 2}])
+        self.assertEqual(clean_changes([{'id': '5', 'progress': '30'}]), {5: {'progress': 30}})
+
+    def test_batch_is_applied_in_one_update_and_recorded_once(self):
+        changes = clean_changes([{'id': goal.pk, 'status': 2, 'progress': 100} for goal in self.goals])
+        with CaptureQueriesContext(connection) as queries:
+            batch = update_goals(self.user, changes)
+        updates = [query for query in queries.captured_queries if query['sql'].startswith('UPDATE "goals_management_goal"')]
+        self.assertEqual(len(updates), 1)
+        self.assertEqual(batch.goal_count, len(self.goals))
+        self.assertEqual(GoalBatchUpdate.objects.count(), 1)
+        self.assertEqual(batch.changes[0]['id'], self.goals[0].pk)
+        self.assertEqual(batch.changes[0]['status'], [self.goals[0].status, 2])
+        self.assertEqual(set(Goal.objects.filter(owner=self.user).values_list('status', 'progress')), {(2, 100)})
+        self.assertGreater(Goal.objects.get(pk=self.goals[0].pk).updated_at, self.goals[0].updated_at)
+        self.assertIsNone(update_goals(self.user, changes))
+
+    def test_batch_with_a_foreign_goal_changes_nothing(self):
+        changes = clean_changes([{'id': self.goals[0].pk, 'status': 4}, {'id': self.other_goal.pk, 'status': 4}])
+        with self.assertRaises(BulkUpdateError) as raised:
+            update_goals(self.user, changes)
+        self.assertEqual(raised.exception.status, 403)
+        self.assertEqual(raised.exception.errors, {'goals': [self.other_goal.pk]})
+        self.assertNotEqual(Goal.objects.get(pk=self.goals[0].pk).status, 4)
+        self.assertFalse(GoalBatchUpdate.objects.exists())
+
+    def test_api_patch(self):
+        self.client.force_login(self.user)
+        url = reverse('api_collection', kwargs={'resource': 'goals'})
+        payload = {'changes': [{'id': goal.pk, 'priority': 2} for goal in self.goals[:2]]}
+        response = self.client.patch(url + '?fields=id,priority', json.dumps(payload), content_type='application/json')
+        self.assertEqual(response.status_code, 200, response.content)
+        self.assertEqual(response.json()['results'], [{'id': goal.pk, 'priority': 2} for goal in reversed(self.goals[:2])])
+        payload = {'changes': [{'id': self.other_goal.pk, 'priority': 2}]}
+        response = self.client.patch(url, json.dumps(payload), content_type='application/json')
+        self.assertEqual(response.status_code, 403)
+        response = self.client.patch(
+            reverse('api_collection', kwargs={'resource': 'reviews'}), json.dumps(payload), content_type='application/json',
+        )
+        self.assertEqual(response.status_code, 405)
+
+    def test_list_page_action(self):
+        self.client.force_login(self.user)
+        url = reverse('goal_list')
+        self.client.get(url)
+        response = self.client.post(reverse('bulk_update_goals'), {
+            'goals': [goal.pk for goal in self.goals[:3]], 'status': 4, 'progress': '', 'priority': '',
+        }, follow=True)
+        self.assertContains(response, '3 goals updated.')
+        self.assertEqual(Goal.objects.filter(owner=self.user, status=4).count(), 3)
+        response = self.client.post(reverse('bulk_update_goals'), {'goals': [self.goals[0].pk]}, follow=True)
+        self.assertContains(response, 'Choose a status, progress or priority to apply.')
+        response = self.client.post(reverse('bulk_update_goals'), {'status': 1}, follow=True)
+        self.assertContains(response, 'Select the goals to change.')
+
+
+class TeamReviewTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.manager, cls.team = seed_organisation(employees=4, goals=0, journals=0, reviews=0)
+        cls.outsider = Employee.objects.create(first_name='Otto', last_name='Outsider', email='otto@example.com', position='Sales')
+        cls.url = reverse('create_team_reviews')
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.manager.user)
+
+    def post_data(self, rows):
+        data = {'form-TOTAL_FORMS': len(self.team), 'form-INITIAL_FORMS': len(self.team)}
+        for index, employee in enumerate(self.team):
+            data.update({
+                f'form-{index}-employee': employee.pk, f'form-{index}-goals_review': 0, f'form-{index}-teamwork_review': 0,
+                f'form-{index}-innovation_review': 0, f'form-{index}-work_ethics_review': 0, f'form-{index}-total_review': 0,
+            })
+        for index, row in rows.items():
+            data.update({f'form-{index}-{name}': value for name, value in row.items()})
+        return data
+
+    def test_form_lists_the_team_only(self):
+        response = self.client.get(self.url)
+        self.assertEqual(len(response.context['form'].forms), len(self.team))
+        self.assertContains(response, str(self.team[0]))
+        self.assertNotContains(response, 'Otto')
+
+    def test_filled_rows_are_created_in_one_insert(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(self.url, self.post_data({
+                0: {'goals_achievment': 'Shipped', 'total_review': 15},
+                2: {'teamwork': 'Helpful', 'teamwork_review': 8, 'total_review': 8},
+            }))
+        self.assertRedirects(response, reverse('department_reviews'), fetch_redirect_response=False)
+        inserts = [query for query in queries.captured_queries if query['sql'].startswith('INSERT INTO "goals_management_review"')]
+        self.assertEqual(len(inserts), 1)
+        reviews = Review.objects.filter(manager=self.manager).order_by('employee_id')
+        self.assertEqual([(review.employee, review.total_review) for review in reviews], [(self.team[0], 15), (self.team[2], 8)])
+        self.assertEqual(SearchDocument.objects.filter(kind='review').count(), 2)
+        self.assertEqual(EmployeeScorecard.objects.get(employee=self.team[0]).latest_total_review, 15)
+        self.client.force_login(self.team[0].user)
+        self.assertContains(self.client.get(reverse('search'), {'query': 'Shipped'}), 'Review')
+
+    def test_outsiders_and_empty_forms_are_rejected(self):
+        response = self.client.post(self.url, self.post_data({}))
+        self.assertContains(response, 'Fill in the review of at least one team member.')
+        response = self.client.post(self.url, self.post_data({1: {'employee': self.outsider.pk, 'total_review': 8}}))
+        self.assertContains(response, 'Select a valid choice.')
+        self.assertFalse(Review.objects.exists())
+
+    def test_single_review_form_offers_the_team_only(self):
+        response = self.client.get(reverse('create_review_for_any'))
+        self.assertEqual(set(response.context['form'].fields['employee'].queryset), set(self.team))
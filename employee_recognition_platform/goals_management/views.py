@@ -1,64 +1,126 @@
+import json
 from typing import Any, Dict
-from django.shortcuts import render, get_object_or_404
+from django.core.exceptions import PermissionDenied
+from django.shortcuts import redirect, render, get_object_or_404
+from django.contrib.auth.decorators import login_required
 from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
 from django.views import generic
 from django.forms.models import BaseModelForm
-from django.db.models import Q
-from django.http import HttpResponse
+from django.db.models import Count, Prefetch, Q
+from django.db.models.functions import ExtractYear
+from django.http import HttpResponse, HttpResponseBadRequest, Http404, JsonResponse, StreamingHttpResponse
 from django.urls import reverse_lazy, reverse
+from django.utils.decorators import method_decorator
 from django.contrib import messages
+from django.utils.dateparse import parse_date
+from django.utils.timezone import localdate
 from django.utils.translation import gettext_lazy as _
-from . forms import GoalCreateForm, GoalUpdateForm, ReviewCreateForm, ReviewUpdateForm, GoalJournalForm
-from . models import Goal, Employee, Manager, Review
-import seaborn as sns
-import matplotlib.pyplot as plt
-import matplotlib.ticker as ticker
-from django.db import models
-import matplotlib.ticker as ticker
-import threading
-
-
+from . forms import GoalBulkUpdateForm, GoalCreateForm, GoalUpdateForm, ReviewCreateForm, ReviewUpdateForm, GoalJournalForm, TeamReviewFormSet
+from . models import Goal, GoalJournal, Employee, EmployeeScorecard, Review
+from . charts import chart_data, goal_aggregates, request_chart
+from . statistics import GoalStatistics
+from . search import search
+from . pagination import keyset_page
+from . exports import FORMATS, Export, ExportError, stream_export
+from . rendering import RENDERERS, RenderQueueFull
+from . roles import ManagerRequiredMixin, resolve_roles
+from . mixins import MemoizedObjectMixin
+from . async_utils import arender, async_login_required
+from . bulk import BulkUpdateError, clean_changes, create_reviews, update_goals
+from . caching import cache_per_user
+from . conditional import ConditionalGetMixin, conditional_page, list_version
+from . replicas import replica_reads
+
+
+@cache_per_user
 def index(request):
     return render(request, 'goals_management/index.html')
 
 
-def search_view(request):
-    query = request.GET.get('query')
-    if query:
-        goal_results = Goal.objects.filter(Q(title__icontains=query) | Q(description__icontains=query))
-        review_results = Review.objects.filter(Q(goals_achievment__icontains=query) | Q(teamwork__icontains=query) | Q(innovation__icontains=query) | Q(work_ethics__icontains=query))
-        results = list(goal_results) + list(review_results)
-    else:
-        results = []
-    return render(request, 'goals_management/search_results.html', {'results': results, 'query': query})
+async def _stream_search_results(query, results):
+    yield '{"query": %s, "results": [' % json.dumps(query)
+    separator = ''
+    async for document in results.aiterator():
+        yield separator + json.dumps({
+            'kind': document.kind,
+            'id': document.object_id,
+            'title': document.title,
+            'url': document.get_absolute_url(),
+        })
+        separator = ','
+    yield ']}'
+
+
+@async_login_required
+@replica_reads
+async def search_view(request):
+    query = (request.GET.get('query') or '').strip()
+    results = search(query, request.user) if query else None
+    if request.GET.get('format') == 'json':
+        if results is None:
+            return JsonResponse({'query': query, 'results': []})
+        return StreamingHttpResponse(_stream_search_results(query, results), content_type='application/json')
+    page, next_cursor = await results.apage(request.GET.get('cursor')) if results else ([], None)
+    context = {'results': page, 'query': query, 'next_cursor': next_cursor}
+    return await arender(request, 'goals_management/search_results.html', context)
+
+
+SMART_GRID = (
+    ('S', 'M', 'A', 'R', 'T'),
+    ('Specific', 'Measurable', 'Attainable', 'Relevant', 'Time-bound'),
+    ('Define your goal in detail. Be as specific as possible',
+     'Decide how you wil measure success',
+     'Set realistic goals that challenge you, but are achievable',
+     'Ensure your goal is results-oriented',
+     'Set a clear deadline and monitos your progress'),
+    ('G', 'O', 'A', 'L', 'S'),
+)
+
+
+@cache_per_user
+def smart(request):
+    return render(request, 'goals_management/smart.html', {'grid_data': SMART_GRID})
 
 
-def smart(request):
-    grid_data = [
-        ['S', 'M', 'A', 'R', 'T'],
-        ['Specific', 'Measurable', 'Attainable', 'Relevant', 'Time-bound'],
-        ['Define your goal in detail. Be as specific as possible',
-         'Decide how you wil measure success',
-         'Set realistic goals that challenge you, but are achievable',
-         'Ensure your goal is results-oriented',
-         'Set a clear deadline and monitos your progress'],
-        ['G', 'O', 'A', 'L', 'S'],
-    ]
-    return render(request, 'goals_management/smart.html', {'grid_data': grid_data})
-
-
-class GoalListView(generic.ListView):
-    model = Goal
-    template_name = 'goals_management/goal_list.html'
-    context_object_name = 'goal_list'
+def goal_list_queryset(user, status=None):
+    qs = Goal.objects.all()
+    if status:
+        qs = qs.filter(status=status) 
+    return qs.filter(owner=user)
+
+
+def goal_list_version(request):
+    return list_version(Goal.objects.filter(owner=request.user))
 
-    def get_queryset(self):
-        qs = super().get_queryset()
-        user = self.request.user
-        status = self.request.GET.get('status')
-        if status:
-            qs = qs.filter(status=status) 
-        return qs.filter(owner=user)
+
+@async_login_required
+@conditional_page(goal_list_version)
+@cache_per_user
+async def goal_list(request):
+    queryset = goal_list_queryset(request.user, request.GET.get('status'))
+    goals = [goal async for goal in queryset.aiterator()]
+    context = {'goal_list': goals, 'bulk_form': GoalBulkUpdateForm()}
+    return await arender(request, 'goals_management/goal_list.html', context)
+
+
+@login_required
+def bulk_update_goals(request):
+    if request.method != 'POST':
+        return redirect('goal_list')
+    goal_ids = request.POST.getlist('goals')
+    form = GoalBulkUpdateForm(request.POST)
+    if not goal_ids:
+        messages.error(request, _('Select the goals to change.'))
+    elif not form.is_valid():
+        messages.error(request, ' '.join(form.non_field_errors()) or _('Choose a valid status, progress or priority.'))
+    else:
+        try:
+            batch = update_goals(request.user, clean_changes(form.changes(goal_ids)))
+        except BulkUpdateError as error:
+            messages.error(request, str(error))
+        else:
+            messages.success(request, _('%(count)s goals updated.') % {'count': batch.goal_count if batch else 0})
+    return redirect('goal_list')
 
 
 class GoalCreateView(LoginRequiredMixin, generic.CreateView):
@@ -78,14 +140,14 @@ class GoalCreateView(LoginRequiredMixin, generic.CreateView):
         return super().form_valid(form)
      
 
-class GoalUpdateView(LoginRequiredMixin, generic.UpdateView):
+class GoalUpdateView(LoginRequiredMixin, MemoizedObjectMixin, generic.UpdateView):
     model = Goal
     form_class = GoalUpdateForm
     template_name = 'goals_management/update_goal.html'
 
     def get_initial(self):
         initial = super().get_initial()
-        obj = self.get_object()
+        obj = self.object
         initial["title"] = obj.title
         initial["status"] = obj.status
         initial["description"] = obj.description
@@ -96,10 +158,10 @@ class GoalUpdateView(LoginRequiredMixin, generic.UpdateView):
         return initial
     
     def get_success_url(self) -> str:
-        return reverse('goal_detail', kwargs={'pk':self.get_object().pk})
+        return reverse('goal_detail', kwargs={'pk':self.object.pk})
 
 
-class GoalDeleteView(LoginRequiredMixin, UserPassesTestMixin, generic.DeleteView):
+class GoalDeleteView(LoginRequiredMixin, UserPassesTestMixin, MemoizedObjectMixin, generic.DeleteView):
     model = Goal
     template_name = 'goals_management/delete_goal.html'
     success_url = reverse_lazy('goal_list')
@@ -113,13 +175,16 @@ class GoalDeleteView(LoginRequiredMixin, UserPassesTestMixin, generic.DeleteView
         return obj.owner == self.request.user  
     
 
-class DepartmentEmployeesListView(LoginRequiredMixin, UserPassesTestMixin, generic.ListView):
+class DepartmentEmployeesListView(ManagerRequiredMixin, generic.ListView):
     template_name = 'goals_management/employees_list.html'
     context_object_name = 'employees'
 
     def get_queryset(self):
-        manager = get_object_or_404(Manager, user=self.request.user)
-        queryset = Employee.objects.filter(manager=manager)
+        queryset = Employee.objects.filter(manager_id=self.roles.manager_id).prefetch_related(Prefetch(
+            'scorecards',
+            queryset=EmployeeScorecard.objects.filter(year=localdate().year),
+            to_attr='current_scorecards',
+        ))
         status_filter = self.request.GET.get('status')
         if status_filter:
             queryset = queryset.filter(status=status_filter)
@@ -130,17 +195,13 @@ class DepartmentEmployeesListView(LoginRequiredMixin, UserPassesTestMixin, gener
         context['status_filter'] = self.request.GET.get('status')
         return context
 
-    def test_func(self) -> bool | None:
-        return hasattr(self.request.user, "manager")
-    
 
-class DepartmentGoalsListView(LoginRequiredMixin, generic.ListView):
+class DepartmentGoalsListView(ManagerRequiredMixin, generic.ListView):
     template_name = 'goals_management/employee_goals_list.html'
     context_object_name = 'goals'
 
     def get_queryset(self):
-        manager = get_object_or_404(Manager, user=self.request.user)
-        employee = manager.employees.get(id=self.kwargs['pk'])
+        employee = get_object_or_404(Employee, id=self.kwargs['pk'], manager_id=self.roles.manager_id)
         priority = self.request.GET.get('priority')
         status = self.request.GET.get('status')
         start_date = self.request.GET.get('start_date')
@@ -156,21 +217,31 @@ class DepartmentGoalsListView(LoginRequiredMixin, generic.ListView):
             )
         return queryset
 
-    def test_func(self) -> bool | None:
-        return hasattr(self.request.user, "manager")
-    
 
-class EmployeeDetailView(LoginRequiredMixin, generic.DetailView):
+class EmployeeDetailView(LoginRequiredMixin, ConditionalGetMixin, MemoizedObjectMixin, generic.DetailView):
     model = Employee
     template_name = 'goals_management/employee_detail.html' 
 
+    def get_queryset(self):
+        return Employee.objects.select_related('manager', 'user__profile')
+
+    def get_version(self):
+        employee = self.get_object()
+        profile = getattr(employee.user, 'profile', None) if employee.user_id else None
+        return (
+            [getattr(employee, field.attname) for field in employee._meta.concrete_fields],
+            str(employee.manager),
+            (profile.picture.name, profile.picture_hash) if profile else None,
+            list_version(Review.objects.filter(employee=employee)),
+        )
+
     def get_context_data(self, **kwargs: Any):
         context = super().get_context_data(**kwargs)
-        context['employee'] = get_object_or_404(Employee, id=self.kwargs['pk'])
+        context['scorecards'] = self.object.scorecards.all()
         return context
 
 
-class ReviewCreateView(LoginRequiredMixin, generic.CreateView):
+class ReviewCreateView(ManagerRequiredMixin, generic.CreateView):
     model = Review
     form_class = ReviewCreateForm
     template_name = 'goals_management/create_review.html'
@@ -178,25 +249,50 @@ class ReviewCreateView(LoginRequiredMixin, generic.CreateView):
 
     def get_initial(self) -> Dict[str, Any]:
         initial =  super().get_initial()
-        manager = get_object_or_404(Manager, user=self.request.user)
-        initial['manager'] = manager
+        initial['manager'] = self.roles.manager_id
         if "pk" in self.kwargs:
             initial['employee'] = get_object_or_404(Employee, id=self.kwargs['pk'])
         return initial
+
+    def get_form(self, form_class=None):
+        form = super().get_form(form_class)
+        form.fields['employee'].queryset = Employee.objects.filter(manager_id=self.roles.manager_id)
+        return form
     
     def form_valid(self, form: BaseModelForm) -> HttpResponse:
-        manager = get_object_or_404(Manager, user=self.request.user)
-        form.instance.manager = manager
+        form.instance.manager_id = self.roles.manager_id
         messages.success(self.request, _('Review is created successfully!'))
         return super().form_valid(form)
-    
 
-class DepartmentReviewsListView(LoginRequiredMixin, UserPassesTestMixin, generic.ListView):
+
+class TeamReviewCreateView(ManagerRequiredMixin, generic.FormView):
+    form_class = TeamReviewFormSet
+    template_name = 'goals_management/create_team_reviews.html'
+    success_url = reverse_lazy('department_reviews')
+
+    def get_form_kwargs(self):
+        kwargs = super().get_form_kwargs()
+        kwargs['team'] = Employee.objects.filter(manager_id=self.roles.manager_id, status=0).order_by('last_name', 'first_name')
+        return kwargs
+
+    def form_valid(self, form):
+        reviews = create_reviews(self.roles.manager_id, form.reviews())
+        messages.success(self.request, _('%(count)s reviews created!') % {'count': len(reviews)})
+        return super().form_valid(form)
+
+
+@method_decorator(replica_reads, name='dispatch')
+class DepartmentReviewsListView(ManagerRequiredMixin, generic.ListView):
     template_name = 'goals_management/department_reviews.html'
     context_object_name = 'department_reviews'
+    ordering = ('-created_date', '-id')
+    per_page = 20
+
+    def get_department_queryset(self):
+        return Review.objects.filter(manager_id=self.roles.manager_id)
 
     def get_queryset(self):
-        queryset = Review.objects.filter(manager=self.request.user.manager)
+        queryset = self.get_department_queryset().select_related('employee', 'manager')
         year_filter = self.request.GET.get('year')
         employee_filter = self.request.GET.get('employee')
         review_filter = self.request.GET.get('review')
@@ -212,40 +308,47 @@ class DepartmentReviewsListView(LoginRequiredMixin, UserPassesTestMixin, generic
             queryset = queryset.filter(total_review=int(review_filter))
         return queryset
 
-    def test_func(self) -> bool | None:
-        return hasattr(self.request.user, "manager")
-    
+    def get_facets(self):
+        rows = self.get_department_queryset().order_by().values(
+            'employee_id', 'employee__first_name', 'employee__last_name', year=ExtractYear('created_date'),
+        ).annotate(count=Count('id'))
+        years = set()
+        employees = {}
+        for row in rows:
+            if row['year'] is not None:
+                years.add(row['year'])
+            if row['employee_id'] is not None:
+                employees[row['employee_id']] = f"{row['employee__first_name']} {row['employee__last_name']}"
+        return sorted(years), sorted(employees.items(), key=lambda employee: employee[1])
+
     def get_context_data(self, **kwargs):
-        context = super().get_context_data(**kwargs)
-        context['years'] = Review.objects.dates('created_date', 'year')
-        context['employees'] = Employee.objects.all()
+        page = keyset_page(self.object_list, self.ordering, self.request.GET.get('cursor'), self.per_page)
+        context = super().get_context_data(object_list=page.object_list, **kwargs)
+        context['years'], context['employees'] = self.get_facets()
         context['reviews'] = Review.SCORE_CHOICES
         context['selected_year'] = self.request.GET.get('year', '')
         context['selected_employee'] = self.request.GET.get('employee', '')
         context['selected_review'] = self.request.GET.get('review', '')
+        if page.has_next():
+            query = self.request.GET.copy()
+            query['cursor'] = page.next_cursor
+            context['next_page_query'] = query.urlencode()
         return context
-    
-    def department_reviews(request):
-        year_filter = request.GET.get('year')
-        reviews = Review.objects.all()
-        if year_filter:
-            reviews = reviews.filter(created_date__year=year_filter)
-        years = Review.objects.dates('created_date', 'year')
-        context = {'department_reviews': reviews, 'years': years}
-        return render(request, 'department_reviews.html', context)
-    
 
-class ReviewDetailView(LoginRequiredMixin, generic.DetailView):
+
+class ReviewDetailView(LoginRequiredMixin, ConditionalGetMixin, MemoizedObjectMixin, generic.DetailView):
     model = Review
     template_name = 'goals_management/review_detail.html' 
 
-    def get_context_data(self, **kwargs: Any):
-        context = super().get_context_data(**kwargs)
-        context['review'] = get_object_or_404(Review, id=self.kwargs['pk'])
-        return context
+    def get_queryset(self):
+        return Review.objects.select_related('employee', 'manager__user')
+
+    def get_version(self):
+        review = self.get_object()
+        return review.updated_at, str(review.employee), str(review.manager)
 
 
-class ReviewUpdateView(LoginRequiredMixin, generic.UpdateView):
+class ReviewUpdateView(LoginRequiredMixin, MemoizedObjectMixin, generic.UpdateView):
     model = Review
     form_class = ReviewUpdateForm
     template_name = 'goals_management/update_review.html'
@@ -253,7 +356,7 @@ class ReviewUpdateView(LoginRequiredMixin, generic.UpdateView):
 
     def get_initial(self):
         initial = super().get_initial()
-        obj = self.get_object()
+        obj = self.object
         initial["goals achievment"] = obj.goals_achievment
         initial["goals review"] = obj.goals_review
         initial["teamwork"] = obj.teamwork
@@ -266,7 +369,7 @@ class ReviewUpdateView(LoginRequiredMixin, generic.UpdateView):
         return initial
     
 
-class ReviewDeleteView(LoginRequiredMixin, generic.DeleteView):
+class ReviewDeleteView(LoginRequiredMixin, MemoizedObjectMixin, generic.DeleteView):
     model = Review
     template_name = 'goals_management/delete_review.html'
     success_url = reverse_lazy('department_reviews')
@@ -280,27 +383,74 @@ class ReviewDeleteView(LoginRequiredMixin, generic.DeleteView):
         return obj.manager == self.request.user  
 
 
-class ReviewListView(generic.ListView):
-    model = Review
-    template_name = 'goals_management/review_list.html'
-    context_object_name = 'review_list'
+def review_list_queryset(user):
+    return Review.objects.filter(employee__user=user)
 
-    def get_queryset(self):
-        qs = super().get_queryset()
-        user = self.request.user
-        return qs.filter(employee__user=user)
+
+def review_list_version(request):
+    return list_version(review_list_queryset(request.user))
+
+
+@async_login_required
+@conditional_page(review_list_version)
+@cache_per_user
+async def review_list(request):
+    reviews = [review async for review in review_list_queryset(request.user).aiterator()]
+    return await arender(request, 'goals_management/review_list.html', {'review_list': reviews})
     
 
-class GoalJournalDetailView(generic.edit.FormMixin, generic.DetailView):
+JOURNAL_ORDERING = ('-journal_date', '-id')
+JOURNALS_PER_PAGE = 20
+
+
+def journal_timeline(goal_id, cursor=None, per_page=JOURNALS_PER_PAGE):
+    """Return one ``KeysetPage`` of a goal's journals, newest first, seeking through journal_goal_date_idx."""
+    return keyset_page(GoalJournal.objects.filter(goal_id=goal_id), JOURNAL_ORDERING, cursor, per_page)
+
+
+def visible_goals(request):
+    """Goals ``request.user`` may read: their own and, for a manager, their team's."""
+    roles = resolve_roles(request)
+    team = Q(owner__employee__manager_id=roles.manager_id) if roles.is_manager else Q()
+    return Goal.objects.filter(Q(owner=request.user) | team)
+
+
+@login_required
+def goal_journals(request, pk):
+    if not visible_goals(request).filter(pk=pk).exists():
+        raise Http404
+    page = journal_timeline(pk, request.GET.get('cursor'))
+    if request.GET.get('format') == 'json':
+        return JsonResponse({
+            'results': [
+                {'id': journal.id, 'journal_date': journal.journal_date.isoformat(), 'journal': journal.journal}
+                for journal in page.object_list
+            ],
+            'next_cursor': page.next_cursor,
+        })
+    context = {'goal_id': pk, 'journals': page.object_list, 'next_cursor': page.next_cursor}
+    return render(request, 'goals_management/goal_journal_page.html', context)
+
+
+class GoalJournalDetailView(ConditionalGetMixin, MemoizedObjectMixin, generic.edit.FormMixin, generic.DetailView):
     model = Goal
     template_name = 'goals_management/goal_detail.html'
     form_class = GoalJournalForm
-    
-    def get_initial(self) -> Dict[str, Any]:
-        initial = super().get_initial()
-        initial['goal'] = self.get_object()
-        initial['owner'] = self.request.user
-        return initial 
+
+    def get_queryset(self):
+        return Goal.objects.select_related('owner')
+
+    def get_version(self):
+        # Journal changes touch the goal's updated_at.
+        return self.get_object().updated_at
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        page = journal_timeline(self.object.pk, per_page=JOURNALS_PER_PAGE)
+        context['goal_id'] = self.object.pk
+        context['journals'] = page.object_list
+        context['next_cursor'] = page.next_cursor
+        return context
 
     def post(self, request, *args, **kwargs):
         self.object = self.get_object()
@@ -311,83 +461,79 @@ class GoalJournalDetailView(generic.edit.FormMixin, generic.DetailView):
             return self.form_invalid(form)
         
     def form_valid(self, form: Any) -> HttpResponse:
-        form.instance.goal = self.get_object()
+        form.instance.goal = self.object
         form.instance.owner = self.request.user
         form.save()
         messages.success(self.request, _('Goal journal added!'))
         return super().form_valid(form)
     
     def get_success_url(self) -> str:
-        return reverse('goal_detail', kwargs={'pk':self.get_object().pk})
+        return reverse('goal_detail', kwargs={'pk':self.object.pk})
     
 
+@login_required
+@replica_reads
 def goal_status_chart(request):
-    def generate_chart():
-        goals = Goal.objects.filter(owner=request.user)
-        #priority graph
-        priority_counts = goals.values('priority').annotate(count=models.Count('priority'))
-        priority_labels = [dict(Goal.PRIORITY_CHOICES)[priority_count['priority']][2:] for priority_count in priority_counts]
-        priority_values = [priority_count['count'] for priority_count in priority_counts]
-        sns.set(style="whitegrid")
-        plt.figure(figsize=(5, 4))
-        ax2 = sns.barplot(x=priority_labels, y=priority_values, palette='dark:#5A9_r')
-        ax2.set(xlabel='Priority')
-        ax2.yaxis.set_major_locator(ticker.MaxNLocator(integer=True))
-        plt.title('Goals by Priority')
-        plt.tight_layout()
-        for i, v in enumerate(priority_values):
-            ax2.text(i, v, str(v), ha='center', va='bottom', color='black')
-        tmpfile_priority_graph = 'goals_management/static/css/graphs/priority_graph.png'
-        plt.savefig(tmpfile_priority_graph, format='png')
-        plt.close()
-
-        #status graph
-        status_counts = goals.values('status').annotate(count=models.Count('status'))
-        status_labels = [dict(Goal.GOAL_STATUS)[status_count['status']][2:] for status_count in status_counts]
-        status_values = [status_count['count'] for status_count in status_counts]
-        plt.figure(figsize=(5, 4))
-        ax = plt.subplot()
-        palette = sns.color_palette("BrBG", len(status_values)) 
-        ax.pie(status_values, labels=status_labels, colors=palette, autopct='%1.0f%%', startangle=90)
-        ax.axis('equal')
-        plt.title('Goal Distribution by Status')
-        plt.tight_layout()
-        centre_circle = plt.Circle((0, 0), 0.70, fc='white')
-        fig = plt.gcf()
-        fig.gca().add_artist(centre_circle)
-        tmpfile_status_graph = 'goals_management/static/css/graphs/status_graph.png'
-        plt.savefig(tmpfile_status_graph, format='png')
-        plt.close()
-
-        #progress graph
-        in_progress_goals = goals.filter(status=1)
-        on_hold_goals = goals.filter(status=3)
-        in_progress_progress_sum = in_progress_goals.aggregate(progress_sum=models.Sum('progress'))['progress_sum']
-        on_hold_progress_sum = on_hold_goals.aggregate(progress_sum=models.Sum('progress'))['progress_sum']
-        total_in_progress_goals = in_progress_goals.count()
-        total_on_hold_goals = on_hold_goals.count()
-        in_progress_progress_avg = in_progress_progress_sum / total_in_progress_goals if total_in_progress_goals > 0 else 0
-        on_hold_progress_avg = on_hold_progress_sum / total_on_hold_goals if total_on_hold_goals > 0 else 0
-
-        status_labels = ['In progress', 'On hold']
-        progress_percentages = [in_progress_progress_avg, on_hold_progress_avg]
-        plt.figure(figsize=(5, 2))
-        ax = sns.barplot(x=progress_percentages, y=status_labels, palette='dark:#5A9_r')
-        ax.set(xlabel='Progress (%)', ylabel='Status')
-        plt.title('Average Goal Progress')
-        plt.subplots_adjust(left=0.3, bottom=0.3)
-        for i, v in enumerate(progress_percentages):
-            ax.text(v + 0.02, i, f'{int(v * 100)}%', ha='left', va='center', color='white')
-        tmpfile_progress_graph = 'goals_management/static/css/graphs/progress_graph.png'
-        plt.savefig(tmpfile_progress_graph, format='png')
-        plt.close()
-
-    threading.Thread(target=generate_chart).start()
-    total_goals = Goal.objects.filter(owner=request.user).count()
+    aggregates = goal_aggregates(request.user)
+    for chart in RENDERERS:
+        try:
+            request_chart(request.user, chart)
+        except RenderQueueFull:
+            break
     context = {
-        'priority_graph_path': 'static/css/graphs/priority_graph.png',
-        'status_graph_path': 'static/css/graphs/status_graph.png',
-        'progress_graph_path': 'static/css/graphs/progress_graph.png',
-        'total_goals': total_goals,
+        'total_goals': aggregates['total'],
+        'status_breakdown': [
+            (label, count) for label, count in zip(*chart_data('status', aggregates))
+        ],
     }
     return render(request, 'goals_management/statistics.html', context)
+
+
+@async_login_required
+@replica_reads
+async def goal_statistics_data(request):
+    statistics = GoalStatistics.for_owner(request.user)
+    return JsonResponse(statistics.labelled(await statistics.acompute()))
+
+
+@login_required
+@replica_reads
+def goal_chart(request, chart):
+    if chart not in RENDERERS:
+        raise Http404
+    try:
+        png = request_chart(request.user, chart)
+    except RenderQueueFull:
+        response = HttpResponse(status=503)
+        response['Retry-After'] = '2'
+        return response
+    if png is None:
+        response = HttpResponse(status=202)
+        response['Retry-After'] = '1'
+        return response
+    response = HttpResponse(png, content_type='image/png')
+    response['Cache-Control'] = 'private, no-cache'
+    return response
+
+
+@login_required
+@replica_reads
+def export_view(request, kind, format):
+    model = {'reviews': 'review', 'goals': 'goal'}.get(kind)
+    if model is None or format not in FORMATS:
+        raise Http404
+    if not request.user.has_perm(f'goals_management.view_{model}'):
+        raise PermissionDenied
+    try:
+        export = Export(
+            kind,
+            date_from=parse_date(request.GET.get('from') or '') or None,
+            date_to=parse_date(request.GET.get('to') or '') or None,
+            department=request.GET.get('department') or None,
+        )
+        content = stream_export(format, export)
+    except (ExportError, ValueError) as error:
+        return HttpResponseBadRequest(str(error))
+    response = StreamingHttpResponse(content, content_type=FORMATS[format])
+    response['Content-Disposition'] = f'attachment; filename="{kind}.{format}"'
+    return response
@@ -4,3 +4,4 @@ from . import models
 
 admin.site.register(models.Profile)
 admin.site.register(models.ManagerProfile)
+admin.site.register(models.StoredPicture)
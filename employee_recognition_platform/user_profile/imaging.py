@@ -0,0 +1,110 @@
+"""Avatar thumbnail worker pool.
+
+Uploaded pictures are decoded and resized with PIL in separate processes, so
+an upload returns as soon as the original is stored. This module must not
+import Django: it is imported again by every spawned worker.
+"""
+import hashlib
+import io
+import logging
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+
+logger = logging.getLogger(__name__)
+
+AVATAR_SIZES = (32, 64, 128, 300)
+AVATAR_FORMATS = {
+    'webp': ('WEBP', {'quality': 80, 'method': 4}),
+    'jpg': ('JPEG', {'quality': 85, 'optimize': True, 'progressive': True}),
+}
+
+
+class ThumbnailQueueFull(Exception):
+    pass
+
+
+def content_hash(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+def make_variants(data, sizes=AVATAR_SIZES):
+    """Return ``(digest, {(size, ext): bytes})`` for the picture bytes ``data``.
+
+    Every variant is a centre-cropped square; pictures smaller than a size
+    are never upscaled.
+    """
+    from PIL import Image, ImageOps
+    image = ImageOps.exif_transpose(Image.open(io.BytesIO(data)))
+    if image.mode in ('RGBA', 'LA', 'P'):
+        image = image.convert('RGBA')
+        background = Image.new('RGB', image.size, 'white')
+        background.paste(image, mask=image.getchannel('A'))
+        image = background
+    else:
+        image = image.convert('RGB')
+    variants = {}
+    for size in sizes:
+        side = min(size, *image.size)
+        thumbnail = ImageOps.fit(image, (side, side), Image.LANCZOS)
+        for ext, (format, options) in AVATAR_FORMATS.items():
+            buffer = io.BytesIO()
+            thumbnail.save(buffer, format=format, **options)
+            variants[size, ext] = buffer.getvalue()
+    return content_hash(data), variants
+
+
+class ThumbnailPipeline:
+    """Process pool with a bounded backlog that thumbnails each job key once.
+
+    ``submit`` never blocks: a job already queued or running under the same
+    key is shared, and ``ThumbnailQueueFull`` is raised once ``max_pending``
+    jobs are outstanding. ``on_done(key, result)`` is called from the pool's
+    result thread with the return value of ``make_variants``.
+    """
+
+    def __init__(self, max_workers=1, max_pending=64, on_done=None):
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.on_done = on_done
+        self._executor = None
+        self._pending = {}
+        self._lock = threading.Lock()
+
+    def _get_executor(self):
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context('spawn'),
+            )
+        return self._executor
+
+    def submit(self, key, data):
+        with self._lock:
+            if key in self._pending:
+                return self._pending[key]
+            if len(self._pending) >= self.max_pending:
+                raise ThumbnailQueueFull(key)
+            future = self._get_executor().submit(make_variants, data)
+            self._pending[key] = future
+        future.add_done_callback(lambda f: self._finish(key, f))
+        return future
+
+    def _finish(self, key, future):
+        try:
+            result = future.result()
+        except Exception:
+            logger.exception('Thumbnailing %s failed', key)
+        else:
+            if self.on_done is not None:
+                self.on_done(key, result)
+        finally:
+            with self._lock:
+                self._pending.pop(key, None)
+
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+from user_profile.models import ManagerProfile, Profile
+from user_profile.thumbnails import build_missing_thumbnails
+
+
+class Command(BaseCommand):
+    help = 'Build the avatar size variants of every profile picture that has none yet.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=None, help='Thumbnailing processes.')
+        parser.add_argument('--batch-size', type=int, default=32)
+        parser.add_argument('--rebuild', action='store_true', help='Rebuild variants that already exist.')
+
+    def handle(self, *args, **options):
+        built = build_missing_thumbnails(
+            (Profile, ManagerProfile),
+            workers=options['workers'], batch_size=options['batch_size'], rebuild=options['rebuild'],
+        )
+        self.stdout.write(self.style.SUCCESS(f'Built thumbnails for {built} pictures.'))
@@ -0,0 +1,24 @@
+from datetime import timedelta
+from django.core.management.base import BaseCommand
+from user_profile.pictures import GRACE_PERIOD, collect_garbage, recount_pictures
+
+
+class Command(BaseCommand):
+    help = 'Delete profile pictures (and their avatar variants) that no profile references any more.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--grace-minutes', type=int, default=int(GRACE_PERIOD.total_seconds() // 60),
+            help='Only collect pictures unreferenced for at least this long.',
+        )
+        parser.add_argument('--recount', action='store_true', help='Rebuild reference counts from the profiles first.')
+        parser.add_argument('--dry-run', action='store_true')
+
+    def handle(self, *args, **options):
+        if options['recount']:
+            self.stdout.write(f'Corrected {recount_pictures()} reference counts.')
+        collected = collect_garbage(timedelta(minutes=options['grace_minutes']), dry_run=options['dry_run'])
+        for name in collected:
+            self.stdout.write(name)
+        verb = 'Would delete' if options['dry_run'] else 'Deleted'
+        self.stdout.write(self.style.SUCCESS(f'{verb} {len(collected)} unreferenced pictures.'))
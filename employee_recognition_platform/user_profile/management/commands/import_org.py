@@ -0,0 +1,36 @@
+import sys
+from contextlib import nullcontext
+from django.core.management.base import BaseCommand, CommandError
+from user_profile.org_import import OrgImporter, read_rows
+
+
+class Command(BaseCommand):
+    help = (
+        'Import managers and employees (with their users and profiles) from CSV or JSONL. '
+        'Columns: role (manager|employee), username, email, first_name, last_name, password, '
+        'hire_date, term_date, department (managers), position and manager username (employees).'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Input file, or - for stdin.')
+        parser.add_argument('--format', choices=('csv', 'jsonl'), help='Defaults to the file extension.')
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--workers', type=int, default=None, help='Password hashing processes.')
+
+    def handle(self, *args, **options):
+        path = options['path']
+        format = options['format'] or ('jsonl' if path.endswith(('.jsonl', '.json')) else 'csv')
+        try:
+            # stdin is not ours to close.
+            source = nullcontext(sys.stdin) if path == '-' else open(path, newline='', encoding='utf-8')
+        except OSError as error:
+            raise CommandError(error)
+        with source as stream:
+            importer = OrgImporter(batch_size=options['batch_size'], workers=options['workers'])
+            report = importer.run(read_rows(stream, format))
+        for line, message in report.errors:
+            self.stderr.write(f'line {line}: {message}')
+        self.stdout.write(self.style.SUCCESS(
+            f'Imported {report.created_managers} managers and {report.created_employees} employees, '
+            f'{len(report.errors)} rows rejected.'
+        ))
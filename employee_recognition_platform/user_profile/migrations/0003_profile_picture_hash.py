@@ -0,0 +1,23 @@
+# Generated by Django 4.2.2 on 2026-10-18 15:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('user_profile', '0002_alter_managerprofile_picture_alter_profile_picture'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='managerprofile',
+            name='picture_hash',
+            field=models.CharField(blank=True, editable=False, max_length=64, verbose_name='picture hash'),
+        ),
+        migrations.AddField(
+            model_name='profile',
+            name='picture_hash',
+            field=models.CharField(blank=True, editable=False, max_length=64, verbose_name='picture hash'),
+        ),
+    ]
@@ -0,0 +1,48 @@
+# Generated by Django 4.2.2 on 2026-10-18 15:27
+
+from django.db import migrations, models
+import user_profile.storage
+
+
+def count_existing_pictures(apps, schema_editor):
+    StoredPicture = apps.get_model('user_profile', 'StoredPicture')
+    counts = {}
+    for model_name in ('Profile', 'ManagerProfile'):
+        model = apps.get_model('user_profile', model_name)
+        for name in model.objects.exclude(picture='').exclude(picture__isnull=True).values_list('picture', flat=True):
+            counts[name] = counts.get(name, 0) + 1
+    StoredPicture.objects.bulk_create([StoredPicture(name=name, refcount=count) for name, count in counts.items()])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('user_profile', '0003_profile_picture_hash'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StoredPicture',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=255, unique=True, verbose_name='name')),
+                ('refcount', models.IntegerField(default=0, verbose_name='references')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='updated at')),
+            ],
+            options={
+                'verbose_name': 'stored picture',
+                'verbose_name_plural': 'stored pictures',
+            },
+        ),
+        migrations.AlterField(
+            model_name='managerprofile',
+            name='picture',
+            field=models.ImageField(blank=True, null=True, storage=user_profile.storage.get_picture_storage, upload_to='user_profile/pictures', verbose_name='picture'),
+        ),
+        migrations.AlterField(
+            model_name='profile',
+            name='picture',
+            field=models.ImageField(blank=True, null=True, storage=user_profile.storage.get_picture_storage, upload_to='user_profile/pictures', verbose_name='picture'),
+        ),
+        migrations.RunPython(count_existing_pictures, migrations.RunPython.noop),
+    ]
@@ -1,13 +1,44 @@
+from functools import partial
 from django.db import models
 from django.contrib.auth import get_user_model
-from django.db import models
+from django.db import models, transaction
 from django.urls import reverse
 from django.utils.translation import gettext_lazy as _
-from PIL import Image
 from goals_management.models import Employee, Manager
+from . storage import get_picture_storage
+from . thumbnails import schedule_thumbnails
+
+
+class AvatarMixin:
+    """Queue the avatar size variants whenever ``picture`` changes.
 
+    ``picture_hash`` is the content hash the variants are stored under; it
+    stays empty, and the original picture is served, until they are built.
+    """
+    _saved_picture = None
 
-class Profile(models.Model):
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._saved_picture = instance.__dict__.get('picture')
+        return instance
+
+    def picture_changed(self):
+        if 'picture' not in self.__dict__:
+            return False
+        return str(self.picture or '') != str(self._saved_picture or '')
+
+    def save(self, *args, **kwargs) -> None:
+        changed = self.picture_changed()
+        if changed:
+            self.picture_hash = ''
+        super().save(*args, **kwargs)
+        self._saved_picture = self.picture.name
+        if changed and self.picture:
+            transaction.on_commit(partial(schedule_thumbnails, self))
+
+
+class Profile(AvatarMixin, models.Model):
     user = models.OneToOneField(
         get_user_model(), 
         verbose_name=_("user"), 
@@ -15,7 +46,10 @@ class Profile(models.Model):
         related_name='profile',
         null=True, blank=True,
     )
-    picture = models.ImageField(_("picture"), upload_to='user_profile/pictures', null=True, blank=True,)
+    picture = models.ImageField(
+        _("picture"), upload_to='user_profile/pictures', storage=get_picture_storage, null=True, blank=True,
+    )
+    picture_hash = models.CharField(_("picture hash"), max_length=64, blank=True, editable=False)
     employee = models.OneToOneField(
         Employee,
         verbose_name=_("employee profile"), 
@@ -35,17 +69,8 @@ class Profile(models.Model):
     def get_absolute_url(self):
         return reverse("profile_detail", kwargs={"pk": self.pk})
 
-    def save(self, *args, **kwargs) -> None:
-        super().save(*args, **kwargs)
-        if self.picture:
-            pic = Image.open(self.picture.path)
-            if pic.width > 300 or pic.height > 300:
-                new_size = (300, 300)
-                pic.thumbnail(new_size)
-                pic.save(self.picture.path)
-   
-    
-class ManagerProfile(models.Model):
+
+class ManagerProfile(AvatarMixin, models.Model):
     user = models.OneToOneField(
         get_user_model(), 
         verbose_name=_("user"), 
@@ -53,7 +78,10 @@ class ManagerProfile(models.Model):
         related_name='manager_user_profile',
         null=True, blank=True,
     )
-    picture = models.ImageField(_("picture"), upload_to='user_profile/pictures', null=True, blank=True,)
+    picture = models.ImageField(
+        _("picture"), upload_to='user_profile/pictures', storage=get_picture_storage, null=True, blank=True,
+    )
+    picture_hash = models.CharField(_("picture hash"), max_length=64, blank=True, editable=False)
     manager = models.OneToOneField(
         Manager,
         verbose_name=_("manager profile"), 
@@ -72,11 +100,16 @@ class ManagerProfile(models.Model):
     def get_absolute_url(self):
         return reverse("profile_detail", kwargs={"pk": self.pk})
 
-    def save(self, *args, **kwargs) -> None:
-        super().save(*args, **kwargs)
-        if self.picture:
-            pic = Image.open(self.picture.path)
-            if pic.width > 300 or pic.height > 300:
-                new_size = (300, 300)
-                pic.thumbnail(new_size)
-                pic.save(self.picture.path)
+
+class StoredPicture(models.Model):
+    """Reference count of one content-addressed picture file."""
+    name = models.CharField(_("name"), max_length=255, unique=True)
+    refcount = models.IntegerField(_("references"), default=0)
+    updated_at = models.DateTimeField(_("updated at"), auto_now=True)
+
+    class Meta:
+        verbose_name = _("stored picture")
+        verbose_name_plural = _("stored pictures")
+
+    def __str__(self):
+        return f'{self.name} ({self.refcount})'
@@ -0,0 +1,243 @@
+"""Bulk import of managers and employees from CSV or JSONL.
+
+Rows are read lazily, validated a batch at a time, and written with
+``bulk_create`` inside one transaction per batch. Managers are resolved
+through an in-memory ``username -> Manager.id`` lookup seeded from the
+database and extended as manager rows are imported, so employees may refer
+to managers from the same file as long as the manager row comes first (rows
+referring to a later manager are retried once at the end). Invalid rows are
+reported and skipped; they never abort the import.
+"""
+import csv
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from datetime import date
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.exceptions import ValidationError
+from django.core.validators import validate_email
+from django.db import IntegrityError, transaction
+from django.db.models.functions import Lower
+from goals_management.models import Employee, Manager
+from . models import ManagerProfile, Profile
+
+
+User = get_user_model()
+
+ROLES = ('manager', 'employee')
+
+
+def read_rows(stream, format):
+    """Yield ``(line_number, row)`` pairs from a CSV or JSONL text stream."""
+    if format == 'csv':
+        reader = csv.DictReader(stream)
+        for row in reader:
+            yield reader.line_num, row
+        return
+    for line_number, line in enumerate(stream, start=1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield line_number, json.loads(line)
+        except ValueError as error:
+            yield line_number, {'_error': f'invalid JSON: {error}'}
+
+
+def _setup_worker():
+    import django
+    from django.apps import apps
+    if not apps.ready:
+        os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'employee_recognition_platform.settings')
+        django.setup()
+
+
+def hash_password(password):
+    return make_password(password or None)
+
+
+@dataclass
+class ImportReport:
+    created_managers: int = 0
+    created_employees: int = 0
+    errors: list = field(default_factory=list)
+
+    def error(self, line, message):
+        self.errors.append((line, message))
+
+
+class OrgImporter:
+    def __init__(self, batch_size=1000, workers=None):
+        self.batch_size = batch_size
+        self.workers = workers
+        self.report = ImportReport()
+        self.managers = dict(Manager.objects.filter(user__isnull=False).values_list('user__username', 'id'))
+        self.seen_usernames = set()
+        self.seen_emails = set()
+        self.deferred = []
+
+    def run(self, rows):
+        with ProcessPoolExecutor(max_workers=self.workers, initializer=_setup_worker) as pool:
+            self.pool = pool
+            batch = []
+            for line, row in rows:
+                batch.append((line, row))
+                if len(batch) >= self.batch_size:
+                    self.import_batch(batch)
+                    batch = []
+            self.import_batch(batch)
+            deferred, self.deferred = self.deferred, []
+            for offset in range(0, len(deferred), self.batch_size):
+                self.import_batch(deferred[offset:offset + self.batch_size], retry=True)
+        return self.report
+
+    def clean_row(self, row):
+        if '_error' in row:
+            raise ValidationError(row['_error'])
+        row = {key: (value.strip() if isinstance(value, str) else value) for key, value in row.items() if key}
+        role = (row.get('role') or 'employee').lower()
+        if role not in ROLES:
+            raise ValidationError(f'unknown role "{role}"')
+        for required in ('username', 'email', 'first_name', 'last_name'):
+            if not row.get(required):
+                raise ValidationError(f'{required} is required')
+        if len(row['username']) < 3:
+            raise ValidationError('username is too short')
+        validate_email(row['email'])
+        if row['username'] in self.seen_usernames:
+            raise ValidationError(f'duplicate username "{row["username"]}"')
+        if row['email'].lower() in self.seen_emails:
+            raise ValidationError(f'duplicate email "{row["email"]}"')
+        self.seen_usernames.add(row['username'])
+        self.seen_emails.add(row['email'].lower())
+        for date_field in ('hire_date', 'term_date'):
+            if row.get(date_field):
+                try:
+                    row[date_field] = date.fromisoformat(row[date_field])
+                except ValueError:
+                    raise ValidationError(f'{date_field} must be YYYY-MM-DD')
+            else:
+                row.pop(date_field, None)
+        row['role'] = role
+        return row
+
+    def validate_batch(self, batch):
+        cleaned = []
+        for line, row in batch:
+            try:
+                cleaned.append((line, self.clean_row(row)))
+            except ValidationError as error:
+                self.report.error(line, '; '.join(error.messages))
+        usernames = [row['username'] for _line, row in cleaned]
+        emails = [row['email'].lower() for _line, row in cleaned]
+        taken_usernames = set(User.objects.filter(username__in=usernames).values_list('username', flat=True))
+        taken_emails = set(User.objects.annotate(email_lower=Lower('email')).filter(email_lower__in=emails).values_list(
+            'email_lower', flat=True,
+        ))
+        valid = []
+        for line, row in cleaned:
+            if row['username'] in taken_usernames:
+                self.report.error(line, f'username "{row["username"]}" already exists')
+            elif row['email'].lower() in taken_emails:
+                self.report.error(line, f'email "{row["email"]}" already exists')
+            else:
+                valid.append((line, row))
+        return valid
+
+    def import_batch(self, batch, retry=False):
+        if not batch:
+            return
+        valid = batch if retry else self.validate_batch(batch)
+        batch_managers = {row['username'] for _line, row in valid if row['role'] == 'manager'}
+        ready = []
+        for line, row in valid:
+            manager = self.unknown_manager(row, batch_managers)
+            if manager:
+                if retry:
+                    self.report.error(line, f'unknown manager "{manager}"')
+                else:
+                    self.deferred.append((line, row))
+                continue
+            ready.append((line, row))
+        if not ready:
+            return
+        passwords = list(self.pool.map(
+            hash_password, [row.get('password') for _line, row in ready],
+            chunksize=max(1, len(ready) // (4 * (self.workers or os.cpu_count() or 1))),
+        ))
+        try:
+            with transaction.atomic():
+                self.created(self.write(ready, passwords))
+        except IntegrityError:
+            for (line, row), password in sorted(zip(ready, passwords), key=lambda item: item[0][1]['role'] != 'manager'):
+                try:
+                    with transaction.atomic():
+                        self.created(self.write([(line, row)], [password]))
+                except IntegrityError as error:
+                    self.report.error(line, str(error))
+
+    def unknown_manager(self, row, batch_managers):
+        """Return the manager username an employee ``row`` names but neither the lookup nor the batch has."""
+        manager = row.get('manager')
+        if row['role'] == 'employee' and manager and manager not in self.managers and manager not in batch_managers:
+            return manager
+        return None
+
+    def created(self, instances):
+        for instance in instances:
+            if isinstance(instance, Manager):
+                self.managers[instance.user.username] = instance.pk
+                self.report.created_managers += 1
+            else:
+                self.report.created_employees += 1
+
+    def write(self, ready, passwords):
+        # A manager of the batch may have failed in the row-by-row fallback;
+        # its employees are rejected rather than imported without a manager.
+        batch_managers = {row['username'] for _line, row in ready if row['role'] == 'manager'}
+        resolved = []
+        for (line, row), password in zip(ready, passwords):
+            manager = self.unknown_manager(row, batch_managers)
+            if manager:
+                self.report.error(line, f'unknown manager "{manager}"')
+            else:
+                resolved.append(((line, row), password))
+        ready = [item for item, _password in resolved]
+        passwords = [password for _item, password in resolved]
+        users = {
+            row['username']: User(
+                username=row['username'],
+                email=row['email'],
+                first_name=row['first_name'],
+                last_name=row['last_name'],
+                is_staff=row['role'] == 'manager',
+                password=password,
+            )
+            for (_line, row), password in zip(ready, passwords)
+        }
+        User.objects.bulk_create(users.values())
+        managers = []
+        for _line, row in ready:
+            if row['role'] == 'manager':
+                managers.append(Manager(
+                    first_name=row['first_name'], last_name=row['last_name'], email=row['email'],
+                    department=row.get('department', ''), user=users[row['username']],
+                    **{key: row[key] for key in ('hire_date', 'term_date') if key in row},
+                ))
+        Manager.objects.bulk_create(managers)
+        manager_ids = {**self.managers, **{manager.user.username: manager.pk for manager in managers}}
+        employees = []
+        for _line, row in ready:
+            if row['role'] == 'employee':
+                employees.append(Employee(
+                    first_name=row['first_name'], last_name=row['last_name'], email=row['email'],
+                    position=row.get('position', ''), manager_id=manager_ids.get(row.get('manager')),
+                    user=users[row['username']],
+                    **{key: row[key] for key in ('hire_date', 'term_date') if key in row},
+                ))
+        Employee.objects.bulk_create(employees)
+        ManagerProfile.objects.bulk_create([ManagerProfile(user=manager.user, manager=manager) for manager in managers])
+        Profile.objects.bulk_create([Profile(user=employee.user, employee=employee) for employee in employees])
+        return managers + employees
@@ -0,0 +1,100 @@
+"""Reference counting and garbage collection of content-addressed pictures.
+
+Every profile that holds a picture counts as one reference to its file.
+Counts are kept up to date by the signals in ``user_profile.signals``; a file
+whose count has been zero for longer than the grace period is removed by
+``collect_garbage`` along with its avatar variants. The grace period covers
+an upload that has been written to storage but not yet saved on its profile.
+"""
+from datetime import timedelta
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.db.models import F
+from django.utils.timezone import now
+from . imaging import AVATAR_FORMATS, AVATAR_SIZES
+from . models import ManagerProfile, Profile, StoredPicture
+from . storage import digest_from_name, picture_storage
+from . thumbnails import variant_name
+
+
+PICTURE_MODELS = (Profile, ManagerProfile)
+GRACE_PERIOD = timedelta(hours=1)
+
+
+def claim_picture(name):
+    """Restart the grace period of ``name`` before an upload writes or reuses its file.
+
+    ``collect_garbage`` re-checks the timestamp under the same row lock, so a
+    file it is about to delete is either gone before the upload looks for it
+    or left alone.
+    """
+    with transaction.atomic():
+        StoredPicture.objects.update_or_create(name=name, defaults={'updated_at': now()})
+
+
+def retain_picture(name):
+    if not name:
+        return
+    with transaction.atomic():
+        StoredPicture.objects.select_for_update().get_or_create(name=name)
+        StoredPicture.objects.filter(name=name).update(refcount=F('refcount') + 1, updated_at=now())
+
+
+def release_picture(name):
+    if not name:
+        return
+    StoredPicture.objects.filter(name=name).update(refcount=F('refcount') - 1, updated_at=now())
+
+
+def referenced_pictures():
+    """Count the references to every picture straight from the profile tables."""
+    counts = {}
+    for model in PICTURE_MODELS:
+        for name in model.objects.exclude(picture='').exclude(picture__isnull=True).values_list('picture', flat=True):
+            counts[name] = counts.get(name, 0) + 1
+    return counts
+
+
+def recount_pictures():
+    """Rewrite every reference count from the profile tables; return how many changed."""
+    counts = referenced_pictures()
+    changed = 0
+    with transaction.atomic():
+        for stored in StoredPicture.objects.select_for_update():
+            refcount = counts.pop(stored.name, 0)
+            if stored.refcount != refcount:
+                stored.refcount = refcount
+                stored.save(update_fields=['refcount', 'updated_at'])
+                changed += 1
+        StoredPicture.objects.bulk_create([StoredPicture(name=name, refcount=count) for name, count in counts.items()])
+    return changed + len(counts)
+
+
+def delete_picture_files(name):
+    picture_storage.delete(name)
+    digest = digest_from_name(name)
+    if digest is None:
+        return
+    for size in AVATAR_SIZES:
+        for ext in AVATAR_FORMATS:
+            default_storage.delete(variant_name(digest, size, ext))
+
+
+def collect_garbage(grace_period=GRACE_PERIOD, dry_run=False):
+    """Delete pictures unreferenced for longer than ``grace_period``; return their names."""
+    candidates = StoredPicture.objects.filter(refcount__lte=0, updated_at__lt=now() - grace_period)
+    collected = []
+    for stored in candidates.iterator():
+        if dry_run:
+            collected.append(stored.name)
+            continue
+        # Re-check under the row lock that retain_picture and claim_picture
+        # take, and keep it while the files go, so nothing reuses the name
+        # between the check and the delete.
+        with transaction.atomic():
+            if candidates.select_for_update().filter(pk=stored.pk).first() is None:
+                continue
+            delete_picture_files(stored.name)
+            StoredPicture.objects.filter(pk=stored.pk).delete()
+        collected.append(stored.name)
+    return collected
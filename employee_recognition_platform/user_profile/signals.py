@@ -0,0 +1,30 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from goals_management.caching import invalidate_user_pages
+from goals_management.roles import invalidate_roles
+from . models import ManagerProfile, Profile
+from . pictures import release_picture, retain_picture
+
+
+@receiver(post_save, sender=Profile)
+@receiver(post_save, sender=ManagerProfile)
+def count_picture_references(sender, instance, raw=False, **kwargs):
+    if not raw and instance.picture_changed():
+        release_picture(str(instance._saved_picture or ''))
+        retain_picture(instance.picture.name)
+
+
+@receiver(post_delete, sender=Profile)
+@receiver(post_delete, sender=ManagerProfile)
+def release_picture_reference(sender, instance, **kwargs):
+    if instance.picture:
+        release_picture(instance.picture.name)
+
+
+@receiver(post_save, sender=Profile)
+@receiver(post_save, sender=ManagerProfile)
+@receiver(post_delete, sender=Profile)
+@receiver(post_delete, sender=ManagerProfile)
+def profile_role_changed(sender, instance, **kwargs):
+    invalidate_roles(instance.user_id)
+    invalidate_user_pages(instance.user_id)
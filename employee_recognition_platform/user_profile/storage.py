@@ -0,0 +1,67 @@
+"""Content-addressed storage for profile pictures.
+
+A file is stored under the SHA-256 of its bytes, so identical uploads share
+one file and a stored name never points at different content. That makes
+every URL safe to cache forever. Files are shared, so they are never deleted
+by the models that reference them: ``user_profile.pictures`` counts
+references and the collect_pictures command removes unreferenced files.
+"""
+import hashlib
+import os
+import posixpath
+import uuid
+from django.core.files.storage import FileSystemStorage
+from django.utils.deconstruct import deconstructible
+from django.views.static import serve
+
+
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+
+
+def content_name(directory, digest, ext):
+    return posixpath.join(directory, digest[:2], f'{digest}{ext}')
+
+
+def digest_from_name(name):
+    """Return the SHA-256 a content-addressed ``name`` was stored under, or None."""
+    stem = posixpath.splitext(posixpath.basename(name or ''))[0]
+    if len(stem) == 64 and all(char in '0123456789abcdef' for char in stem):
+        return stem
+    return None
+
+
+@deconstructible
+class ContentAddressedStorage(FileSystemStorage):
+    def _save(self, name, content):
+        sha256 = hashlib.sha256()
+        content.seek(0)
+        for chunk in content.chunks():
+            sha256.update(chunk)
+        content.seek(0)
+        directory, filename = posixpath.split(name)
+        name = content_name(directory, sha256.hexdigest(), posixpath.splitext(filename)[1].lower())
+        # Imported here: the models that use this storage are imported by pictures.
+        from . pictures import claim_picture
+        claim_picture(name)
+        if self.exists(name):
+            return name
+        # Write under a unique name and rename, so concurrent uploads of the
+        # same bytes both end up with one complete file.
+        temporary = super()._save(posixpath.join(posixpath.dirname(name), f'.{uuid.uuid4().hex}.tmp'), content)
+        os.replace(self.path(temporary), self.path(name))
+        return name
+
+
+picture_storage = ContentAddressedStorage()
+
+
+def get_picture_storage():
+    return picture_storage
+
+
+def serve_immutable(request, path, document_root=None):
+    """``django.views.static.serve`` for content-addressed media, marked cacheable forever."""
+    response = serve(request, path, document_root=document_root)
+    if response.status_code == 200:
+        response['Cache-Control'] = IMMUTABLE_CACHE_CONTROL
+    return response
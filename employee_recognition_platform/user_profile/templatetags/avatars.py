@@ -0,0 +1,32 @@
+from django import template
+from django.templatetags.static import static
+from .. thumbnails import pick_size, variant_url
+
+
+register = template.Library()
+
+DEFAULT_AVATAR = 'css/img/default.jpg'
+
+
+@register.inclusion_tag('user_profile/avatar.html')
+def avatar(profile, size=128, css_class='picture'):
+    """Render ``profile``'s picture as an ``<img>`` of about ``size`` pixels.
+
+    Once its variants are built the smallest covering WebP and JPEG sizes
+    are offered, with a double-size candidate for high density screens;
+    until then the original upload, or the default picture, is used.
+    """
+    context = {'size': size, 'css_class': css_class}
+    picture = getattr(profile, 'picture', None)
+    if not picture:
+        context['src'] = static(DEFAULT_AVATAR)
+        return context
+    digest = profile.picture_hash
+    if not digest:
+        context['src'] = picture.url
+        return context
+    small, large = pick_size(size), pick_size(size * 2)
+    context['src'] = variant_url(digest, small, 'jpg')
+    context['srcset'] = f"{context['src']} 1x, {variant_url(digest, large, 'jpg')} 2x"
+    context['webp_srcset'] = f"{variant_url(digest, small, 'webp')} 1x, {variant_url(digest, large, 'webp')} 2x"
+    return context
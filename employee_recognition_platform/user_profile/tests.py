@@ -1,3 +1,282 @@
-from django.test import TestCase
+import io
+import os
+import shutil
+import tempfile
+from datetime import date, timedelta
+from unittest import mock
+from django.contrib.auth import get_user_model
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.core.management import call_command
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.template import Context, Template
+from django.test import RequestFactory, TestCase, override_settings
+from django.urls import reverse
+from django.utils.timezone import now
+from PIL import Image
+from goals_management.models import Employee, Manager
+from goals_management.tests import ViewBudgetMixin, seed_organisation
+from . import urls
+from . imaging import AVATAR_FORMATS, AVATAR_SIZES, content_hash
+from . models import ManagerProfile, Profile, StoredPicture
+from . org_import import OrgImporter, read_rows
+from . pictures import collect_garbage, recount_pictures
+from . storage import IMMUTABLE_CACHE_CONTROL, digest_from_name, picture_storage, serve_immutable
+from . thumbnails import variant_name, variant_url
 
-# Create your tests here.
+
+class UserProfileViewBudgetTests(ViewBudgetMixin, TestCase):
+    urlconf = urls
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.manager, cls.team = seed_organisation()
+        cls.employee = cls.team[0]
+        for employee in cls.team:
+            Profile.objects.create(user=employee.user, employee=employee)
+        ManagerProfile.objects.create(user=cls.manager.user, manager=cls.manager)
+
+    def budget_cases(self):
+        employee_user = self.employee.user
+        manager_user = self.manager.user
+        return {
+            'signup': (None, {}, ''),
+            'profile': (employee_user, {}, ''),
+            'profile_detail': (manager_user, {'user_id': employee_user.pk}, ''),
+            'profile_update': (employee_user, {}, ''),
+            'manager_profile': (manager_user, {}, ''),
+        }
+
+
+@override_settings(AVATAR_THUMBNAIL_WORKERS=0)
+class AvatarThumbnailTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.manager, cls.team = seed_organisation(employees=1, goals=0, reviews=0)
+        cls.employee = cls.team[0]
+        cls.profile = Profile.objects.create(user=cls.employee.user, employee=cls.employee)
+
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        self.enterContext(override_settings(MEDIA_ROOT=media_root))
+
+    def upload(self, width=600, height=400):
+        buffer = io.BytesIO()
+        Image.new('RGB', (width, height), 'teal').save(buffer, format='PNG')
+        picture = SimpleUploadedFile('me.png', buffer.getvalue(), content_type='image/png')
+        self.client.force_login(self.employee.user)
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(reverse('profile_update'), {'picture': picture})
+        self.assertEqual(response.status_code, 302)
+        self.profile.refresh_from_db()
+        return buffer.getvalue()
+
+    def test_upload_builds_content_hashed_variants(self):
+        data = self.upload()
+        self.assertEqual(self.profile.picture_hash, content_hash(data))
+        for size in AVATAR_SIZES:
+            for ext in AVATAR_FORMATS:
+                with default_storage.open(variant_name(self.profile.picture_hash, size, ext)) as variant:
+                    self.assertEqual(Image.open(variant).size, (size, size))
+        with Image.open(self.profile.picture.path) as original:
+            self.assertEqual(original.size, (600, 400))
+
+    def test_avatar_tag_picks_covering_sizes(self):
+        self.upload()
+        html = Template('{% load avatars %}{% avatar profile 40 %}').render(Context({'profile': self.profile}))
+        digest = self.profile.picture_hash
+        self.assertIn(variant_url(digest, 64, 'webp'), html)
+        self.assertIn(variant_url(digest, 128, 'webp'), html)
+        self.assertIn(f'src="{variant_url(digest, 64, "jpg")}"', html)
+
+    def test_avatar_tag_falls_back_until_variants_exist(self):
+        self.upload()
+        Profile.objects.filter(pk=self.profile.pk).update(picture_hash='')
+        self.profile.refresh_from_db()
+        html = Template('{% load avatars %}{% avatar profile %}').render(Context({'profile': self.profile}))
+        self.assertIn(self.profile.picture.url, html)
+        self.assertNotIn('<picture>', html)
+
+
+@override_settings(AVATAR_THUMBNAIL_WORKERS=0)
+class ContentAddressedPictureTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.manager, cls.team = seed_organisation(employees=2, goals=0, reviews=0)
+        cls.profiles = [Profile.objects.create(user=employee.user, employee=employee) for employee in cls.team]
+
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        self.enterContext(override_settings(MEDIA_ROOT=media_root))
+
+    def set_picture(self, profile, color):
+        buffer = io.BytesIO()
+        Image.new('RGB', (80, 80), color).save(buffer, format='PNG')
+        with self.captureOnCommitCallbacks(execute=True):
+            profile.picture = SimpleUploadedFile('headshot.png', buffer.getvalue())
+            profile.save()
+        return profile.picture.name
+
+    def refcount(self, name):
+        return StoredPicture.objects.get(name=name).refcount
+
+    def test_identical_uploads_share_one_file(self):
+        first = self.set_picture(self.profiles[0], 'navy')
+        second = self.set_picture(self.profiles[1], 'navy')
+        self.assertEqual(first, second)
+        self.profiles[0].refresh_from_db()
+        self.assertEqual(digest_from_name(first), self.profiles[0].picture_hash)
+        self.assertEqual(len(os.listdir(os.path.dirname(self.profiles[0].picture.path))), 1)
+        self.assertEqual(self.refcount(first), 2)
+
+    def test_unreferenced_pictures_are_collected(self):
+        shared = self.set_picture(self.profiles[0], 'navy')
+        self.set_picture(self.profiles[1], 'navy')
+        replaced = self.set_picture(self.profiles[0], 'olive')
+        self.assertEqual((self.refcount(shared), self.refcount(replaced)), (1, 1))
+        self.profiles[1].delete()
+        self.assertEqual(self.refcount(shared), 0)
+        self.assertEqual(collect_garbage(grace_period=timedelta(hours=1)), [])
+        self.assertEqual(collect_garbage(grace_period=timedelta(0)), [shared])
+        self.assertFalse(default_storage.exists(shared))
+        self.assertFalse(default_storage.exists(variant_name(digest_from_name(shared), 64, 'webp')))
+        self.assertTrue(default_storage.exists(replaced))
+
+    def test_reupload_of_an_unreferenced_picture_is_not_collected(self):
+        name = self.set_picture(self.profiles[0], 'navy')
+        self.set_picture(self.profiles[0], 'olive')
+        StoredPicture.objects.filter(name=name).update(updated_at=now() - timedelta(days=1))
+        with open(picture_storage.path(name), 'rb') as picture:
+            # The upload finds the file in place but has not been saved on a profile yet.
+            self.assertEqual(picture_storage.save('user_profile/pictures/again.png', picture), name)
+        self.assertEqual(collect_garbage(grace_period=timedelta(hours=1)), [])
+        self.assertTrue(picture_storage.exists(name))
+
+    def test_upload_after_collection_writes_the_file_again(self):
+        name = self.set_picture(self.profiles[0], 'navy')
+        with open(picture_storage.path(name), 'rb') as picture:
+            content = picture.read()
+        self.set_picture(self.profiles[0], 'olive')
+        self.assertEqual(collect_garbage(grace_period=timedelta(0)), [name])
+        self.assertEqual(picture_storage.save('user_profile/pictures/again.png', io.BytesIO(content)), name)
+        self.assertTrue(picture_storage.exists(name))
+        self.assertEqual(self.refcount(name), 0)
+
+    def test_recount_repairs_drift(self):
+        name = self.set_picture(self.profiles[0], 'navy')
+        StoredPicture.objects.filter(name=name).update(refcount=5)
+        self.assertEqual(recount_pictures(), 1)
+        self.assertEqual(self.refcount(name), 1)
+
+    def test_pictures_are_served_immutable(self):
+        name = self.set_picture(self.profiles[0], 'navy')
+        response = serve_immutable(RequestFactory().get('/'), name, document_root=settings.MEDIA_ROOT)
+        self.assertEqual(response['Cache-Control'], IMMUTABLE_CACHE_CONTROL)
+
+
+@override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+class OrgImportTests(TestCase):
+    CSV = (
+        'role,username,email,first_name,last_name,password,hire_date,department,position,manager\n'
+        'employee,eve,eve@example.com,Eve,Early,secret,2020-01-31,,Engineer,mary\n'
+        'manager,mary,mary@example.com,Mary,Manager,secret,,R&D,,\n'
+        'employee,bob,not-an-email,Bob,Broken,,,,Engineer,mary\n'
+        'employee,ann,ann@example.com,Ann,Another,,31/01/2020,,Engineer,mary\n'
+        'employee,amy,EVE@example.com,Amy,Again,,,,Engineer,mary\n'
+        'employee,zed,zed@example.com,Zed,Orphan,,,,Engineer,nobody\n'
+        'employee,tom,tom@example.com,Tom,Taken,,,,Engineer,mary\n'
+    )
+
+    def import_csv(self, text, importer_class=OrgImporter, batch_size=2):
+        return importer_class(batch_size=batch_size, workers=1).run(read_rows(io.StringIO(text), 'csv'))
+
+    def test_bad_rows_are_reported_and_skipped(self):
+        get_user_model().objects.create_user('existing', email='TOM@Example.com')
+        report = self.import_csv(self.CSV)
+        self.assertEqual((report.created_managers, report.created_employees), (1, 1))
+        errors = dict(report.errors)
+        self.assertIn('email', errors[4])
+        self.assertIn('hire_date', errors[5])
+        self.assertIn('duplicate email', errors[6])
+        self.assertIn('unknown manager "nobody"', errors[7])
+        self.assertIn('email "tom@example.com" already exists', errors[8])
+        eve = Employee.objects.get(user__username='eve')
+        self.assertEqual((eve.manager.user.username, eve.hire_date), ('mary', date(2020, 1, 31)))
+        self.assertTrue(eve.user.check_password('secret'))
+        self.assertTrue(Profile.objects.filter(employee=eve).exists())
+        self.assertTrue(ManagerProfile.objects.filter(manager__user__username='mary').exists())
+
+    def test_managers_from_later_batches_are_resolved_on_retry(self):
+        rows = [
+            {'role': 'employee', 'username': f'emp{i}', 'email': f'emp{i}@example.com', 'first_name': 'E',
+             'last_name': str(i), 'manager': 'late'}
+            for i in range(3)
+        ] + [{'role': 'manager', 'username': 'late', 'email': 'late@example.com', 'first_name': 'L', 'last_name': 'M'}]
+        report = OrgImporter(batch_size=1, workers=1).run(enumerate(rows, start=1))
+        self.assertEqual(report.errors, [])
+        self.assertEqual(Employee.objects.filter(manager__user__username='late').count(), 3)
+
+    def test_integrity_errors_fall_back_to_row_by_row_inserts(self):
+        class RacingImporter(OrgImporter):
+            def validate_batch(self, batch):
+                valid = super().validate_batch(batch)
+                # Another process takes a username after it was checked.
+                get_user_model().objects.get_or_create(username='ann')
+                return valid
+
+        text = (
+            'role,username,email,first_name,last_name,department,position,manager\n'
+            'manager,mary,mary@example.com,Mary,Manager,R&D,,\n'
+            'employee,ann,ann@example.com,Ann,Another,,Engineer,mary\n'
+            'employee,eve,eve@example.com,Eve,Early,,Engineer,mary\n'
+        )
+        report = self.import_csv(text, RacingImporter, batch_size=10)
+        self.assertEqual((report.created_managers, report.created_employees), (1, 1))
+        self.assertEqual([line for line, _message in report.errors], [3])
+        self.assertTrue(Employee.objects.filter(user__username='eve', manager__user__username='mary').exists())
+        self.assertFalse(Employee.objects.filter(user__username='ann').exists())
+
+    def test_employees_of_a_manager_rejected_row_by_row_are_reported(self):
+        class RacingImporter(OrgImporter):
+            def validate_batch(self, batch):
+                valid = super().validate_batch(batch)
+                get_user_model().objects.get_or_create(username='mary')
+                return valid
+
+        text = (
+            'role,username,email,first_name,last_name,department,position,manager\n'
+            'manager,mary,mary@example.com,Mary,Manager,R&D,,\n'
+            'employee,ann,ann@example.com,Ann,Another,,Engineer,mary\n'
+            'employee,eve,eve@example.com,Eve,Early,,Engineer,\n'
+        )
+        report = self.import_csv(text, RacingImporter, batch_size=10)
+        self.assertEqual((report.created_managers, report.created_employees), (0, 1))
+        errors = dict(report.errors)
+        self.assertEqual(sorted(errors), [2, 3])
+        self.assertEqual(errors[3], 'unknown manager "mary"')
+        self.assertFalse(get_user_model().objects.filter(username='ann').exists())
+        self.assertTrue(Employee.objects.filter(user__username='eve', manager=None).exists())
+
+    def test_command_leaves_stdin_open(self):
+        stdin = io.StringIO(
+            '{"role": "manager", "username": "mary", "email": "mary@example.com", "first_name": "M", "last_name": "M"}\n'
+        )
+        with mock.patch('sys.stdin', stdin):
+            call_command('import_org', '-', '--format', 'jsonl', '--workers', '1', stdout=io.StringIO())
+        self.assertFalse(stdin.closed)
+        self.assertTrue(Manager.objects.filter(user__username='mary').exists())
+
+    def test_command(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        path = os.path.join(directory, 'org.jsonl')
+        with open(path, 'w') as file:
+            file.write('{"role": "manager", "username": "mary", "email": "mary@example.com", "first_name": "M", "last_name": "M"}\n')
+            file.write('not json\n')
+        stdout, stderr = io.StringIO(), io.StringIO()
+        call_command('import_org', path, '--workers', '1', stdout=stdout, stderr=stderr)
+        self.assertIn('Imported 1 managers and 0 employees, 1 rows rejected.', stdout.getvalue())
+        self.assertIn('line 2: invalid JSON', stderr.getvalue())
+        self.assertTrue(Manager.objects.filter(user__username='mary').exists())
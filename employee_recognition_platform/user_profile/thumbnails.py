@@ -0,0 +1,126 @@
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from django.apps import apps
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import connection
+from goals_management.caching import invalidate_user_pages
+from . imaging import AVATAR_SIZES, ThumbnailPipeline, ThumbnailQueueFull, make_variants
+
+
+logger = logging.getLogger(__name__)
+
+VARIANT_NAME = 'user_profile/avatars/{prefix}/{digest}-{size}.{ext}'
+
+
+def variant_name(digest, size, ext):
+    return VARIANT_NAME.format(prefix=digest[:2], digest=digest, size=size, ext=ext)
+
+
+def variant_url(digest, size, ext):
+    return default_storage.url(variant_name(digest, size, ext))
+
+
+def thumbnail_key(profile):
+    return profile._meta.label, profile.pk, profile.picture.name
+
+
+def store_variants(key, result):
+    """Write the variants of one picture and mark its profile as thumbnailed.
+
+    Variants are named by the hash of the original, so identical uploads
+    share files. The profile is only updated if it still holds the picture
+    that was thumbnailed.
+    """
+    model_label, pk, picture_name = key
+    digest, variants = result
+    for (size, ext), data in variants.items():
+        name = variant_name(digest, size, ext)
+        if not default_storage.exists(name):
+            default_storage.save(name, ContentFile(data))
+    profiles = apps.get_model(model_label).objects.filter(pk=pk, picture=picture_name)
+    if profiles.update(picture_hash=digest):
+        # The chrome caches the avatar URL, which now points at a variant.
+        invalidate_user_pages(*profiles.values_list('user_id', flat=True))
+
+
+def _store_variants_in_pool_thread(key, result):
+    try:
+        store_variants(key, result)
+    except Exception:
+        logger.exception('Storing thumbnails of %s failed', key)
+    finally:
+        connection.close()
+
+
+pipeline = ThumbnailPipeline(
+    max_workers=max(settings.AVATAR_THUMBNAIL_WORKERS, 1),
+    max_pending=settings.AVATAR_THUMBNAIL_QUEUE_SIZE,
+    on_done=_store_variants_in_pool_thread,
+)
+
+
+def schedule_thumbnails(profile):
+    """Queue the size variants of ``profile.picture``.
+
+    With AVATAR_THUMBNAIL_WORKERS = 0 the variants are built inline. A full
+    backlog is only logged: the original picture is served until the
+    build_thumbnails command catches up.
+    """
+    if not profile.picture:
+        return
+    key = thumbnail_key(profile)
+    with profile.picture.open('rb') as picture:
+        data = picture.read()
+    if not settings.AVATAR_THUMBNAIL_WORKERS:
+        store_variants(key, make_variants(data))
+        return
+    try:
+        pipeline.submit(key, data)
+    except ThumbnailQueueFull:
+        logger.warning('Thumbnail backlog full, %s left for build_thumbnails', key)
+
+
+def pick_size(size):
+    """Return the smallest variant size that covers ``size`` pixels."""
+    for candidate in AVATAR_SIZES:
+        if candidate >= size:
+            return candidate
+    return AVATAR_SIZES[-1]
+
+
+def _read_picture(profile):
+    try:
+        with profile.picture.open('rb') as picture:
+            return picture.read()
+    except OSError:
+        logger.warning('Picture of %s is missing', thumbnail_key(profile))
+        return None
+
+
+def build_missing_thumbnails(models, workers=None, batch_size=32, rebuild=False):
+    """Build variants for every profile of ``models`` that has none yet; return how many were built."""
+    built = 0
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn')) as pool:
+        for model in models:
+            profiles = model.objects.exclude(picture='').exclude(picture__isnull=True).order_by('pk')
+            if not rebuild:
+                profiles = profiles.filter(picture_hash='')
+            batch = []
+            for profile in profiles.only('pk', 'picture').iterator(chunk_size=batch_size):
+                batch.append(profile)
+                if len(batch) >= batch_size:
+                    built += _build_batch(pool, batch)
+                    batch = []
+            built += _build_batch(pool, batch)
+    return built
+
+
+def _build_batch(pool, profiles):
+    jobs = [(thumbnail_key(profile), _read_picture(profile)) for profile in profiles]
+    jobs = [(key, data) for key, data in jobs if data is not None]
+    for (key, _data), result in zip(jobs, pool.map(make_variants, [data for _key, data in jobs])):
+        store_variants(key, result)
+    return len(jobs)
@@ -1,23 +1,27 @@
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth import get_user_model
 from django.contrib import messages
-from django.shortcuts import render, get_object_or_404, redirect
+from django.http import Http404
+from django.shortcuts import render, redirect
 from django.views.decorators.csrf import csrf_protect
 from . forms import ProfileUpdateForm, UserUpdateForm, ManagerProfileUpdateForm
 from . models import Profile
+from goals_management.async_utils import arender, async_login_required
 from goals_management.models import Employee
 
 
 User = get_user_model()
 
 
-@login_required
-def profile(request, user_id=None):
+@async_login_required
+async def profile(request, user_id=None):
     if user_id == None:
-        user = request.user
-    else:
-        user = get_object_or_404(get_user_model(), id=user_id)
-    return render(request, 'user_profile/profile.html', {'user_': user})
+        user_id = request.user.pk
+    try:
+        user = await User.objects.select_related('employee__manager', 'manager').aget(id=user_id)
+    except User.DoesNotExist:
+        raise Http404
+    return await arender(request, 'user_profile/profile.html', {'user_': user})
 
 @login_required
 @csrf_protect